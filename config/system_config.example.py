@@ -36,11 +36,29 @@ TIMING_CONFIG = {
     # Watering operation timeout (seconds)
     'watering_timeout': 300,
     
-    # Sensor reading interval (seconds)
+    # Sensor reading interval (seconds), moisture telemetry is reported at this period
     'sensor_read_interval': 5,
     
     # Health check interval (seconds)
-    'health_check_interval': 30
+    'health_check_interval': 30,
+    
+    # Photo request poll interval (seconds), polled with the other requests if not set
+    'photo_poll_interval': 60,
+    
+    # Cycle time budget (seconds), slower cycles are logged with a per-phase breakdown
+    'cycle_budget': 5,
+    
+    # Number of samples kept per phase for the rolling cycle statistics
+    'profiler_window': 100,
+    
+    # Minutes a time plan slot missed by a long cycle or downtime is still watered
+    'schedule_catch_up_minutes': 60,
+    
+    # Number of recent moisture checks the drying trend is fitted over
+    'moisture_trend_window': 8,
+    
+    # Maximum check intervals skipped while the trend predicts the soil stays moist
+    'moisture_check_max_skipped_intervals': 4
 }
 
 # =============================================================================
@@ -58,7 +76,22 @@ SENSOR_CONFIG = {
     'temperature_threshold': 25.0,
     
     # Light threshold for light-based watering (lux)
-    'light_threshold': 1000
+    'light_threshold': 1000,
+    
+    # Moisture sensor reading interval of the background sampler (seconds)
+    'moisture_sample_interval': 1.0,
+    
+    # Number of readings the median moisture value is taken over
+    'moisture_buffer_size': 15,
+    
+    # Weight of a new median in the moisture moving average (0.0-1.0, 1.0 disables smoothing)
+    'moisture_ema_alpha': 0.3,
+    
+    # Evaluate a running moisture plan as soon as the sensor turns dry, between the loop cycles
+    'moisture_edge_trigger': False,
+    
+    # Seconds the sensor has to stay dry before a dry edge is acted on
+    'moisture_trigger_debounce': 2.0
 }
 
 # =============================================================================
@@ -101,12 +134,51 @@ SERVER_CONFIG = {
     # Request timeout (seconds)
     'request_timeout': 30,
     
+    # Connection timeout (seconds)
+    'connect_timeout': 5,
+    
+    # Read timeout (seconds), falls back to request_timeout
+    'read_timeout': 30,
+    
+    # Number of pooled connections kept per host, about three per zone
+    'pool_size': 4,
+    
+    # Reuse connections between requests (HTTP keep-alive)
+    'keep_alive': True,
+    
     # Retry attempts for failed requests
     'retry_attempts': 3,
     
     # Retry delay between attempts (seconds)
     'retry_delay': 5,
     
+    # Maximum number of undelivered records kept in the outbox
+    'outbox_max_records': 10000,
+    
+    # Number of outbox records replayed per batch
+    'outbox_batch_size': 20,
+    
+    # Upper bound of the outbox replay backoff (seconds)
+    'outbox_max_retry_delay': 300,
+    
+    # Read timeouts per endpoint (seconds), e.g. longer for photo uploads
+    'endpoint_read_timeouts': {'postPhoto': 60},
+    
+    # Consecutive failures after which requests are skipped (circuit breaker)
+    'breaker_failure_threshold': 3,
+    
+    # Delay before probing the server again, doubles per failed probe (seconds)
+    'breaker_reset_timeout': 5,
+    
+    # Upper bound of the probe delay (seconds)
+    'breaker_max_reset_timeout': 300,
+    
+    # Send JSON bodies gzip compressed (server must accept Content-Encoding: gzip)
+    'gzip_requests': False,
+    
+    # Smallest JSON body that is compressed (bytes)
+    'gzip_min_bytes': 512,
+    
     # SSL verification (True for production, False for self-signed certs)
     'verify_ssl': True
 }
@@ -237,6 +309,25 @@ PLANT_CONFIG = {
     }
 }
 
+# =============================================================================
+# ZONE CONFIGURATION
+# =============================================================================
+
+# Zones driven by one process, each with its own pump, sensors and device GUID.
+# Leave empty to run the single zone configured in run/main.py. All zones
+# share the pooled server connection, so raise SERVER_CONFIG['pool_size'] to
+# about three connections per zone.
+ZONES_CONFIG = [
+    # {
+    #     'name': 'basil',
+    #     'device_guid': 'ab313658-5d84-47d6-a3f1-b609c0f1dd5e',
+    #     'relay_pin': 12,
+    #     'moisture_pin': 4,
+    #     'water_max_capacity': 2000,
+    #     'water_pumped_in_second': 70
+    # },
+]
+
 # =============================================================================
 # SAFETY CONFIGURATION
 # =============================================================================
@@ -0,0 +1,123 @@
+"""
+Time engine for the water plant automation system.
+
+This module keeps time as integers: epoch seconds from an injectable clock
+and minutes of the day. Time strings in HH:MM format are parsed once per
+distinct string and formatted from a precomputed table, so periodic checks
+do not run strptime/strftime, and intervals are computed modulo one day so
+they stay correct across midnight.
+"""
+import datetime
+import time
+from functools import lru_cache
+from typing import Callable, Optional
+
+TIME_FORMAT = "%H:%M"
+MINUTES_PER_DAY = 24 * 60
+SECONDS_PER_MINUTE = 60
+
+_TIME_STRINGS = tuple(f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(MINUTES_PER_DAY))
+
+
+@lru_cache(maxsize=4096)
+def minute_of_day(time_string: str) -> int:
+    """
+    Convert a time string to the minute of the day.
+
+    Args:
+        time_string: Time in HH:MM format
+
+    Returns:
+        Minutes since midnight
+
+    Raises:
+        ValueError: If the time string is invalid
+    """
+    parsed = datetime.datetime.strptime(time_string, TIME_FORMAT)
+    return parsed.hour * 60 + parsed.minute
+
+
+def time_string(minute: int) -> str:
+    """Convert a minute of the day, wrapped around midnight, to a time string in HH:MM format."""
+    return _TIME_STRINGS[minute % MINUTES_PER_DAY]
+
+
+def minutes_between(start_minute: int, end_minute: int) -> int:
+    """
+    Return the minutes from one minute of the day to the next occurrence of another.
+
+    Args:
+        start_minute: Earlier minute of the day
+        end_minute: Later minute of the day, on the next day if it is before start_minute
+
+    Returns:
+        Minutes between 0 and one day
+    """
+    return (end_minute - start_minute) % MINUTES_PER_DAY
+
+
+class TimeEngine:
+    """
+    Local wall time in integer epoch seconds and minutes of the day.
+
+    Attributes:
+        clock: Callable returning the current epoch time in seconds
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        """
+        Initialize the engine.
+
+        Args:
+            clock: Callable returning the current epoch time in seconds
+        """
+        self.clock = clock
+
+    def epoch(self) -> int:
+        """Return the current epoch time in whole seconds."""
+        return int(self.clock())
+
+    def epoch_minute(self) -> int:
+        """Return the current epoch time in whole minutes."""
+        return self.epoch() // SECONDS_PER_MINUTE
+
+    def minute_of_day(self, epoch: Optional[float] = None) -> int:
+        """
+        Return the local minute of the day.
+
+        Args:
+            epoch: Epoch time in seconds, now if None
+
+        Returns:
+            Minutes since local midnight
+        """
+        local = time.localtime(self.epoch() if epoch is None else epoch)
+        return local.tm_hour * 60 + local.tm_min
+
+    def now(self) -> datetime.datetime:
+        """Return the local time as naive datetime in whole seconds."""
+        return datetime.datetime.fromtimestamp(self.epoch())
+
+    def current_time(self) -> str:
+        """Return the local time in HH:MM format."""
+        return time_string(self.minute_of_day())
+
+    def current_date(self) -> datetime.date:
+        """Return the local date."""
+        return datetime.date.fromtimestamp(self.epoch())
+
+    def time_minus_delta(self, delta_minutes: float) -> str:
+        """
+        Return the local time a number of minutes ago in HH:MM format.
+
+        Args:
+            delta_minutes: Minutes to go back
+
+        Returns:
+            Time string in HH:MM format
+        """
+        return time_string(self.minute_of_day(self.clock() - delta_minutes * SECONDS_PER_MINUTE))
+
+
+# Engine on the system clock used where no engine is injected
+SYSTEM_TIME = TimeEngine()
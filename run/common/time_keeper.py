@@ -2,14 +2,16 @@
 Time management utilities for the water plant automation system.
 
 This module provides time tracking and manipulation functions for
-scheduling watering operations and tracking last watering times.
+scheduling watering operations and tracking last watering times. Time
+arithmetic is delegated to the integer time engine.
 """
 import datetime
 from typing import Optional, Union
 import logging
+import run.common.time_engine as te
+from run.common.time_engine import SYSTEM_TIME, TIME_FORMAT, TimeEngine
 
 # Constants
-TIME_FORMAT = "%H:%M"
 DATE_FORMAT = "%Y-%m-%d"
 
 
@@ -21,14 +23,16 @@ class TimeKeeper:
     and perform time-based calculations for watering schedules.
     """
     
-    def __init__(self, current_time: Optional[str] = None):
+    def __init__(self, current_time: Optional[str] = None, engine: Optional[TimeEngine] = None):
         """
         Initialize TimeKeeper instance.
         
         Args:
             current_time: Initial time string in HH:MM format, defaults to current time
+            engine: Time engine providing the current time, the system clock if None
         """
-        self.current_time = current_time or self.get_current_time()
+        self.engine = engine or SYSTEM_TIME
+        self.current_time = current_time or self.engine.current_time()
         self.time_last_watered: Optional[str] = None
         self.date_last_watered: Optional[datetime.date] = None
 
@@ -73,25 +77,30 @@ class TimeKeeper:
         self.date_last_watered = date_last_watered
 
     @staticmethod
-    def get_current_time() -> str:
+    def get_current_time(engine: Optional[TimeEngine] = None) -> str:
         """
         Get current time in HH:MM format.
         
+        Args:
+            engine: Time engine providing the current time, the system clock if None
+            
         Returns:
             Current time as string in HH:MM format
         """
-        now = datetime.datetime.now()
-        return now.strftime(TIME_FORMAT)
+        return (engine or SYSTEM_TIME).current_time()
 
     @staticmethod
-    def get_current_date() -> datetime.date:
+    def get_current_date(engine: Optional[TimeEngine] = None) -> datetime.date:
         """
         Get current date.
         
+        Args:
+            engine: Time engine providing the current date, the system clock if None
+            
         Returns:
             Current date as date object
         """
-        return datetime.date.today()
+        return (engine or SYSTEM_TIME).current_date()
 
     @staticmethod
     def get_time_from_time_string(time_string: str) -> str:
@@ -108,18 +117,18 @@ class TimeKeeper:
             ValueError: If time_string is not in valid HH:MM format
         """
         try:
-            parsed_time = datetime.datetime.strptime(time_string, TIME_FORMAT)
-            return parsed_time.strftime(TIME_FORMAT)
+            return te.time_string(te.minute_of_day(time_string))
         except ValueError as e:
             raise ValueError(f"Invalid time format: {time_string}. Expected HH:MM") from e
 
     @staticmethod
-    def get_current_time_minus_delta(delta_minutes: int) -> str:
+    def get_current_time_minus_delta(delta_minutes: int, engine: Optional[TimeEngine] = None) -> str:
         """
         Get current time minus specified delta in minutes.
         
         Args:
             delta_minutes: Number of minutes to subtract from current time
+            engine: Time engine providing the current time, the system clock if None
             
         Returns:
             Time string in HH:MM format
@@ -127,10 +136,7 @@ class TimeKeeper:
         if not isinstance(delta_minutes, (int, float)):
             raise TypeError("delta_minutes must be a number")
             
-        now = datetime.datetime.now()
-        time_change = datetime.timedelta(minutes=delta_minutes)
-        time_with_delta = now - time_change
-        return time_with_delta.strftime(TIME_FORMAT)
+        return (engine or SYSTEM_TIME).time_minus_delta(delta_minutes)
 
     @staticmethod
     def _is_valid_time_format(time_string: str) -> bool:
@@ -144,7 +150,7 @@ class TimeKeeper:
             True if valid format, False otherwise
         """
         try:
-            datetime.datetime.strptime(time_string, TIME_FORMAT)
+            te.minute_of_day(time_string)
             return True
         except ValueError:
             return False
@@ -161,14 +167,8 @@ class TimeKeeper:
             Difference in minutes (time2 - time1)
         """
         try:
-            t1 = datetime.datetime.strptime(time1, TIME_FORMAT)
-            t2 = datetime.datetime.strptime(time2, TIME_FORMAT)
-            
             # Handle day rollover
-            if t2 < t1:
-                t2 += datetime.timedelta(days=1)
-                
-            return int((t2 - t1).total_seconds() / 60)
+            return te.minutes_between(te.minute_of_day(time1), te.minute_of_day(time2))
         except ValueError as e:
             raise ValueError(f"Invalid time format. Expected HH:MM") from e
 
@@ -185,16 +185,10 @@ class TimeKeeper:
             True if check_time is within interval, False otherwise
         """
         try:
-            check = datetime.datetime.strptime(check_time, TIME_FORMAT)
-            start = datetime.datetime.strptime(start_time, TIME_FORMAT)
-            end = datetime.datetime.strptime(end_time, TIME_FORMAT)
+            start = te.minute_of_day(start_time)
             
             # Handle day rollover
-            if end < start:
-                end += datetime.timedelta(days=1)
-                if check < start:
-                    check += datetime.timedelta(days=1)
-            
-            return start <= check <= end
+            return (te.minutes_between(start, te.minute_of_day(check_time)) <=
+                    te.minutes_between(start, te.minute_of_day(end_time)))
         except ValueError as e:
             raise ValueError(f"Invalid time format. Expected HH:MM") from e
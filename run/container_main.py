@@ -7,12 +7,15 @@ Flask API server with mock hardware simulation
 import os
 import sys
 import logging
+import io
+import gzip
 import json
+import hashlib
 import time
 import threading
 import requests
 from datetime import datetime
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
 
 # Add the run directory to Python path
@@ -24,6 +27,7 @@ from mock_hardware import get_hardware_manager
 # Add parent directory to path for config import
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from config.container_config import get_config
+from run.http_communicator.metrics import RequestMetrics
 
 # Configure logging
 logging.basicConfig(
@@ -53,6 +57,67 @@ hardware_manager = get_hardware_manager()
 # Global flag for data pushing
 data_pushing_active = False
 
+# Latency, status and byte metrics of the served routes, exposed on /metrics
+route_metrics = RequestMetrics()
+
+# Smallest response body worth compressing
+GZIP_MIN_BYTES = 512
+
+@app.before_request
+def start_request_timer():
+    """Remember when the request started and its wire body size"""
+    g.request_started = time.monotonic()
+    g.request_bytes = request.content_length or 0
+
+@app.after_request
+def record_request_metrics(response):
+    """Record latency, status code and body bytes per route"""
+    if 'request_started' in g and request.path != '/metrics':
+        route = request.url_rule.rule.lstrip('/') if request.url_rule else 'unmatched'
+        route_metrics.observe(route, time.monotonic() - g.request_started, response.status_code,
+                              bytes_out=response.calculate_content_length() or 0, bytes_in=g.request_bytes)
+    return response
+
+@app.before_request
+def decompress_request():
+    """Transparently decompress gzip request bodies sent by the device"""
+    if request.headers.get('Content-Encoding') != 'gzip':
+        return None
+    environ = request.environ
+    try:
+        body = gzip.decompress(environ['wsgi.input'].read(int(environ.get('CONTENT_LENGTH') or 0)))
+    except (OSError, EOFError) as e:
+        logger.error(f"Invalid gzip request body: {e}")
+        return jsonify({'error': 'invalid gzip body'}), 400
+    environ['wsgi.input'] = io.BytesIO(body)
+    environ['CONTENT_LENGTH'] = str(len(body))
+    environ.pop('HTTP_CONTENT_ENCODING', None)
+    return None
+
+@app.after_request
+def compress_response(response):
+    """Gzip JSON responses for clients that accept it"""
+    if ('gzip' not in request.headers.get('Accept-Encoding', '') or response.direct_passthrough
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+    body = response.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(body))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics of the served routes"""
+    return route_metrics.to_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+# Commands waiting for the device long-poll on /getCommands
+command_queue = []
+command_available = threading.Condition()
+MAX_LONG_POLL_TIMEOUT = 60  # seconds
+
 def push_data_to_waterplantapp():
     """Push sensor data to WaterPlantApp Django server"""
     global data_pushing_active
@@ -392,10 +457,16 @@ def get_plan():
             'plan_type': 'moisture',
             'water_volume': 150,
             'moisture_threshold': 0.3,
-            'device_id': DEVICE_GUID,
-            'timestamp': datetime.now().isoformat()
+            'device_id': DEVICE_GUID
         }
-        return jsonify(plan)
+        # The plan version ignores the timestamp, so an unchanged plan costs a 304 without body
+        etag = '"' + hashlib.sha1(json.dumps(plan, sort_keys=True).encode()).hexdigest() + '"'
+        if request.headers.get('If-None-Match') == etag:
+            return '', 304, {'ETag': etag}
+        plan['timestamp'] = datetime.now().isoformat()
+        response = jsonify(plan)
+        response.headers['ETag'] = etag
+        return response
     except Exception as e:
         logger.error(f"Error getting plan: {e}")
         return jsonify({'error': str(e)}), 500
@@ -510,6 +581,63 @@ def post_status():
         logger.error(f"Error posting status: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/postTelemetry', methods=['POST'])
+def post_telemetry():
+    """Mock postTelemetry endpoint - receives batched status, water, moisture and heartbeat"""
+    try:
+        data = request.get_json()
+        device_id = data.get('device', DEVICE_GUID)
+        heartbeat = data.get('heartbeat', False)
+        received = {key: data[key] for key in ('execution_status', 'message', 'water_level', 'moisture_level')
+                    if key in data}
+        
+        logger.info(f"Received telemetry: {received} (heartbeat: {heartbeat}) for device: {device_id}")
+        
+        return jsonify({
+            'success': True,
+            'heartbeat': heartbeat,
+            **received,
+            'device_id': device_id,
+            'timestamp': datetime.now().isoformat()
+        }), 201
+    except Exception as e:
+        logger.error(f"Error posting telemetry: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/getCommands', methods=['GET'])
+def get_commands():
+    """Mock getCommands endpoint - blocks until a command is queued or the timeout expires"""
+    try:
+        timeout = min(float(request.args.get('timeout', 10)), MAX_LONG_POLL_TIMEOUT)
+        with command_available:
+            command_available.wait_for(lambda: command_queue, timeout=timeout)
+            commands = list(command_queue)
+            command_queue.clear()
+        
+        if not commands:
+            return '', 204
+        logger.info(f"Delivering commands: {commands}")
+        return jsonify({'commands': commands})
+    except Exception as e:
+        logger.error(f"Error getting commands: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/queueCommand', methods=['POST'])
+def queue_command():
+    """Queue a plan, picture or water_level command for the device"""
+    try:
+        data = request.get_json()
+        command = {'type': data['type'], 'payload': data.get('payload', {})}
+        with command_available:
+            command_queue.append(command)
+            command_available.notify_all()
+        
+        logger.info(f"Queued command: {command}")
+        return jsonify({'success': True, 'command': command}), 201
+    except Exception as e:
+        logger.error(f"Error queueing command: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/getWaterLevel', methods=['GET'])
 def get_water_level():
     """Mock getWaterLevel endpoint - returns water level reset requests"""
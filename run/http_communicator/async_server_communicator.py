@@ -0,0 +1,139 @@
+"""
+Asyncio server communicator for water plant automation system.
+
+This module exposes the server communicator API as coroutines. Every call
+runs the blocking communicator method on a small thread pool, so several
+independent requests can be awaited concurrently while still sharing the
+pooled HTTP connections of the wrapped communicator.
+"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+# One worker per concurrent poll phase (water level, picture, plan)
+DEFAULT_MAX_WORKERS = 3
+
+
+class IAsyncServerCommunicatorInterface:
+    """Awaitable counterpart of IServerCommunicatorInterface."""
+
+    async def get_plan(self) -> Dict[str, Any]:
+        """Get the next watering plan."""
+        pass
+
+    async def post_water(self, water_level: float) -> Dict[str, Any]:
+        """Post the water level."""
+        pass
+
+    async def post_moisture(self, moisture_level: int) -> Dict[str, Any]:
+        """Post the moisture level."""
+        pass
+
+    async def post_picture(self, photo_name: str) -> Dict[str, Any]:
+        """Upload a captured picture."""
+        pass
+
+    async def post_plan_execution(self, status) -> Dict[str, Any]:
+        """Post a plan execution status."""
+        pass
+
+    async def get_water_level(self) -> Dict[str, Any]:
+        """Get a pending water level reset."""
+        pass
+
+    async def get_picture(self) -> Dict[str, Any]:
+        """Get a pending picture request."""
+        pass
+
+    async def post_telemetry(self, status=None, water_level=None, moisture_level=None,
+                             heartbeat: bool = False) -> Dict[str, Any]:
+        """Post batched telemetry."""
+        pass
+
+    async def get_commands(self, timeout: float):
+        """Wait for queued commands."""
+        pass
+
+
+class AsyncServerCommunicator(IAsyncServerCommunicatorInterface):
+    """
+    Asyncio wrapper around a synchronous server communicator.
+
+    Attributes:
+        communicator: Wrapped synchronous communicator
+    """
+
+    def __init__(self, communicator, max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Initialize the async communicator.
+
+        Args:
+            communicator: Synchronous communicator to wrap
+            max_workers: Number of requests that can run at the same time
+        """
+        self.communicator = communicator
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='communicator')
+        logging.info(f"AsyncServerCommunicator initialized with {max_workers} workers")
+
+    async def run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on the communicator thread pool.
+
+        Args:
+            func: Callable to run
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            Result of the callable
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def get_plan(self) -> Dict[str, Any]:
+        """Get the next watering plan."""
+        return await self.run_blocking(self.communicator.get_plan)
+
+    async def post_water(self, water_level: float) -> Dict[str, Any]:
+        """Post the water level."""
+        return await self.run_blocking(self.communicator.post_water, water_level)
+
+    async def post_moisture(self, moisture_level: int) -> Dict[str, Any]:
+        """Post the moisture level."""
+        return await self.run_blocking(self.communicator.post_moisture, moisture_level)
+
+    async def post_picture(self, photo_name: str) -> Dict[str, Any]:
+        """Upload a captured picture."""
+        return await self.run_blocking(self.communicator.post_picture, photo_name)
+
+    async def post_plan_execution(self, status) -> Dict[str, Any]:
+        """Post a plan execution status."""
+        return await self.run_blocking(self.communicator.post_plan_execution, status)
+
+    async def get_water_level(self) -> Dict[str, Any]:
+        """Get a pending water level reset."""
+        return await self.run_blocking(self.communicator.get_water_level)
+
+    async def get_picture(self) -> Dict[str, Any]:
+        """Get a pending picture request."""
+        return await self.run_blocking(self.communicator.get_picture)
+
+    async def post_telemetry(self, status=None, water_level=None, moisture_level=None,
+                             heartbeat: bool = False) -> Dict[str, Any]:
+        """Post batched telemetry."""
+        return await self.run_blocking(self.communicator.post_telemetry, status=status, water_level=water_level,
+                                       moisture_level=moisture_level, heartbeat=heartbeat)
+
+    async def get_commands(self, timeout: float):
+        """Wait for queued commands."""
+        return await self.run_blocking(self.communicator.get_commands, timeout)
+
+    def return_emply_json(self) -> Dict[str, Any]:
+        """Return the empty response used by the wrapped communicator."""
+        return self.communicator.return_emply_json()
+
+    def close(self) -> None:
+        """Shut down the worker threads."""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,161 @@
+"""
+Circuit breaker for server communication.
+
+This module stops requests to a backend that is known to be down. After a
+number of consecutive failures the circuit opens and calls fail fast
+without touching the network. Once a jittered, exponentially growing
+delay has passed a single probe request is let through (half-open); its
+outcome closes the circuit again or reopens it with a longer delay.
+"""
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+# Defaults used when SERVER_CONFIG does not define a value
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 5
+DEFAULT_MAX_RESET_TIMEOUT = 300
+DEFAULT_JITTER = 0.5
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker with jittered exponential backoff.
+
+    Attributes:
+        failure_threshold: Consecutive failures that open the circuit
+        reset_timeout: Delay in seconds before the first probe
+        max_reset_timeout: Upper bound of the probe delay in seconds
+        jitter: Fraction of the delay that is randomized away
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 max_reset_timeout: float = DEFAULT_MAX_RESET_TIMEOUT, jitter: float = DEFAULT_JITTER,
+                 clock: Callable[[], float] = time.monotonic, rng: Callable[[], float] = random.random):
+        """
+        Initialize the circuit breaker in the closed state.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Delay in seconds before the first probe
+            max_reset_timeout: Upper bound of the probe delay in seconds
+            jitter: Fraction of the delay that is randomized away, between 0 and 1
+            clock: Monotonic clock returning seconds
+            rng: Random source returning values in [0, 1)
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.jitter = jitter
+        self._clock = clock
+        self._rng = rng
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._open_count = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+
+    @classmethod
+    def from_config(cls, server_config: Optional[Dict[str, Any]] = None) -> 'CircuitBreaker':
+        """
+        Create a circuit breaker from a SERVER_CONFIG dictionary.
+
+        Args:
+            server_config: Server configuration, missing keys fall back to defaults
+
+        Returns:
+            CircuitBreaker instance
+        """
+        server_config = server_config or {}
+        return cls(failure_threshold=server_config.get('breaker_failure_threshold', DEFAULT_FAILURE_THRESHOLD),
+                   reset_timeout=server_config.get('breaker_reset_timeout', DEFAULT_RESET_TIMEOUT),
+                   max_reset_timeout=server_config.get('breaker_max_reset_timeout', DEFAULT_MAX_RESET_TIMEOUT))
+
+    @property
+    def state(self) -> str:
+        """Current state, half-open once a probe is due."""
+        with self._lock:
+            if self._state == self.OPEN and self._clock() >= self._open_until:
+                return self.HALF_OPEN
+            return self._state
+
+    def is_open(self) -> bool:
+        """Return whether calls are currently short-circuited."""
+        return self.state == self.OPEN
+
+    def retry_in(self) -> float:
+        """Return the seconds until the next probe is allowed, 0 when not open."""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(self._open_until - self._clock(), 0.0)
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether a request may be sent.
+
+        While half-open only a single probe request is allowed at a time.
+
+        Returns:
+            True if the request may be sent
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() < self._open_until:
+                    return False
+                self._state = self.HALF_OPEN
+                logging.info("Circuit half-open, probing server")
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """Record a successful request and close the circuit."""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logging.info("Circuit closed, server reachable again")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._open_count = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit when the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN:
+                self._open()
+            elif self._state == self.CLOSED and self._failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self) -> None:
+        """Open the circuit for a jittered exponential delay."""
+        self._open_count += 1
+        delay = min(self.reset_timeout * 2 ** (self._open_count - 1), self.max_reset_timeout)
+        delay *= 1 - self.jitter * self._rng()
+        self._state = self.OPEN
+        self._open_until = self._clock() + delay
+        logging.warning(f"Circuit open after {self._failures} failures, next probe in {delay:.1f}s")
@@ -0,0 +1,221 @@
+"""
+Connection pool for server communication.
+
+This module provides a shared keep-alive HTTP session so consecutive calls
+to the backend reuse one TCP/TLS connection instead of opening a new one
+for every request.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from run.http_communicator.circuit_breaker import CircuitBreaker, CircuitOpenError
+from run.http_communicator.metrics import RequestMetrics
+from run.http_communicator.traffic import TrafficCounter
+
+# Defaults used when SERVER_CONFIG does not define a value
+DEFAULT_POOL_SIZE = 4
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTP adapter that counts every new TCP/TLS connection it establishes."""
+
+    def __init__(self, on_connect, **kwargs):
+        self._on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': self._counting_pool(HTTPConnectionPool, HTTPConnection),
+            'https': self._counting_pool(HTTPSConnectionPool, HTTPSConnection)
+        }
+
+    def _counting_pool(self, pool_cls, connection_cls):
+        on_connect = self._on_connect
+
+        class CountingConnection(connection_cls):
+            def connect(self):
+                super().connect()
+                on_connect()
+
+        return type(pool_cls.__name__, (pool_cls,), {'ConnectionCls': CountingConnection})
+
+
+class ConnectionPool:
+    """
+    Managed pool of keep-alive connections shared by all communicator calls.
+
+    The pool wraps a ``requests.Session`` with a mounted ``HTTPAdapter`` and
+    applies connect/read timeouts to every request. Every established
+    connection is counted, so reused connections are the requests that did
+    not need a new handshake. An optional circuit breaker fails requests
+    fast while the server is known to be down. Latency, status codes and
+    body bytes are recorded per endpoint.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, keep_alive: bool = True,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT, verify_ssl: bool = True,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
+        """
+        Initialize the connection pool.
+
+        Args:
+            pool_size: Maximum number of pooled connections per host
+            keep_alive: Whether connections are kept open between requests
+            connect_timeout: Timeout in seconds for establishing a connection
+            read_timeout: Timeout in seconds for reading a response
+            verify_ssl: Whether TLS certificates are verified
+            circuit_breaker: Breaker guarding every request, requests are never short-circuited if None
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.timeout = (connect_timeout, read_timeout)
+        self.circuit_breaker = circuit_breaker
+        self.traffic = TrafficCounter()
+        self.metrics = RequestMetrics()
+        self._lock = threading.Lock()
+        self._requests_sent = 0
+        self._connections_opened = 0
+
+        self.adapter = _CountingAdapter(self._count_connection, pool_connections=pool_size,
+                                        pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.verify = verify_ssl
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+        logging.info(f"Connection pool initialized: size={pool_size}, keep_alive={keep_alive}, "
+                     f"timeout={self.timeout}")
+
+    @classmethod
+    def from_config(cls, server_config: Optional[Dict[str, Any]] = None) -> 'ConnectionPool':
+        """
+        Create a connection pool from a SERVER_CONFIG dictionary.
+
+        Args:
+            server_config: Server configuration, missing keys fall back to defaults
+
+        Returns:
+            ConnectionPool instance
+        """
+        server_config = server_config or {}
+        return cls(pool_size=server_config.get('pool_size', DEFAULT_POOL_SIZE),
+                   keep_alive=server_config.get('keep_alive', True),
+                   connect_timeout=server_config.get('connect_timeout', DEFAULT_CONNECT_TIMEOUT),
+                   read_timeout=server_config.get('read_timeout',
+                                                  server_config.get('request_timeout', DEFAULT_READ_TIMEOUT)),
+                   verify_ssl=server_config.get('verify_ssl', True),
+                   circuit_breaker=CircuitBreaker.from_config(server_config))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Arguments passed to ``requests.Session.request``
+
+        Returns:
+            Server response
+            
+        Raises:
+            CircuitOpenError: If the circuit breaker short-circuits the request
+        """
+        endpoint = self.endpoint_name(url)
+        breaker = self.circuit_breaker
+        if breaker is not None and not breaker.allow_request():
+            self.metrics.observe(endpoint, None, 'circuit_open')
+            raise CircuitOpenError(f"Circuit open, server skipped for another {breaker.retry_in():.1f}s")
+
+        kwargs.setdefault('timeout', self.timeout)
+        with self._lock:
+            self._requests_sent += 1
+        started = time.monotonic()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except Exception:
+            self.metrics.observe(endpoint, time.monotonic() - started, 'error')
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+
+        bytes_out, bytes_in = self.traffic.record_response(endpoint, response)
+        self.metrics.observe(endpoint, time.monotonic() - started, response.status_code, bytes_out, bytes_in)
+        if breaker is not None:
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request through the pooled session."""
+        return self.request('GET', url, **kwargs)
+
+    def _count_connection(self) -> None:
+        """Record a newly established connection."""
+        with self._lock:
+            self._connections_opened += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get connection usage counters.
+
+        Returns:
+            Dictionary with requests sent, connections opened and connections reused
+        """
+        with self._lock:
+            return {
+                'requests': self._requests_sent,
+                'connections_opened': self._connections_opened,
+                'connections_reused': max(self._requests_sent - self._connections_opened, 0)
+            }
+
+    @staticmethod
+    def endpoint_name(url: str) -> str:
+        """Return the endpoint name of a request URL, its last path segment."""
+        return urlsplit(url).path.rsplit('/', 1)[-1]
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get request metrics per endpoint.
+
+        Returns:
+            Dictionary keyed by endpoint, see RequestMetrics.snapshot
+        """
+        return self.metrics.snapshot()
+
+    def get_traffic_report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get body byte counters per endpoint.
+
+        Returns:
+            Dictionary keyed by endpoint, see TrafficCounter.report
+        """
+        return self.traffic.report()
+
+    def is_available(self) -> bool:
+        """Return whether requests are currently let through to the server."""
+        return self.circuit_breaker is None or not self.circuit_breaker.is_open()
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+        logging.info("Connection pool closed")
@@ -0,0 +1,54 @@
+"""
+Endpoint registry for server communication.
+
+This module builds the request URLs of the backend once, so requests do
+not format and log their URL every cycle and the communicator can be
+created without any network access.
+"""
+import logging
+from typing import Dict, Iterable
+
+
+class EndpointRegistry:
+    """
+    Registry of fully built endpoint URLs.
+
+    Attributes:
+        base_url: URL prefix shared by all endpoints
+    """
+
+    def __init__(self, protocol: str, host: str, port: str, base_path: str, endpoints: Iterable[str] = ()):
+        """
+        Initialize the registry and build the URLs of the given endpoints.
+
+        Args:
+            protocol: URL scheme, e.g. https
+            host: Server host name or IP address
+            port: Server port
+            base_path: Path prefix of the API
+            endpoints: Endpoint names whose URLs are built up front
+        """
+        self.base_url = f'{protocol}://{host}:{port}/{base_path}'
+        self._urls: Dict[str, str] = {}
+        for endpoint in endpoints:
+            self.url(endpoint)
+        logging.info(f"Endpoint registry initialized for {self.base_url} with {len(self._urls)} endpoints")
+
+    def url(self, endpoint: str) -> str:
+        """
+        Get the URL of an endpoint, building it on first use.
+
+        Args:
+            endpoint: Endpoint name, e.g. getPlan
+
+        Returns:
+            Full request URL
+        """
+        url = self._urls.get(endpoint)
+        if url is None:
+            url = self._urls[endpoint] = f'{self.base_url}/{endpoint}'
+        return url
+
+    def urls(self) -> Dict[str, str]:
+        """Return a copy of all built URLs keyed by endpoint name."""
+        return dict(self._urls)
@@ -0,0 +1,251 @@
+"""
+Request metrics for server communication.
+
+This module keeps per-endpoint latency histograms, status code counts,
+body bytes and retry counts. Metrics are available as a plain snapshot
+dictionary and in the Prometheus text exposition format.
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# Upper bounds of the latency buckets in seconds, Prometheus defaults extended for slow uploads
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEFAULT_PREFIX = 'waterplant_http'
+
+
+class LatencyHistogram:
+    """
+    Cumulative latency histogram with fixed bucket bounds.
+
+    Quantiles are estimated as the upper bound of the bucket containing
+    them, which is exact enough to tell a slow endpoint from a fast one.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            buckets: Ascending bucket upper bounds in seconds
+        """
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Add one latency sample."""
+        self._counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a latency quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Upper bound of the bucket holding the quantile, the maximum for the overflow bucket
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self._counts[:-1]):
+            seen += count
+            if seen >= rank:
+                return min(self.buckets[index], self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return count, sum, max, p50/p95 and cumulative bucket counts."""
+        cumulative = []
+        seen = 0
+        for bound, count in zip(self.buckets, self._counts):
+            seen += count
+            cumulative.append((bound, seen))
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': cumulative
+        }
+
+
+class RequestMetrics:
+    """
+    Thread-safe per-endpoint request metrics.
+
+    Attributes:
+        buckets: Latency bucket upper bounds in seconds
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialize empty metrics.
+
+        Args:
+            buckets: Latency bucket upper bounds in seconds
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+
+    def _endpoint(self, endpoint: str) -> Dict[str, Any]:
+        """Get the metrics of an endpoint, creating them on first use. Caller holds the lock."""
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = {
+                'latency': LatencyHistogram(self.buckets), 'status': {}, 'bytes_in': 0, 'bytes_out': 0, 'retries': 0
+            }
+        return metrics
+
+    def observe(self, endpoint: str, seconds: Optional[float], status: Any, bytes_out: int = 0,
+                bytes_in: int = 0) -> None:
+        """
+        Record one finished request.
+
+        Args:
+            endpoint: Endpoint name, e.g. getPlan
+            seconds: Request latency, not added to the histogram if None
+            status: HTTP status code or a failure label such as 'error'
+            bytes_out: Body bytes sent
+            bytes_in: Body bytes received
+        """
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            if seconds is not None:
+                metrics['latency'].observe(seconds)
+            status = str(status)
+            metrics['status'][status] = metrics['status'].get(status, 0) + 1
+            metrics['bytes_out'] += bytes_out
+            metrics['bytes_in'] += bytes_in
+
+    def record_retry(self, endpoint: str) -> None:
+        """Record that a request to an endpoint was sent again."""
+        with self._lock:
+            self._endpoint(endpoint)['retries'] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get a copy of all metrics.
+
+        Returns:
+            Dictionary keyed by endpoint with latency histogram, status counts,
+            bytes in/out and retries
+        """
+        with self._lock:
+            return {endpoint: {'latency': metrics['latency'].snapshot(),
+                               'status': dict(metrics['status']),
+                               'bytes_in': metrics['bytes_in'],
+                               'bytes_out': metrics['bytes_out'],
+                               'retries': metrics['retries']}
+                    for endpoint, metrics in self._endpoints.items()}
+
+    def to_prometheus(self, prefix: str = DEFAULT_PREFIX) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        return render_prometheus(self.snapshot(), prefix)
+
+
+def render_prometheus(snapshot: Dict[str, Dict[str, Any]], prefix: str = DEFAULT_PREFIX) -> str:
+    """
+    Render a metrics snapshot in the Prometheus text exposition format.
+
+    Args:
+        snapshot: Snapshot as returned by RequestMetrics.snapshot
+        prefix: Metric name prefix
+
+    Returns:
+        Exposition text
+    """
+    lines = [f'# HELP {prefix}_request_duration_seconds Request latency per endpoint',
+             f'# TYPE {prefix}_request_duration_seconds histogram']
+    for endpoint, metrics in sorted(snapshot.items()):
+        latency = metrics['latency']
+        for bound, count in latency['buckets']:
+            lines.append(f'{prefix}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+        lines.append(f'{prefix}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} '
+                     f'{latency["count"]}')
+        lines.append(f'{prefix}_request_duration_seconds_sum{{endpoint="{endpoint}"}} {latency["sum"]}')
+        lines.append(f'{prefix}_request_duration_seconds_count{{endpoint="{endpoint}"}} {latency["count"]}')
+
+    lines += [f'# HELP {prefix}_responses_total Responses per endpoint and status',
+              f'# TYPE {prefix}_responses_total counter']
+    for endpoint, metrics in sorted(snapshot.items()):
+        for status, count in sorted(metrics['status'].items()):
+            lines.append(f'{prefix}_responses_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+    for name, key, help_text in (('sent_bytes_total', 'bytes_out', 'Body bytes sent per endpoint'),
+                                 ('received_bytes_total', 'bytes_in', 'Body bytes received per endpoint'),
+                                 ('retries_total', 'retries', 'Retried requests per endpoint')):
+        lines += [f'# HELP {prefix}_{name} {help_text}', f'# TYPE {prefix}_{name} counter']
+        for endpoint, metrics in sorted(snapshot.items()):
+            lines.append(f'{prefix}_{name}{{endpoint="{endpoint}"}} {metrics[key]}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsReporter:
+    """
+    Background thread writing metrics snapshots to a JSON file.
+
+    Deployments without an HTTP server can read the file, which is replaced
+    atomically so readers never see a partial snapshot.
+    """
+
+    def __init__(self, snapshot: Callable[[], Dict[str, Any]], path: str, interval: float = 60):
+        """
+        Initialize the reporter.
+
+        Args:
+            snapshot: Callable returning the snapshot to write
+            path: Path of the JSON file
+            interval: Seconds between two snapshots
+        """
+        self.snapshot = snapshot
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        """Write one snapshot."""
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w') as snapshot_file:
+            json.dump(self.snapshot(), snapshot_file, indent=2, default=str)
+        os.replace(temp_path, self.path)
+
+    def start(self) -> None:
+        """Start writing snapshots periodically."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='metrics-reporter', daemon=True)
+        self._thread.start()
+        logging.info(f"Metrics reporter writing to {self.path} every {self.interval}s")
+
+    def stop(self) -> None:
+        """Stop the reporter after writing a last snapshot."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        """Write snapshots until stopped."""
+        while not self._stop.wait(self.interval):
+            self._write_logged()
+        self._write_logged()
+
+    def _write_logged(self) -> None:
+        """Write a snapshot, logging instead of raising errors."""
+        try:
+            self.write()
+        except (OSError, TypeError, ValueError) as e:
+            logging.error(f"Failed to write metrics snapshot: {e}")
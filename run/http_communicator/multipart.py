@@ -0,0 +1,114 @@
+"""
+Streaming multipart encoder for file uploads.
+
+This module builds a multipart/form-data body that is read from disk in
+fixed-size chunks while it is sent, so large photos never have to be held
+in memory as a whole.
+"""
+import os
+import uuid
+from typing import Dict, List, Optional
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class MultipartFileStream:
+    """
+    File-like multipart/form-data body with a known length.
+
+    The body consists of the form fields, one file part and the closing
+    boundary. ``read`` hands out the encoded parts in order and streams the
+    file content chunk by chunk, so the HTTP client can send it without
+    buffering the whole payload.
+    """
+
+    def __init__(self, fields: Dict[str, str], file_field: str, file_path: str,
+                 content_type: str = 'application/octet-stream', chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 boundary: Optional[str] = None):
+        """
+        Initialize the multipart stream.
+
+        Args:
+            fields: Plain form fields sent before the file part
+            file_field: Form field name of the file part
+            file_path: Path of the file to upload
+            content_type: Content type of the file part
+            chunk_size: Number of bytes read from the file at a time
+            boundary: Multipart boundary, generated when not provided
+        """
+        self.boundary = boundary or uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self.file_path = file_path
+        self.file_size = os.path.getsize(file_path)
+
+        self._head = self._encode_head(fields, file_field, os.path.basename(file_path), content_type)
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode()
+        self._parts: List = [self._head, None, self._tail]
+        self._part_index = 0
+        self._part_offset = 0
+        self._file = None
+        self.bytes_read = 0
+
+    @property
+    def content_type(self) -> str:
+        """Content-Type header value including the boundary."""
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def _encode_head(self, fields: Dict[str, str], file_field: str, file_name: str, content_type: str) -> bytes:
+        """Encode the form fields and the file part header."""
+        lines = []
+        for name, value in fields.items():
+            lines.append(f'--{self.boundary}\r\n'
+                         f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                         f'{value}\r\n')
+        lines.append(f'--{self.boundary}\r\n'
+                     f'Content-Disposition: form-data; name="{file_field}"; filename="{file_name}"\r\n'
+                     f'Content-Type: {content_type}\r\n\r\n')
+        return ''.join(lines).encode()
+
+    def __len__(self) -> int:
+        """Total length of the encoded body in bytes."""
+        return len(self._head) + self.file_size + len(self._tail)
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read the next chunk of the encoded body.
+
+        Args:
+            size: Maximum number of bytes to return, chunk size when negative
+
+        Returns:
+            Next chunk of the body, empty bytes at the end
+        """
+        if size is None or size < 0:
+            size = self.chunk_size
+
+        while self._part_index < len(self._parts):
+            part = self._parts[self._part_index]
+            if part is None:
+                chunk = self._read_file(size)
+            else:
+                chunk = part[self._part_offset:self._part_offset + size]
+                self._part_offset += len(chunk)
+
+            if chunk:
+                self.bytes_read += len(chunk)
+                return chunk
+
+            self._part_index += 1
+            self._part_offset = 0
+        return b''
+
+    def _read_file(self, size: int) -> bytes:
+        """Read the next chunk of the file, closing it once exhausted."""
+        if self._file is None:
+            self._file = open(self.file_path, 'rb')
+        chunk = self._file.read(min(size, self.chunk_size))
+        if not chunk:
+            self.close()
+        return chunk
+
+    def close(self) -> None:
+        """Close the underlying file."""
+        if self._file is not None and not self._file.closed:
+            self._file.close()
@@ -0,0 +1,269 @@
+"""
+Durable outbox for telemetry sent to the server.
+
+Every outbound record is first written to an SQLite database in WAL mode
+and removed once the server has taken it. Records that could not be
+delivered stay on disk and are replayed by a background drainer with
+exponential backoff once the server is reachable again.
+
+The control loop only appends to the write-ahead log. WAL checkpoints,
+the only step that syncs the database file, run on the drainer thread.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Defaults used when SERVER_CONFIG does not define a value
+DEFAULT_MAX_RECORDS = 10000
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_RETRY_DELAY = 5
+DEFAULT_MAX_RETRY_DELAY = 300
+DEFAULT_IDLE_INTERVAL = 30
+
+
+class Outbox:
+    """
+    Bounded disk-backed queue of outbound records.
+
+    Attributes:
+        path: Path of the SQLite database
+        max_records: Maximum number of stored records, oldest are dropped first
+        batch_size: Maximum number of records replayed per drain pass
+    """
+
+    def __init__(self, path: str, max_records: int = DEFAULT_MAX_RECORDS, batch_size: int = DEFAULT_BATCH_SIZE,
+                 retry_delay: float = DEFAULT_RETRY_DELAY, max_retry_delay: float = DEFAULT_MAX_RETRY_DELAY,
+                 idle_interval: float = DEFAULT_IDLE_INTERVAL):
+        """
+        Initialize the outbox and create its database if needed.
+
+        Args:
+            path: Path of the SQLite database
+            max_records: Maximum number of stored records
+            batch_size: Maximum number of records replayed per drain pass
+            retry_delay: First backoff delay in seconds after a failed replay
+            max_retry_delay: Upper bound of the backoff delay in seconds
+            idle_interval: Seconds between drain passes while nothing fails
+        """
+        if max_records < 1:
+            raise ValueError("max_records must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.path = path
+        self.max_records = max_records
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.idle_interval = idle_interval
+
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._drainer: Optional[threading.Thread] = None
+        self._checkpoint_connection: Optional[sqlite3.Connection] = None
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = self._connect()
+        self._connection.execute('CREATE TABLE IF NOT EXISTS outbox ('
+                                 'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                                 'kind TEXT NOT NULL, '
+                                 'payload TEXT NOT NULL, '
+                                 'created_at REAL NOT NULL)')
+        self._connection.commit()
+        logging.info(f"Outbox opened at {path} with {self.pending()} pending records")
+
+    @classmethod
+    def from_config(cls, path: str, server_config: Optional[Dict[str, Any]] = None) -> 'Outbox':
+        """
+        Create an outbox from a SERVER_CONFIG dictionary.
+
+        Args:
+            path: Path of the SQLite database
+            server_config: Server configuration, missing keys fall back to defaults
+
+        Returns:
+            Outbox instance
+        """
+        server_config = server_config or {}
+        return cls(path,
+                   max_records=server_config.get('outbox_max_records', DEFAULT_MAX_RECORDS),
+                   batch_size=server_config.get('outbox_batch_size', DEFAULT_BATCH_SIZE),
+                   retry_delay=server_config.get('retry_delay', DEFAULT_RETRY_DELAY),
+                   max_retry_delay=server_config.get('outbox_max_retry_delay', DEFAULT_MAX_RETRY_DELAY))
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection in WAL mode without automatic checkpoints."""
+        connection = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute('PRAGMA wal_autocheckpoint=0')
+        return connection
+
+    def put(self, kind: str, payload: Dict[str, Any], in_flight: bool = False) -> int:
+        """
+        Append a record to the outbox.
+
+        Args:
+            kind: Record kind used to route the replay
+            payload: JSON serializable record content
+            in_flight: Whether the caller is sending the record right now
+
+        Returns:
+            Id of the stored record
+        """
+        with self._lock:
+            cursor = self._connection.execute('INSERT INTO outbox (kind, payload, created_at) VALUES (?, ?, ?)',
+                                              (kind, json.dumps(payload), time.time()))
+            record_id = cursor.lastrowid
+            dropped = self._connection.execute('DELETE FROM outbox WHERE id <= ?',
+                                               (record_id - self.max_records,)).rowcount
+            self._connection.commit()
+            if in_flight:
+                self._in_flight.add(record_id)
+
+        if dropped:
+            logging.warning(f"Outbox full, dropped {dropped} oldest records")
+        return record_id
+
+    def ack(self, record_id: int) -> None:
+        """
+        Remove a delivered record.
+
+        Args:
+            record_id: Id of the delivered record
+        """
+        with self._lock:
+            self._connection.execute('DELETE FROM outbox WHERE id = ?', (record_id,))
+            self._connection.commit()
+            self._in_flight.discard(record_id)
+
+    def release(self, record_id: int) -> None:
+        """
+        Hand an undelivered in-flight record over to the drainer.
+
+        Args:
+            record_id: Id of the record that could not be delivered
+        """
+        with self._lock:
+            self._in_flight.discard(record_id)
+
+    def pending(self) -> int:
+        """Return the number of stored records."""
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+    def peek(self, limit: int) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """
+        Get the oldest records that are not in flight.
+
+        Args:
+            limit: Maximum number of records
+
+        Returns:
+            List of (id, kind, payload) tuples, oldest first
+        """
+        with self._lock:
+            rows = self._connection.execute('SELECT id, kind, payload FROM outbox ORDER BY id LIMIT ?',
+                                            (limit + len(self._in_flight),)).fetchall()
+            in_flight = set(self._in_flight)
+        records = [(record_id, kind, json.loads(payload)) for record_id, kind, payload in rows
+                   if record_id not in in_flight]
+        return records[:limit]
+
+    def drain_once(self, send: Callable[[str, Dict[str, Any]], bool]) -> Tuple[int, bool]:
+        """
+        Replay one batch of records, oldest first.
+
+        The batch stops at the first record that cannot be delivered so
+        records keep their order.
+
+        Args:
+            send: Callable delivering (kind, payload), returns True on delivery
+
+        Returns:
+            Tuple of (number of delivered records, whether a delivery failed)
+        """
+        delivered = 0
+        for record_id, kind, payload in self.peek(self.batch_size):
+            try:
+                is_delivered = send(kind, payload)
+            except Exception as e:
+                logging.error(f"Outbox replay of record {record_id} failed: {e}")
+                is_delivered = False
+            if not is_delivered:
+                return delivered, True
+            self.ack(record_id)
+            delivered += 1
+        return delivered, False
+
+    def checkpoint(self) -> None:
+        """
+        Copy the write-ahead log into the database file.
+
+        The checkpoint uses its own connection and does not take the outbox
+        lock, so appends from the control loop never wait for it.
+        """
+        if self._checkpoint_connection is None:
+            self._checkpoint_connection = self._connect()
+        self._checkpoint_connection.execute('PRAGMA wal_checkpoint(PASSIVE)')
+
+    def wake(self) -> None:
+        """Make the drainer run its next pass immediately."""
+        self._wake.set()
+
+    def start_drainer(self, send: Callable[[str, Dict[str, Any]], bool]) -> None:
+        """
+        Start the background thread replaying stored records.
+
+        Args:
+            send: Callable delivering (kind, payload), returns True on delivery
+        """
+        if self._drainer is not None and self._drainer.is_alive():
+            return
+        self._stop.clear()
+        self._drainer = threading.Thread(target=self._drain_loop, args=(send,), name='outbox-drainer', daemon=True)
+        self._drainer.start()
+        logging.info("Outbox drainer started")
+
+    def stop_drainer(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background drainer.
+
+        Args:
+            timeout: Seconds to wait for the drainer thread to finish
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._drainer is not None:
+            self._drainer.join(timeout)
+        logging.info("Outbox drainer stopped")
+
+    def _drain_loop(self, send: Callable[[str, Dict[str, Any]], bool]) -> None:
+        """Replay records until stopped, backing off while delivery fails."""
+        backoff = 0
+        while not self._stop.is_set():
+            delivered, failed = self.drain_once(send)
+            if failed:
+                backoff = min(backoff * 2 if backoff else self.retry_delay, self.max_retry_delay)
+                delay = backoff
+                logging.info(f"Outbox replay failed, retrying in {delay}s")
+            else:
+                backoff = 0
+                delay = 0 if delivered == self.batch_size else self.idle_interval
+            self.checkpoint()
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def close(self) -> None:
+        """Stop the drainer, checkpoint and close the database."""
+        self.stop_drainer()
+        self.checkpoint()
+        self._checkpoint_connection.close()
+        with self._lock:
+            self._connection.close()
@@ -1,11 +1,16 @@
-import socket
+import gzip
+import json
+import time
 import logging
 import http as h
 import requests
 import run.common.json_creator as jc
 import run.common.file as f
+import run.model.status as st
 from run.operation.camera_op import CAMERA_FORMAT
-import os
+from run.http_communicator.connection_pool import ConnectionPool
+from run.http_communicator.multipart import MultipartFileStream
+from run.http_communicator.endpoints import EndpointRegistry
 
 
 class IServerCommunicatorInterface:
@@ -34,6 +39,14 @@ class IServerCommunicatorInterface:
     def get_water_level(self, status):
         pass
 
+    # postTelemetry
+    def post_telemetry(self, status=None, water_level=None, moisture_level=None, heartbeat=False):
+        pass
+
+    # getCommands
+    def get_commands(self, timeout):
+        pass
+
 
 class ServerCommunicator(IServerCommunicatorInterface):
     GET_PLAN_URL = 'getPlan'
@@ -43,33 +56,82 @@ class ServerCommunicator(IServerCommunicatorInterface):
     GET_PICTURE = 'getPhoto'
     POST_STATUS = 'postStatus'
     GET_WATER = 'getWaterLevel'
+    POST_TELEMETRY = 'postTelemetry'
+    GET_COMMANDS = 'getCommands'
+    ENDPOINTS = (GET_PLAN_URL, POST_WATER_URL, POST_MOISTURE_URL, POST_PICTURE, GET_PICTURE, POST_STATUS, GET_WATER,
+                 POST_TELEMETRY, GET_COMMANDS)
+    ENDPOINT_READ_TIMEOUTS = {
+        GET_PLAN_URL: 10,
+        GET_PICTURE: 10,
+        GET_WATER: 10,
+        POST_WATER_URL: 10,
+        POST_MOISTURE_URL: 10,
+        POST_STATUS: 10,
+        POST_TELEMETRY: 10,
+        POST_PICTURE: 60
+    }
+    COMMANDS_KEY = 'commands'
+    LONG_POLL_GRACE = 5
+    RECORD_STATUS = 'status'
+    RECORD_WATER = 'water'
+    RECORD_MOISTURE = 'moisture'
+    RECORD_TELEMETRY = 'telemetry'
+    RECORD_PICTURE = 'picture'
+    RECORD_ENDPOINTS = {
+        RECORD_STATUS: (POST_STATUS, 'Status posted'),
+        RECORD_WATER: (POST_WATER_URL, 'Water posted'),
+        RECORD_MOISTURE: (POST_MOISTURE_URL, 'Moisture level posted')
+    }
+    IF_NONE_MATCH_HEADER = 'If-None-Match'
+    GZIP_ENCODING = 'gzip'
+    GZIP_MIN_BYTES = 512
+    ETAG_HEADER = 'ETag'
     IMAGE_PATH = '/tmp/image.png'
+    IMAGE_FILE_FIELD = 'image_file'
+    IMAGE_CONTENT_TYPE = 'image/jpeg'
     APP_MASTER_URL = 'gadget_communicator_pull'
     PROTOCOL = 'https'
     PORT = '444'
     IP_ADDRESS = 'wmeautomation.de'
 
-    def __init__(self, device_guid, photos_dir):
+    def __init__(self, device_guid, photos_dir, server_config=None, connection_pool=None, outbox=None):
         self.device_guid = device_guid
-        self.water_server_ip = self.get_ip_address()
+        self.water_server_ip = self.IP_ADDRESS
+        self.endpoints = EndpointRegistry(self.PROTOCOL, self.water_server_ip, self.PORT, self.APP_MASTER_URL,
+                                          self.ENDPOINTS)
         self.photos_dir = photos_dir
+        self.connection_pool = connection_pool or ConnectionPool.from_config(server_config)
+        self.endpoint_timeouts = self.build_endpoint_timeouts(server_config)
+        self.gzip_requests = (server_config or {}).get('gzip_requests', False)
+        self.gzip_min_bytes = (server_config or {}).get('gzip_min_bytes', self.GZIP_MIN_BYTES)
+        self.last_upload = None
+        self.plan_etag = None
+        self.telemetry_batch_supported = True
+        self.command_channel_supported = True
+        self.outbox = outbox
+        self.delivery_failed = False
         IServerCommunicatorInterface.__init__(self)
 
     def get_plan(self):
-        request_url = self.build_ulr_for_request(self.PROTOCOL, self.water_server_ip, self.GET_PLAN_URL)
+        request_url = self.endpoints.url(self.GET_PLAN_URL)
         device_json = {'device': self.device_guid}
+        headers = {self.IF_NONE_MATCH_HEADER: self.plan_etag} if self.plan_etag else {}
         response = None
         payload = ""
         try:
-            response = requests.get(request_url, data=payload, params=device_json)
+            response = self.connection_pool.get(request_url, data=payload, params=device_json, headers=headers,
+                                                timeout=self.timeout_for(self.GET_PLAN_URL))
             logging.info(response.url)
-            if response.status_code == h.HTTPStatus.NO_CONTENT:
+            if response.status_code == h.HTTPStatus.NOT_MODIFIED:
+                logging.debug(f'Plan unchanged: {response.status_code}')
+            elif response.status_code == h.HTTPStatus.NO_CONTENT:
                 logging.info(f'No new plan in queue: {response.status_code}')
             elif response.status_code == h.HTTPStatus.FORBIDDEN:
                 logging.info(f'Device not registered: {response.status_code}')
             elif response.status_code == h.HTTPStatus.OK:
                 logging.info(f'New plan found: {response.status_code}')
                 json_response = response.json()
+                self.plan_etag = response.headers.get(self.ETAG_HEADER)
                 logging.info(f'Response: {json_response}')
                 return json_response
             else:
@@ -83,19 +145,27 @@ class ServerCommunicator(IServerCommunicatorInterface):
         if response is not None:
             logging.info(response.text)
 
-    def post_water(self, water_level):
-        request_url = self.build_ulr_for_request(self.PROTOCOL, self.water_server_ip, self.POST_WATER_URL)
-        payload = {'device': self.device_guid, 'water_level': water_level}
-        headers = {"Content-Type": "application/json"}
+    def record_upload(self, bytes_sent, elapsed_seconds):
+        throughput = bytes_sent / elapsed_seconds if elapsed_seconds > 0 else 0.0
+        self.last_upload = {'bytes': bytes_sent, 'seconds': elapsed_seconds, 'bytes_per_second': throughput}
+        logging.info(f'Uploaded {bytes_sent} bytes in {elapsed_seconds:.3f}s ({throughput:.0f} bytes/s)')
+
+    def get_picture(self):
+        request_url = self.endpoints.url(self.GET_PICTURE)
+        device_json = {'device': self.device_guid}
         response = None
         try:
-            response = requests.request("POST", request_url, json=payload, headers=headers)
+            response = self.connection_pool.get(request_url, params=device_json,
+                                                timeout=self.timeout_for(self.GET_PICTURE))
             logging.info(response.url)
-            if response.status_code == h.HTTPStatus.FORBIDDEN:
+            if response.status_code == h.HTTPStatus.NO_CONTENT:
+                logging.info(f'No new picture in queue: {response.status_code}')
+            elif response.status_code == h.HTTPStatus.FORBIDDEN:
                 logging.info(f'Device not registered: {response.status_code}')
-            elif response.status_code == h.HTTPStatus.CREATED:
-                logging.info(f'Water posted: {response.status_code}')
+            elif response.status_code == h.HTTPStatus.OK:
+                logging.info(f'New picture for capture: {response.status_code}')
                 json_response = response.json()
+                logging.info(f'Response: {json_response}')
                 return json_response
             else:
                 logging.info(f'response: {response.status_code}')
@@ -104,19 +174,22 @@ class ServerCommunicator(IServerCommunicatorInterface):
             self.print_respose(response)
         return self.return_emply_json()
 
-    def post_moisture(self, moisture_level):
-        request_url = self.build_ulr_for_request(self.PROTOCOL, self.water_server_ip, self.POST_MOISTURE_URL)
-        payload = {'device': self.device_guid, 'moisture_level': moisture_level}
-        headers = {"Content-Type": "application/json"}
+    def get_water_level(self):
+        request_url = self.endpoints.url(self.GET_WATER)
+        device_json = {'device': self.device_guid}
         response = None
         try:
-            response = requests.request("POST", request_url, json=payload, headers=headers)
+            response = self.connection_pool.get(request_url, params=device_json,
+                                                timeout=self.timeout_for(self.GET_WATER))
             logging.info(response.url)
-            if response.status_code == h.HTTPStatus.FORBIDDEN:
+            if response.status_code == h.HTTPStatus.NO_CONTENT:
+                logging.info(f'No water reset in queue: {response.status_code}')
+            elif response.status_code == h.HTTPStatus.FORBIDDEN:
                 logging.info(f'Device not registered: {response.status_code}')
-            elif response.status_code == h.HTTPStatus.CREATED:
-                logging.info(f'Moisture level posted: {response.status_code}')
+            elif response.status_code == h.HTTPStatus.OK:
+                logging.info(f'Reset water: {response.status_code}')
                 json_response = response.json()
+                logging.info(f'Response: {json_response}')
                 return json_response
             else:
                 logging.info(f'response: {response.status_code}')
@@ -125,104 +198,233 @@ class ServerCommunicator(IServerCommunicatorInterface):
             self.print_respose(response)
         return self.return_emply_json()
 
-    def post_picture(self, photo_name):
-        request_url = self.build_ulr_for_request(self.PROTOCOL, self.water_server_ip, self.POST_PICTURE)
-        photo_path = f'{self.photos_dir}/{photo_name}{CAMERA_FORMAT}'
-
-        try:
-            os.system(f"curl --request POST \
-              --url {request_url} \
-              --header 'Content-Type: multipart/form-data; boundary=---011000010111000001101001' \
-              --form image_file=@{photo_path} \
-              --form device_id={self.device_guid} \
-              --form photo_id={photo_name}")
-        except requests.exceptions.RequestException as e:
-            logging.info(f'exception with server {str(e)}')
-
-    def get_picture(self):
-        request_url = self.build_ulr_for_request(self.PROTOCOL, self.water_server_ip, self.GET_PICTURE)
-        device_json = {'device': self.device_guid}
+    # blocks server side until a command is queued, None means the caller has to poll the single endpoints
+    def get_commands(self, timeout):
+        if not self.command_channel_supported:
+            return None
+        request_url = self.endpoints.url(self.GET_COMMANDS)
+        device_json = {'device': self.device_guid, 'timeout': timeout}
+        request_timeout = (self.connection_pool.timeout[0], timeout + self.LONG_POLL_GRACE)
         response = None
         try:
-            response = requests.get(request_url, params=device_json)
-            logging.info(response.url)
+            response = self.connection_pool.get(request_url, params=device_json, timeout=request_timeout)
             if response.status_code == h.HTTPStatus.NO_CONTENT:
-                logging.info(f'No new picture in queue: {response.status_code}')
-            elif response.status_code == h.HTTPStatus.FORBIDDEN:
-                logging.info(f'Device not registered: {response.status_code}')
+                logging.debug(f'No command within {timeout}s: {response.status_code}')
+                return []
             elif response.status_code == h.HTTPStatus.OK:
-                logging.info(f'New picture for capture: {response.status_code}')
-                json_response = response.json()
-                logging.info(f'Response: {json_response}')
-                return json_response
+                commands = response.json().get(self.COMMANDS_KEY, [])
+                logging.info(f'Commands received: {commands}')
+                return commands
+            elif response.status_code == h.HTTPStatus.NOT_FOUND:
+                logging.info('Command channel not supported, polling single endpoints')
+                self.command_channel_supported = False
             else:
                 logging.info(f'response: {response.status_code}')
         except requests.exceptions.RequestException as e:
             logging.info(f'exception with server {str(e)}')
             self.print_respose(response)
-        return self.return_emply_json()
+        return None
+
+    def post_water(self, water_level):
+        return self.deliver(self.RECORD_WATER, {'water_level': water_level})
+
+    def post_moisture(self, moisture_level):
+        return self.deliver(self.RECORD_MOISTURE, {'moisture_level': moisture_level})
 
     def post_plan_execution(self, status):
-        request_url = self.build_ulr_for_request(self.PROTOCOL, self.water_server_ip, self.POST_STATUS)
-        payload = {'device': self.device_guid, 'execution_status': status.watering_status, 'message': status.message}
-        headers = {"Content-Type": "application/json"}
+        return self.deliver(self.RECORD_STATUS, {'execution_status': status.watering_status,
+                                                 'message': status.message})
+
+    def post_picture(self, photo_name):
+        return self.deliver(self.RECORD_PICTURE, {'photo_id': photo_name})
+
+    def post_telemetry(self, status=None, water_level=None, moisture_level=None, heartbeat=False):
+        record = {'heartbeat': heartbeat}
+        if status is not None:
+            record['execution_status'] = status.watering_status
+            record['message'] = status.message
+        if water_level is not None:
+            record['water_level'] = water_level
+        if moisture_level is not None:
+            record['moisture_level'] = moisture_level
+        return self.deliver(self.RECORD_TELEMETRY, record)
+
+    # every outbound record is stored in the outbox until the server has taken it
+    def deliver(self, kind, record):
+        if self.outbox is None:
+            return self.send_record(kind, record)[1]
+
+        record_id = self.outbox.put(kind, record, in_flight=True)
+        delivered, json_response = self.send_record(kind, record)
+        if delivered:
+            self.outbox.ack(record_id)
+            if self.delivery_failed:
+                self.outbox.wake()
+        else:
+            self.outbox.release(record_id)
+        self.delivery_failed = not delivered
+        return json_response
+
+    def replay_record(self, kind, record):
+        self.connection_pool.metrics.record_retry(self.record_endpoint(kind))
+        return self.send_record(kind, record)[0]
+
+    def record_endpoint(self, kind):
+        if kind == self.RECORD_PICTURE:
+            return self.POST_PICTURE
+        if kind == self.RECORD_TELEMETRY:
+            return self.POST_TELEMETRY
+        return self.RECORD_ENDPOINTS[kind][0]
+
+    def start_outbox_drainer(self):
+        if self.outbox is not None:
+            self.outbox.start_drainer(self.replay_record)
+
+    def send_record(self, kind, record):
+        if kind == self.RECORD_PICTURE:
+            return self.send_picture(record['photo_id'])
+        if kind == self.RECORD_TELEMETRY:
+            return self.send_telemetry(record)
+        endpoint, description = self.RECORD_ENDPOINTS[kind]
+        status_code, json_response = self.post_json(endpoint, record, description)
+        return self.is_delivered(status_code), json_response
+
+    def post_json(self, endpoint, record, description):
+        request_url = self.endpoints.url(endpoint)
+        payload = {'device': self.device_guid, **record}
+        body = self.encode_json(payload)
         response = None
         try:
-            response = requests.request("POST", request_url, json=payload, headers=headers)
+            response = self.connection_pool.request("POST", request_url, **body, timeout=self.timeout_for(endpoint))
             logging.info(response.url)
+            if response.status_code == h.HTTPStatus.UNSUPPORTED_MEDIA_TYPE and 'data' in body:
+                logging.info(f'Compressed bodies not supported, sending uncompressed: {response.status_code}')
+                self.gzip_requests = False
+                self.connection_pool.metrics.record_retry(endpoint)
+                return self.post_json(endpoint, record, description)
             if response.status_code == h.HTTPStatus.FORBIDDEN:
                 logging.info(f'Device not registered: {response.status_code}')
             elif response.status_code == h.HTTPStatus.CREATED:
-                logging.info(f'Status posted: {response.status_code}')
+                logging.info(f'{description}: {response.status_code}')
                 json_response = response.json()
-                return json_response
+                return response.status_code, json_response
             else:
                 logging.info(f'response: {response.status_code}')
+            return response.status_code, self.return_emply_json()
         except requests.exceptions.RequestException as e:
             logging.info(f'exception with server {str(e)}')
             self.print_respose(response)
-        return self.return_emply_json()
+        return None, self.return_emply_json()
 
-    def get_water_level(self):
-        request_url = self.build_ulr_for_request(self.PROTOCOL, self.water_server_ip, self.GET_WATER)
-        device_json = {'device': self.device_guid}
+    # gzip the JSON body when enabled and large enough to gain from it
+    def encode_json(self, payload):
+        if self.gzip_requests:
+            body = json.dumps(payload).encode()
+            if len(body) >= self.gzip_min_bytes:
+                return {'data': gzip.compress(body, mtime=0),
+                        'headers': {"Content-Type": "application/json", "Content-Encoding": self.GZIP_ENCODING}}
+        return {'json': payload, 'headers': {"Content-Type": "application/json"}}
+
+    # a record counts as delivered once the server answered it without a server error
+    def is_delivered(self, status_code):
+        return status_code is not None and status_code < h.HTTPStatus.INTERNAL_SERVER_ERROR
+
+    def send_telemetry(self, record):
+        if not self.telemetry_batch_supported:
+            return self.send_telemetry_per_metric(record)
+
+        status_code, json_response = self.post_json(self.POST_TELEMETRY, record, 'Telemetry posted')
+        if status_code == h.HTTPStatus.NOT_FOUND:
+            logging.info(f'Batched telemetry not supported, using per-metric endpoints: {status_code}')
+            self.telemetry_batch_supported = False
+            self.connection_pool.metrics.record_retry(self.POST_TELEMETRY)
+            return self.send_telemetry_per_metric(record)
+        return self.is_delivered(status_code), json_response
+
+    def send_telemetry_per_metric(self, record):
+        status_codes = []
+        if record.get('heartbeat'):
+            status_codes.append(self.post_json(self.POST_STATUS, {'execution_status': False,
+                                                                  'message': st.HEALTH_CHECK}, 'Status posted')[0])
+        if 'execution_status' in record:
+            status_codes.append(self.post_json(self.POST_STATUS, {'execution_status': record['execution_status'],
+                                                                  'message': record['message']}, 'Status posted')[0])
+        if 'water_level' in record:
+            status_codes.append(self.post_json(self.POST_WATER_URL, {'water_level': record['water_level']},
+                                               'Water posted')[0])
+        if 'moisture_level' in record:
+            status_codes.append(self.post_json(self.POST_MOISTURE_URL, {'moisture_level': record['moisture_level']},
+                                               'Moisture level posted')[0])
+        return all(self.is_delivered(status_code) for status_code in status_codes), self.return_emply_json()
+
+    def send_picture(self, photo_name):
+        request_url = self.endpoints.url(self.POST_PICTURE)
+        photo_path = f'{self.photos_dir}/{photo_name}{CAMERA_FORMAT}'
+        fields = {'device_id': self.device_guid, 'photo_id': photo_name}
         response = None
+        stream = None
         try:
-            response = requests.get(request_url, params=device_json)
+            stream = MultipartFileStream(fields, self.IMAGE_FILE_FIELD, photo_path,
+                                         content_type=self.IMAGE_CONTENT_TYPE)
+            headers = {"Content-Type": stream.content_type}
+            started = time.monotonic()
+            response = self.connection_pool.request("POST", request_url, data=stream, headers=headers,
+                                                    timeout=self.timeout_for(self.POST_PICTURE))
+            self.record_upload(stream.bytes_read, time.monotonic() - started)
             logging.info(response.url)
-            if response.status_code == h.HTTPStatus.NO_CONTENT:
-                logging.info(f'No water reset in queue: {response.status_code}')
-            elif response.status_code == h.HTTPStatus.FORBIDDEN:
+            if response.status_code == h.HTTPStatus.FORBIDDEN:
                 logging.info(f'Device not registered: {response.status_code}')
-            elif response.status_code == h.HTTPStatus.OK:
-                logging.info(f'Reset water: {response.status_code}')
+            elif response.status_code in (h.HTTPStatus.OK, h.HTTPStatus.CREATED):
+                logging.info(f'Picture posted: {response.status_code}')
                 json_response = response.json()
-                logging.info(f'Response: {json_response}')
-                return json_response
+                return True, json_response
             else:
                 logging.info(f'response: {response.status_code}')
+            return self.is_delivered(response.status_code), self.return_emply_json()
         except requests.exceptions.RequestException as e:
             logging.info(f'exception with server {str(e)}')
             self.print_respose(response)
-        return self.return_emply_json()
+        except OSError as e:
+            # a missing picture cannot be sent later either
+            logging.info(f'cannot read picture {photo_path}: {str(e)}')
+            return True, self.return_emply_json()
+        finally:
+            if stream is not None:
+                stream.close()
+        return False, self.return_emply_json()
 
-    def print_respose(self, response):
-        if response is not None:
-            logging.info(response.text)
+    # read timeouts per endpoint, SERVER_CONFIG endpoint_read_timeouts overrides the defaults
+    def build_endpoint_timeouts(self, server_config):
+        read_timeouts = {**self.ENDPOINT_READ_TIMEOUTS, **(server_config or {}).get('endpoint_read_timeouts', {})}
+        connect_timeout = self.connection_pool.timeout[0]
+        return {endpoint: (connect_timeout, read_timeout) for endpoint, read_timeout in read_timeouts.items()}
+
+    def timeout_for(self, endpoint):
+        return self.endpoint_timeouts.get(endpoint, self.connection_pool.timeout)
+
+    # False while the circuit breaker short-circuits requests, network phases can be skipped
+    def is_server_available(self):
+        return self.connection_pool.is_available()
+
+    def get_breaker_state(self):
+        breaker = self.connection_pool.circuit_breaker
+        return breaker.state if breaker is not None else None
+
+    # snapshot of all communication metrics, e.g. for logging or a metrics file on bare-metal devices
+    def get_metrics(self):
+        return {
+            'endpoints': self.connection_pool.get_metrics(),
+            'traffic': self.connection_pool.get_traffic_report(),
+            'connections': self.connection_pool.get_stats(),
+            'breaker': self.get_breaker_state(),
+            'outbox_pending': self.outbox.pending() if self.outbox is not None else 0
+        }
+
+    def get_traffic_report(self):
+        return self.connection_pool.get_traffic_report()
 
-    # to do revert to constant usage when using real ip address
-    def get_ip_address(self):
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip_address = s.getsockname()[0]
-        logging.info(f'ip address: {ip_address}')
-        s.close()
-        return self.IP_ADDRESS
-
-    def build_ulr_for_request(self, protocol, ip, request_url):
-        url_address = f'{protocol}://{ip}:{self.PORT}/{self.APP_MASTER_URL}/{request_url}'
-        logging.info(f'url_address: {url_address}')
-        return url_address
+    def get_connection_stats(self):
+        return self.connection_pool.get_stats()
 
     def return_emply_json(self):
         return jc.get_json("{}")
@@ -0,0 +1,99 @@
+"""
+Traffic accounting for server communication.
+
+This module counts the bytes sent and received per endpoint, both as they
+travel over the wire and uncompressed, so the savings of compressed
+bodies can be measured on metered links.
+"""
+import threading
+from typing import Any, Dict, Tuple
+
+import requests
+
+GZIP_ENCODING = 'gzip'
+# Bytes of the gzip trailer field holding the uncompressed size
+GZIP_SIZE_FIELD = 4
+
+
+class TrafficCounter:
+    """
+    Per-endpoint byte counters of request and response bodies.
+
+    Wire bytes are the (possibly compressed) body bytes as transferred,
+    raw bytes the body size before compression or after decompression.
+    Headers are not counted.
+    """
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, int]] = {}
+
+    def record(self, endpoint: str, sent_raw: int, sent_wire: int, received_raw: int, received_wire: int) -> None:
+        """
+        Add the body sizes of one request to the endpoint counters.
+
+        Args:
+            endpoint: Endpoint name, e.g. getPlan
+            sent_raw: Uncompressed request body size
+            sent_wire: Request body size as sent
+            received_raw: Decompressed response body size
+            received_wire: Response body size as received
+        """
+        with self._lock:
+            counters = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'sent_raw': 0, 'sent_wire': 0, 'received_raw': 0, 'received_wire': 0
+            })
+            counters['requests'] += 1
+            counters['sent_raw'] += sent_raw
+            counters['sent_wire'] += sent_wire
+            counters['received_raw'] += received_raw
+            counters['received_wire'] += received_wire
+
+    def record_response(self, endpoint: str, response: requests.Response) -> Tuple[int, int]:
+        """
+        Count the bodies of a finished request.
+
+        Args:
+            endpoint: Endpoint name, e.g. getPlan
+            response: Server response with its prepared request
+
+        Returns:
+            Tuple of (sent wire bytes, received wire bytes)
+        """
+        sent_raw, sent_wire = self._request_sizes(response.request)
+        received_raw = len(response.content or b'')
+        received_wire = (response.raw.tell() if response.raw is not None else 0) or received_raw
+        self.record(endpoint, sent_raw, sent_wire, received_raw, received_wire)
+        return sent_wire, received_wire
+
+    def _request_sizes(self, request: requests.PreparedRequest):
+        """Return the uncompressed and sent size of a request body."""
+        body = request.body
+        if body is None:
+            return 0, 0
+        if isinstance(body, str):
+            body = body.encode()
+        if not isinstance(body, bytes):
+            size = len(body)
+            return size, size
+        if request.headers.get('Content-Encoding') == GZIP_ENCODING and len(body) >= GZIP_SIZE_FIELD:
+            return int.from_bytes(body[-GZIP_SIZE_FIELD:], 'little'), len(body)
+        return len(body), len(body)
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the byte counters per endpoint.
+
+        Returns:
+            Dictionary keyed by endpoint with request count, raw and wire bytes
+            per direction, saved bytes and the wire/raw ratio
+        """
+        with self._lock:
+            report = {endpoint: dict(counters) for endpoint, counters in self._endpoints.items()}
+        for counters in report.values():
+            raw = counters['sent_raw'] + counters['received_raw']
+            wire = counters['sent_wire'] + counters['received_wire']
+            counters['saved_bytes'] = raw - wire
+            counters['ratio'] = wire / raw if raw else 1.0
+        return report
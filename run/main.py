@@ -3,13 +3,39 @@ import logging
 from run.operation import camera_op
 from run.sensor.relay import Relay
 from run.sensor.moisture_sensor import Moisture
+from run.sensor.moisture_sampler import MoistureSampler
 from run.sensor.camera_sensor import Camera
 from run.http_communicator.server_communicator import ServerCommunicator
-from run.operation.pump import Pump
+from run.http_communicator.connection_pool import ConnectionPool
+from run.http_communicator.outbox import Outbox
+from run.http_communicator.metrics import MetricsReporter
+from run.operation.pump import Pump, DEFAULT_CATCH_UP_MINUTES
+from run.operation.pump_journal import PumpJournal
+from run.operation.moisture_trend import MoistureTrend
+from run.operation.moisture_trigger import MoistureTrigger
 from run.operation.server_checker import ServerChecker
+from run.operation.scheduler import CycleScheduler
+from run.operation.cycle_profiler import CycleProfiler
+from run.operation.zones import Zone, MultiZoneChecker
 from pathlib import Path
 from picamera import PiCamera
 
+try:
+    from config.system_config import SERVER_CONFIG, TIMING_CONFIG
+except ImportError:
+    SERVER_CONFIG = {}
+    TIMING_CONFIG = {}
+
+try:
+    from config.system_config import SENSOR_CONFIG
+except ImportError:
+    SENSOR_CONFIG = {}
+
+try:
+    from config.system_config import ZONES_CONFIG
+except ImportError:
+    ZONES_CONFIG = []
+
 WATER_PUMPED_IN_SECOND = 70
 MOISTURE_MAX_LEVEL = 0
 WATER_TIME_BETWEEN_CYCLE = 10
@@ -18,23 +44,88 @@ MOISTURE_PIN = 4
 RELAY_PIN = 12
 DEVICE_GUID = 'ab313658-5d84-47d6-a3f1-b609c0f1dd5e'
 PHOTO_DIR = '/tmp/device/photos'
+OUTBOX_PATH = '/tmp/device/outbox.db'
+ZONE_OUTBOX_PATH = '/tmp/device/outbox-{device_guid}.db'
+PUMP_STATE_PATH = '/tmp/device/pump_state.json'
+ZONE_PUMP_STATE_PATH = '/tmp/device/pump_state-{device_guid}.json'
+METRICS_PATH = '/tmp/device/metrics.json'
+METRICS_INTERVAL = 60
 DELAY_BETWEEN_PHOTO_TAKEN = 5
 
 
+def build_zone(zone_config, connection_pool, camera, wait_time_between_cycle):
+    device_guid = zone_config['device_guid']
+    relay = Relay(zone_config['relay_pin'], active_high=False)
+    moisture = MoistureSampler.from_config(Moisture(zone_config['moisture_pin'], charge_time_limit=0.2, threshold=0.6),
+                                           SENSOR_CONFIG)
+    moisture.start()
+    pump = Pump(water_max_capacity=zone_config.get('water_max_capacity', WATER_MAX_CAPACITY),
+                water_pumped_in_second=zone_config.get('water_pumped_in_second', WATER_PUMPED_IN_SECOND),
+                moisture_max_level=MOISTURE_MAX_LEVEL, non_blocking=True,
+                journal=PumpJournal(ZONE_PUMP_STATE_PATH.format(device_guid=device_guid)),
+                catch_up_minutes=TIMING_CONFIG.get('schedule_catch_up_minutes', DEFAULT_CATCH_UP_MINUTES),
+                moisture_trend=MoistureTrend.from_config(TIMING_CONFIG))
+    outbox = Outbox.from_config(ZONE_OUTBOX_PATH.format(device_guid=device_guid), SERVER_CONFIG)
+    communicator = ServerCommunicator(device_guid=device_guid, photos_dir=PHOTO_DIR, server_config=SERVER_CONFIG,
+                                      connection_pool=connection_pool, outbox=outbox)
+    communicator.start_outbox_drainer()
+    if SENSOR_CONFIG.get('moisture_edge_trigger', False):
+        MoistureTrigger.from_config(pump, moisture.sensor, relay, SENSOR_CONFIG).start()
+    sensors = {pump.RELAY_SENSOR_KEY: relay, pump.MOISTURE_SENSOR_KEY: moisture, camera_op.CAMERA_KEY: camera}
+    return Zone.create(zone_config.get('name', device_guid), pump, communicator, sensors, wait_time_between_cycle,
+                       TIMING_CONFIG)
+
+
+def main_zones():
+    # one pooled connection, breaker and metrics for all zones
+    connection_pool = ConnectionPool.from_config(SERVER_CONFIG)
+    camera = Camera(camera_instance=PiCamera(), photos_dir=PHOTO_DIR,
+                    wait_before_still_in_seconds=DELAY_BETWEEN_PHOTO_TAKEN)
+    wait_time_between_cycle = TIMING_CONFIG.get('wait_time_between_cycle', WATER_TIME_BETWEEN_CYCLE)
+    zones = [build_zone(zone_config, connection_pool, camera, wait_time_between_cycle)
+             for zone_config in ZONES_CONFIG]
+    # endpoint, traffic and breaker metrics live in the shared pool, any zone reports them
+    MetricsReporter(lambda: {**zones[0].communicator.get_metrics(),
+                             'cycle': {zone.name: zone.checker.get_cycle_stats() for zone in zones}},
+                    METRICS_PATH, interval=METRICS_INTERVAL).start()
+
+    logging.info(f"executor starting for {len(zones)} zones..")
+    MultiZoneChecker(zones).plan_executor()
+    logging.info("end")
+
+
 def main():
     logging.root.handlers = []
     logging.basicConfig(filename='/tmp/example.log', filemode='w', level=logging.DEBUG)
     logging.getLogger().setLevel(logging.INFO)
     logging.info("Starting....")
     Path(PHOTO_DIR).mkdir(parents=True, exist_ok=True)
+    if ZONES_CONFIG:
+        main_zones()
+        return
     relay = Relay(RELAY_PIN, active_high=False)
-    moisture = Moisture(MOISTURE_PIN, charge_time_limit=0.2, threshold=0.6)
+    # the pump reads the filtered value, sensor charge timing runs on the sampler thread
+    moisture = MoistureSampler.from_config(Moisture(MOISTURE_PIN, charge_time_limit=0.2, threshold=0.6), SENSOR_CONFIG)
+    moisture.start()
 
     pump = Pump(water_max_capacity=WATER_MAX_CAPACITY, water_pumped_in_second=WATER_PUMPED_IN_SECOND,
-                moisture_max_level=MOISTURE_MAX_LEVEL)
-    sever_communicator = ServerCommunicator(device_guid=DEVICE_GUID, photos_dir=PHOTO_DIR)
+                moisture_max_level=MOISTURE_MAX_LEVEL, non_blocking=True, journal=PumpJournal(PUMP_STATE_PATH),
+                catch_up_minutes=TIMING_CONFIG.get('schedule_catch_up_minutes', DEFAULT_CATCH_UP_MINUTES),
+                moisture_trend=MoistureTrend.from_config(TIMING_CONFIG))
+    outbox = Outbox.from_config(OUTBOX_PATH, SERVER_CONFIG)
+    sever_communicator = ServerCommunicator(device_guid=DEVICE_GUID, photos_dir=PHOTO_DIR,
+                                            server_config=SERVER_CONFIG, outbox=outbox)
+    sever_communicator.start_outbox_drainer()
+    if SENSOR_CONFIG.get('moisture_edge_trigger', False):
+        # dry soil edges of the raw sensor bring the moisture check forward
+        MoistureTrigger.from_config(pump, moisture.sensor, relay, SENSOR_CONFIG).start()
+    wait_time_between_cycle = TIMING_CONFIG.get('wait_time_between_cycle', WATER_TIME_BETWEEN_CYCLE)
     server_checker = ServerChecker(pump=pump, communicator=sever_communicator,
-                                   wait_time_between_cycle=WATER_TIME_BETWEEN_CYCLE)
+                                   wait_time_between_cycle=wait_time_between_cycle,
+                                   scheduler=CycleScheduler.from_config(TIMING_CONFIG, wait_time_between_cycle),
+                                   profiler=CycleProfiler.from_config(TIMING_CONFIG))
+    MetricsReporter(lambda: {**sever_communicator.get_metrics(), 'cycle': server_checker.get_cycle_stats()},
+                    METRICS_PATH, interval=METRICS_INTERVAL).start()
 
     camera = Camera(camera_instance=PiCamera(), photos_dir=PHOTO_DIR,
                     wait_before_still_in_seconds=DELAY_BETWEEN_PHOTO_TAKEN)
@@ -49,26 +49,37 @@ class Plan:
             
         Returns:
             Plan instance or None if parsing fails
+        """
+        return cls.from_dict(jc.get_json(json_string))
+
+    @classmethod
+    def from_dict(cls, plan_dict: Dict[str, Any]) -> Optional['Plan']:
+        """
+        Create a Plan instance from an already parsed dictionary.
+        
+        Args:
+            plan_dict: Dictionary containing plan data
             
-        Raises:
-            TypeError: If required fields are missing
+        Returns:
+            Plan instance or None if the data is empty or invalid
         """
         try:
-            json_dict = jc.get_json(json_string)
-            if not json_dict:
+            if not plan_dict:
                 return None
+            if not isinstance(plan_dict, dict):
+                raise TypeError("Plan data must be a dictionary")
                 
             # Validate required fields
             required_fields = ['name', 'plan_type', 'water_volume']
             for field in required_fields:
-                if field not in json_dict:
+                if field not in plan_dict:
                     raise TypeError(f"Missing required field: {field}")
             
             # Only pass required fields to constructor
-            plan_data = {field: json_dict[field] for field in required_fields}
+            plan_data = {field: plan_dict[field] for field in required_fields}
             return cls(**plan_data)
         except Exception as e:
-            logging.error(f"Failed to create Plan from JSON: {e}")
+            logging.error(f"Failed to create Plan: {e}")
             return None
 
     def __repr__(self) -> str:
@@ -0,0 +1,127 @@
+"""
+Schedule index for water plant automation system.
+
+This module compiles the weekday/time entries of a time plan once into
+a per-weekday sorted list of minute-of-day slots, so the pump and the
+scheduler look up due and upcoming slots by bisection instead of parsing
+every entry on every cycle.
+"""
+import bisect
+import calendar
+import datetime
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from run.common.time_engine import minute_of_day
+from run.model.watertime import WaterTime
+
+DAYS_PER_WEEK = 7
+
+
+class ScheduleIndex:
+    """
+    Weekday to sorted minute-of-day index of scheduled watering times.
+
+    Weekdays are numbered like datetime.weekday(), Monday being 0. An entry
+    with an unknown weekday or an invalid time is skipped with a warning;
+    of several entries on the same slot the first one is kept.
+    """
+
+    def __init__(self, weekday_times: Iterable[WaterTime]):
+        """
+        Compile the index.
+
+        Args:
+            weekday_times: Scheduled watering times
+        """
+        weekdays = list(calendar.day_name)
+        self._slots: Dict[int, List[int]] = {}
+        self._entries: Dict[Tuple[int, int], WaterTime] = {}
+        for weekday_time in weekday_times:
+            try:
+                weekday = weekdays.index(weekday_time.weekday)
+                minute = minute_of_day(weekday_time.time_water)
+            except (TypeError, ValueError):
+                logging.warning(f"Skipping invalid schedule entry: {weekday_time.weekday} {weekday_time.time_water}")
+                continue
+            self._entries.setdefault((weekday, minute), weekday_time)
+        for weekday, minute in self._entries:
+            self._slots.setdefault(weekday, []).append(minute)
+        for minutes in self._slots.values():
+            minutes.sort()
+
+    def __len__(self) -> int:
+        """Return the number of distinct slots."""
+        return len(self._entries)
+
+    def slots(self, weekday: int) -> List[int]:
+        """Return the sorted minutes of the day scheduled on a weekday."""
+        return list(self._slots.get(weekday, ()))
+
+    def entry_at(self, weekday: int, minute: int) -> Optional[WaterTime]:
+        """
+        Get the entry scheduled on a slot.
+
+        Args:
+            weekday: Weekday, Monday being 0
+            minute: Minute of the day
+
+        Returns:
+            Scheduled watering time, None if the slot is not scheduled
+        """
+        return self._entries.get((weekday, minute))
+
+    def next_due(self, now: datetime.datetime) -> Optional[Tuple[datetime.datetime, WaterTime]]:
+        """
+        Find the first slot after an instant.
+
+        Args:
+            now: Local time to search from, a slot starting exactly now is not returned
+
+        Returns:
+            Start of the slot and its entry, None for an empty index
+        """
+        if not self._entries:
+            return None
+        minute = now.hour * 60 + now.minute
+        midnight = datetime.datetime.combine(now.date(), datetime.time(), tzinfo=now.tzinfo)
+        # Offset 7 is the current weekday one week later
+        for offset in range(DAYS_PER_WEEK + 1):
+            weekday = (now.weekday() + offset) % DAYS_PER_WEEK
+            minutes = self._slots.get(weekday)
+            if not minutes:
+                continue
+            position = bisect.bisect_right(minutes, minute) if offset == 0 else 0
+            if position < len(minutes):
+                slot = minutes[position]
+                return (midnight + datetime.timedelta(days=offset, minutes=slot),
+                        self._entries[(weekday, slot)])
+        return None
+
+    def due_between(self, start: datetime.datetime,
+                    end: datetime.datetime) -> List[Tuple[datetime.datetime, WaterTime]]:
+        """
+        Find the slots starting in the window (start, end].
+
+        Args:
+            start: Exclusive start of the window
+            end: Inclusive end of the window
+
+        Returns:
+            Slot starts and their entries in chronological order
+        """
+        due: List[Tuple[datetime.datetime, WaterTime]] = []
+        if end <= start or not self._entries:
+            return due
+        day = start.date()
+        while day <= end.date():
+            minutes = self._slots.get(day.weekday())
+            if minutes:
+                low = bisect.bisect_right(minutes, start.hour * 60 + start.minute) if day == start.date() else 0
+                high = (bisect.bisect_right(minutes, end.hour * 60 + end.minute) if day == end.date()
+                        else len(minutes))
+                midnight = datetime.datetime.combine(day, datetime.time(), tzinfo=start.tzinfo)
+                for slot in minutes[low:high]:
+                    due.append((midnight + datetime.timedelta(minutes=slot), self._entries[(day.weekday(), slot)]))
+            day += datetime.timedelta(days=1)
+        return due
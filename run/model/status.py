@@ -88,6 +88,9 @@ class StatusMessages:
     DELETED_PLAN = "[Watering plan deleted]"
     PLAN_CONDITION_NOT_MET = "[Plan condition not met]"
     
+    # Progress messages
+    WATERING_IN_PROGRESS = "[Watering in progress]"
+    
     # System messages
     HEALTH_CHECK = "healthcheck"
 
@@ -101,5 +104,6 @@ MESSAGE_DELETED_PLAN = StatusMessages.DELETED_PLAN
 MESSAGE_SUFFICIENT_WATER = StatusMessages.SUFFICIENT_WATER
 MESSAGE_PLAN_CONDITION_NOT_MET = StatusMessages.PLAN_CONDITION_NOT_MET
 MESSAGE_BASIC_PLAN_SUCCESS = StatusMessages.BASIC_PLAN_SUCCESS
+MESSAGE_WATERING_IN_PROGRESS = StatusMessages.WATERING_IN_PROGRESS
 HEALTH_CHECK = StatusMessages.HEALTH_CHECK
 
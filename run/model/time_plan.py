@@ -8,6 +8,7 @@ import logging
 from typing import List, Dict, Any, Optional
 import run.common.json_creator as jc
 from run.model.plan import Plan
+from run.model.schedule_index import ScheduleIndex
 from run.model.watertime import WaterTime
 
 
@@ -24,6 +25,7 @@ class TimePlan(Plan):
         water_volume (int): The amount of water to use in milliliters
         weekday_times (List[WaterTime]): List of scheduled watering times
         execute_only_once (bool): Whether to execute only once per day
+        schedule (ScheduleIndex): Index of weekday_times, compiled when they are assigned
     """
     
     def __init__(self, name: str, plan_type: str, water_volume: int, 
@@ -50,6 +52,16 @@ class TimePlan(Plan):
         self.weekday_times = weekday_times
         self.execute_only_once = execute_only_once
 
+    @property
+    def weekday_times(self) -> List[WaterTime]:
+        """Scheduled watering times."""
+        return self._weekday_times
+
+    @weekday_times.setter
+    def weekday_times(self, weekday_times: List[WaterTime]) -> None:
+        self._weekday_times = weekday_times
+        self.schedule = ScheduleIndex(weekday_times)
+
     @classmethod
     def from_json(cls, json_string: str) -> Optional['TimePlan']:
         """
@@ -61,32 +73,45 @@ class TimePlan(Plan):
         Returns:
             TimePlan instance or None if parsing fails
         """
+        return cls.from_dict(jc.get_json(json_string))
+
+    @classmethod
+    def from_dict(cls, plan_dict: Dict[str, Any]) -> Optional['TimePlan']:
+        """
+        Create a TimePlan instance from an already parsed dictionary.
+        
+        Args:
+            plan_dict: Dictionary containing plan data
+            
+        Returns:
+            TimePlan instance or None if the data is empty or invalid
+        """
         try:
-            time_plan = jc.get_json_sm(json_string)
-            if not time_plan:
+            if not plan_dict:
                 return None
+            if not isinstance(plan_dict, dict):
+                raise TypeError("Plan data must be a dictionary")
                 
             # Validate required fields
             required_fields = ['name', 'plan_type', 'water_volume', 'weekday_times']
             for field in required_fields:
-                if not hasattr(time_plan, field):
+                if field not in plan_dict:
                     raise TypeError(f"Missing required field: {field}")
             
             # Convert weekday_times to WaterTime objects
             weekday_times = []
-            for wt_data in time_plan.weekday_times:
-                if hasattr(wt_data, 'weekday') and hasattr(wt_data, 'time_water'):
-                    water_time = WaterTime(wt_data.weekday, wt_data.time_water)
-                    weekday_times.append(water_time)
+            for wt_data in plan_dict['weekday_times']:
+                if isinstance(wt_data, dict) and 'weekday' in wt_data and 'time_water' in wt_data:
+                    weekday_times.append(WaterTime(wt_data['weekday'], wt_data['time_water']))
                 else:
                     raise ValueError("Invalid weekday_times format")
             
-            execute_only_once = getattr(time_plan, 'execute_only_once', False)
+            execute_only_once = plan_dict.get('execute_only_once', False)
             
-            return cls(time_plan.name, time_plan.plan_type, time_plan.water_volume, 
-                      weekday_times, execute_only_once)
+            return cls(plan_dict['name'], plan_dict['plan_type'], plan_dict['water_volume'],
+                       weekday_times, execute_only_once)
         except Exception as e:
-            logging.error(f"Failed to create TimePlan from JSON: {e}")
+            logging.error(f"Failed to create TimePlan: {e}")
             return None
 
     def __repr__(self) -> str:
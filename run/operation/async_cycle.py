@@ -0,0 +1,89 @@
+"""
+Async cycle driver for water plant automation system.
+
+This module fans the independent server polls of an execution cycle out
+concurrently, so a cycle waits for the slowest poll instead of the sum
+of all of them.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, NamedTuple
+
+
+class PollResult(NamedTuple):
+    """Results of the server polls of one cycle."""
+    water_level: Dict[str, Any]
+    picture: Dict[str, Any]
+    plan: Dict[str, Any]
+
+
+class AsyncCycleDriver:
+    """
+    Drive execution cycles with concurrent server polls.
+
+    The driver can be awaited from an asyncio application through
+    ``poll_async``/``run_cycle`` or used from synchronous code through
+    ``poll``, which runs the polls on the driver's own event loop.
+    """
+
+    def __init__(self, communicator):
+        """
+        Initialize the cycle driver.
+
+        Args:
+            communicator: AsyncServerCommunicator used for the polls
+        """
+        self.communicator = communicator
+        self._loop = None
+
+    async def poll_async(self, picture: bool = True) -> PollResult:
+        """
+        Poll water level, picture and plan concurrently.
+
+        Args:
+            picture: Whether to poll for a photo request, an empty response is used if not
+
+        Returns:
+            PollResult with the three server responses
+        """
+        polls = [self.communicator.get_water_level(), self.communicator.get_plan()]
+        if picture:
+            polls.append(self.communicator.get_picture())
+        water_level, plan, *photo = await asyncio.gather(*polls)
+        return PollResult(water_level=water_level, picture=photo[0] if photo else {}, plan=plan)
+
+    def poll(self, picture: bool = True) -> PollResult:
+        """
+        Poll the server concurrently from synchronous code.
+
+        Args:
+            picture: Whether to poll for a photo request, an empty response is used if not
+
+        Returns:
+            PollResult with the three server responses
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.poll_async(picture))
+
+    async def run_cycle(self, server_checker, sensors: Dict[str, Any]) -> None:
+        """
+        Run one full execution cycle of a server checker.
+
+        The polls run concurrently; handling their results touches hardware
+        and stays sequential on a worker thread.
+
+        Args:
+            server_checker: ServerChecker whose handlers process the results
+            sensors: Dictionary of sensor objects
+        """
+        server_checker._send_health_check()
+        polls = await self.poll_async()
+        await self.communicator.run_blocking(server_checker.process_poll_results, sensors, polls)
+        logging.debug("Async execution cycle completed")
+
+    def close(self) -> None:
+        """Close the event loop and the communicator worker threads."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.close()
+        self.communicator.close()
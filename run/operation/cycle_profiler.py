@@ -0,0 +1,239 @@
+"""
+Cycle profiler for water plant automation system.
+
+This module measures where the time of an execution cycle goes. Every phase
+of a cycle records its wall time and the number of network calls it made
+into rolling statistics, and a cycle exceeding its time budget is reported
+as one structured record with the per-phase breakdown.
+"""
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+# Defaults used when TIMING_CONFIG does not define a value
+DEFAULT_CYCLE_BUDGET = 5.0
+DEFAULT_WINDOW = 100
+# Slow cycle records kept for inspection
+SLOW_CYCLES_KEPT = 10
+
+# Communicator methods that talk to the server
+NETWORK_CALLS = frozenset({
+    'get_plan', 'get_picture', 'get_water_level', 'get_commands', 'post_water', 'post_moisture',
+    'post_picture', 'post_plan_execution', 'post_telemetry'
+})
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Return the nearest-rank percentile of sorted values.
+
+    Args:
+        values: Values sorted ascending
+        q: Quantile between 0 and 1
+
+    Returns:
+        Percentile, 0 for no values
+    """
+    if not values:
+        return 0.0
+    rank = max(math.ceil(q * len(values)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+class CountingCommunicator:
+    """
+    Transparent communicator proxy counting the network calls made through it.
+
+    Attributes:
+        communicator: Wrapped communicator
+    """
+
+    def __init__(self, communicator, on_call: Callable[[], None]):
+        """
+        Initialize the proxy.
+
+        Args:
+            communicator: Communicator to wrap
+            on_call: Callable invoked once per network call
+        """
+        self.communicator = communicator
+        self._on_call = on_call
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.communicator, name)
+        if name not in NETWORK_CALLS:
+            return attribute
+
+        def counted(*args, **kwargs):
+            self._on_call()
+            return attribute(*args, **kwargs)
+        return counted
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CountingCommunicator):
+            other = other.communicator
+        return self.communicator == other
+
+    def __hash__(self) -> int:
+        return hash(self.communicator)
+
+
+class CycleProfiler:
+    """
+    Rolling per-phase wall time and network call statistics of execution cycles.
+
+    Idle phases, such as waiting on the command channel, are recorded but
+    do not count towards the cycle budget.
+
+    Attributes:
+        budget: Cycle time in seconds above which a cycle is reported as slow
+        window: Number of samples kept per phase
+    """
+
+    def __init__(self, budget: float = DEFAULT_CYCLE_BUDGET, window: int = DEFAULT_WINDOW,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize an empty profiler.
+
+        Args:
+            budget: Cycle time in seconds above which a cycle is reported as slow
+            window: Number of samples kept per phase
+            clock: Monotonic clock returning seconds
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1")
+
+        self.budget = budget
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._network_calls = 0
+        self._samples: Dict[str, Deque] = {}
+        self._cycles: Deque = deque(maxlen=window)
+        self._cycle: Optional[Dict[str, Any]] = None
+        self.slow_cycles: Deque[Dict[str, Any]] = deque(maxlen=SLOW_CYCLES_KEPT)
+        self.slow_cycle_count = 0
+
+    @classmethod
+    def from_config(cls, timing_config: Optional[Dict[str, Any]] = None,
+                    clock: Callable[[], float] = time.monotonic) -> 'CycleProfiler':
+        """
+        Create a profiler from a TIMING_CONFIG dictionary.
+
+        Args:
+            timing_config: Timing configuration, missing keys fall back to defaults
+            clock: Monotonic clock returning seconds
+
+        Returns:
+            CycleProfiler instance
+        """
+        timing_config = timing_config or {}
+        return cls(budget=timing_config.get('cycle_budget', DEFAULT_CYCLE_BUDGET),
+                   window=timing_config.get('profiler_window', DEFAULT_WINDOW), clock=clock)
+
+    def count_network_call(self) -> None:
+        """Count one network call, attributed to the phases running at the time."""
+        with self._lock:
+            self._network_calls += 1
+
+    def count_calls(self, communicator) -> CountingCommunicator:
+        """Wrap a communicator so its network calls are counted by this profiler."""
+        return CountingCommunicator(communicator, self.count_network_call)
+
+    def start_cycle(self) -> None:
+        """Start profiling a cycle."""
+        self._cycle = {'started': self._clock(), 'started_at': time.time(), 'calls': self._network_calls,
+                       'idle': 0.0, 'phases': {}}
+
+    @contextmanager
+    def phase(self, name: str, idle: bool = False) -> Iterator[None]:
+        """
+        Profile a phase.
+
+        Args:
+            name: Phase name
+            idle: Whether the phase only waits, its time is then left out of the cycle budget
+        """
+        started = self._clock()
+        calls_before = self._network_calls
+        try:
+            yield
+        finally:
+            seconds = self._clock() - started
+            calls = self._network_calls - calls_before
+            with self._lock:
+                self._samples.setdefault(name, deque(maxlen=self.window)).append((seconds, calls))
+            cycle = self._cycle
+            if cycle is not None:
+                totals = cycle['phases'].setdefault(name, {'seconds': 0.0, 'network_calls': 0})
+                totals['seconds'] += seconds
+                totals['network_calls'] += calls
+                if idle:
+                    cycle['idle'] += seconds
+
+    def end_cycle(self) -> Optional[Dict[str, Any]]:
+        """
+        Finish the cycle started last.
+
+        Returns:
+            Slow cycle record if the cycle exceeded the budget, None otherwise
+        """
+        cycle, self._cycle = self._cycle, None
+        if cycle is None:
+            return None
+        seconds = self._clock() - cycle['started'] - cycle['idle']
+        calls = self._network_calls - cycle['calls']
+        with self._lock:
+            self._cycles.append((seconds, calls))
+        if seconds <= self.budget:
+            return None
+
+        record = {
+            'event': 'slow_cycle',
+            'started_at': cycle['started_at'],
+            'seconds': round(seconds, 3),
+            'budget': self.budget,
+            'idle_seconds': round(cycle['idle'], 3),
+            'network_calls': calls,
+            'phases': {name: {'seconds': round(totals['seconds'], 3), 'network_calls': totals['network_calls']}
+                       for name, totals in cycle['phases'].items()}
+        }
+        self.slow_cycles.append(record)
+        self.slow_cycle_count += 1
+        logging.warning(f"Slow cycle: {json.dumps(record)}")
+        return record
+
+    def _summarize(self, samples) -> Dict[str, Any]:
+        """Return count and p50/p95/max of wall times and network calls of samples."""
+        seconds = sorted(sample[0] for sample in samples)
+        calls = sorted(sample[1] for sample in samples)
+        return {
+            'count': len(samples),
+            'seconds': {'p50': percentile(seconds, 0.5), 'p95': percentile(seconds, 0.95),
+                        'max': seconds[-1] if seconds else 0.0},
+            'network_calls': {'p50': percentile(calls, 0.5), 'p95': percentile(calls, 0.95),
+                              'max': calls[-1] if calls else 0}
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the rolling statistics.
+
+        Returns:
+            Dictionary with the cycle and per-phase statistics over the last
+            window samples, the budget and the number of slow cycles
+        """
+        with self._lock:
+            phases = {name: list(samples) for name, samples in self._samples.items()}
+            cycles = list(self._cycles)
+        return {
+            'budget': self.budget,
+            'cycle': self._summarize(cycles),
+            'phases': {name: self._summarize(samples) for name, samples in phases.items()},
+            'slow_cycles': self.slow_cycle_count
+        }
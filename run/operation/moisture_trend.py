@@ -0,0 +1,157 @@
+"""
+Moisture trend for water plant automation system.
+
+This module fits a line through the recent moisture checks of a moisture
+plan and predicts when the soil will dry below the plan's threshold. The
+next check is placed half way to the predicted crossing, bounded by the
+plan's check interval and a maximum number of skipped intervals, so checks
+are sparse while the soil is moist and cluster near the crossing.
+"""
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+DEFAULT_WINDOW = 8
+DEFAULT_MIN_SAMPLES = 3
+DEFAULT_MAX_SKIPPED_INTERVALS = 4
+SECONDS_PER_MINUTE = 60
+
+
+class MoistureTrend:
+    """
+    Ring buffer of timed moisture readings with a least squares drying trend.
+
+    Readings are moisture levels in percent, as compared with the plan's
+    threshold by the pump.
+
+    Attributes:
+        window: Number of most recent readings the trend is fitted over
+        min_samples: Number of readings needed before checks are predicted
+        max_skipped_intervals: Maximum check intervals between two predicted checks
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, min_samples: int = DEFAULT_MIN_SAMPLES,
+                 max_skipped_intervals: int = DEFAULT_MAX_SKIPPED_INTERVALS):
+        """
+        Initialize an empty trend.
+
+        Args:
+            window: Number of most recent readings the trend is fitted over
+            min_samples: Number of readings needed before checks are predicted, at least 2
+            max_skipped_intervals: Maximum check intervals between two predicted checks, at least 1
+        """
+        if min_samples < 2:
+            raise ValueError("min_samples must be at least 2")
+        if window < min_samples:
+            raise ValueError("window must be at least min_samples")
+        if max_skipped_intervals < 1:
+            raise ValueError("max_skipped_intervals must be at least 1")
+
+        self.window = window
+        self.min_samples = min_samples
+        self.max_skipped_intervals = max_skipped_intervals
+        self._times = np.zeros(window)
+        self._levels = np.zeros(window)
+        self._count = 0
+
+    @classmethod
+    def from_config(cls, timing_config: Optional[Dict[str, Any]] = None) -> 'MoistureTrend':
+        """
+        Create a trend from a TIMING_CONFIG dictionary.
+
+        Args:
+            timing_config: Timing configuration, missing keys fall back to defaults
+
+        Returns:
+            MoistureTrend instance
+        """
+        timing_config = timing_config or {}
+        return cls(window=timing_config.get('moisture_trend_window', DEFAULT_WINDOW),
+                   max_skipped_intervals=timing_config.get('moisture_check_max_skipped_intervals',
+                                                           DEFAULT_MAX_SKIPPED_INTERVALS))
+
+    def __len__(self) -> int:
+        """Return the number of readings the trend is fitted over."""
+        return min(self._count, self.window)
+
+    def record(self, epoch: float, moisture_level: float) -> None:
+        """
+        Add a reading, replacing the oldest one when the window is full.
+
+        Args:
+            epoch: Epoch time of the reading in seconds
+            moisture_level: Moisture level in percent
+        """
+        position = self._count % self.window
+        self._times[position] = epoch
+        self._levels[position] = moisture_level
+        self._count += 1
+
+    def clear(self) -> None:
+        """Drop all readings, after a watering the soil follows a new trend."""
+        self._count = 0
+
+    def slope(self) -> Optional[float]:
+        """
+        Fit the drying rate over the window.
+
+        Returns:
+            Change of the moisture level in percent per second, None with too few readings
+            or readings all taken at the same time
+        """
+        count = len(self)
+        if count < self.min_samples:
+            return None
+        times = self._times[:count]
+        levels = self._levels[:count]
+        # Centred least squares, the ring order does not matter
+        offsets = times - times.mean()
+        spread = np.dot(offsets, offsets)
+        if spread == 0:
+            return None
+        return float(np.dot(offsets, levels - levels.mean()) / spread)
+
+    def predict_crossing(self, threshold: float) -> Optional[float]:
+        """
+        Predict when the moisture level falls below a threshold.
+
+        Args:
+            threshold: Moisture level in percent below which the plan waters
+
+        Returns:
+            Epoch time of the crossing in seconds, None if there is no drying trend
+        """
+        slope = self.slope()
+        if slope is None or slope >= 0:
+            return None
+        count = len(self)
+        times = self._times[:count]
+        levels = self._levels[:count]
+        # The fitted line passes through the centroid of the readings
+        return float(times.mean() + (threshold - levels.mean()) / slope)
+
+    def next_check(self, epoch: float, threshold: float, check_interval: int) -> Optional[float]:
+        """
+        Compute when the moisture should be checked next.
+
+        Args:
+            epoch: Epoch time of the last check in seconds
+            threshold: Moisture level in percent below which the plan waters
+            check_interval: Minutes between two checks of the plan
+
+        Returns:
+            Epoch time of the next check in seconds, None with too few readings to predict
+        """
+        if len(self) < self.min_samples:
+            return None
+        interval = check_interval * SECONDS_PER_MINUTE
+        longest = interval * self.max_skipped_intervals
+        crossing = self.predict_crossing(threshold)
+        if crossing is None:
+            delay = longest
+        else:
+            # Halving the distance to the crossing corrects a wrong prediction on the way
+            delay = min(max((crossing - epoch) / 2, interval), longest)
+        logging.debug(f"Moisture crossing predicted at {crossing}, next check in {delay:.0f}s")
+        return epoch + delay
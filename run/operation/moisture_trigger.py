@@ -0,0 +1,131 @@
+"""
+Moisture trigger for water plant automation system.
+
+This module reacts to the moisture sensor turning dry instead of waiting
+for the main loop to come around. The sensor's edge callbacks run on the
+GPIO thread and only record the edge; a worker thread waits until the
+sensor has stayed dry for the debounce time and then has the pump evaluate
+its running moisture plan, which keeps the plan's interval guard.
+"""
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+DEFAULT_DEBOUNCE = 2.0
+
+
+class MoistureTrigger:
+    """
+    Debounced dry soil edge trigger of moisture plan evaluations.
+
+    Attributes:
+        pump: Pump evaluating its running moisture plan
+        sensor: Moisture sensor providing when_dry, when_wet and is_dry
+        relay: Relay switching the pump
+        debounce: Seconds the sensor has to stay dry before the plan is evaluated
+        evaluations: Number of evaluations run
+        waterings: Number of evaluations that started watering
+    """
+
+    def __init__(self, pump, sensor, relay, debounce: float = DEFAULT_DEBOUNCE):
+        """
+        Initialize the trigger without attaching it to the sensor.
+
+        Args:
+            pump: Pump evaluating its running moisture plan
+            sensor: Moisture sensor providing when_dry, when_wet and is_dry
+            relay: Relay switching the pump
+            debounce: Seconds the sensor has to stay dry before the plan is evaluated
+        """
+        if debounce < 0:
+            raise ValueError("debounce must not be negative")
+
+        self.pump = pump
+        self.sensor = sensor
+        self.relay = relay
+        self.debounce = debounce
+        self.evaluations = 0
+        self.waterings = 0
+        self._edge = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, pump, sensor, relay, sensor_config: Optional[Dict[str, Any]] = None) -> 'MoistureTrigger':
+        """
+        Create a trigger from a SENSOR_CONFIG dictionary.
+
+        Args:
+            pump: Pump evaluating its running moisture plan
+            sensor: Moisture sensor providing when_dry, when_wet and is_dry
+            relay: Relay switching the pump
+            sensor_config: Sensor configuration, missing keys fall back to defaults
+
+        Returns:
+            MoistureTrigger instance
+        """
+        sensor_config = sensor_config or {}
+        return cls(pump, sensor, relay, debounce=sensor_config.get('moisture_trigger_debounce', DEFAULT_DEBOUNCE))
+
+    def start(self) -> None:
+        """Attach to the sensor's edges and start the evaluation worker."""
+        if self.is_running():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='moisture-trigger', daemon=True)
+        self._thread.start()
+        self.sensor.when_dry = self.on_edge
+        self.sensor.when_wet = self.on_edge
+        logging.info(f"Moisture trigger started with {self.debounce}s debounce")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Detach from the sensor and stop the worker.
+
+        Args:
+            timeout: Seconds to wait for the worker thread, forever if None
+        """
+        self.sensor.when_dry = None
+        self.sensor.when_wet = None
+        self._stopped.set()
+        self._edge.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        logging.info("Moisture trigger stopped")
+
+    def is_running(self) -> bool:
+        """Return whether the evaluation worker is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def on_edge(self) -> None:
+        """Record a sensor edge; called on the GPIO thread, so it must not block."""
+        self._edge.set()
+
+    def _run(self) -> None:
+        """Evaluate the plan once the sensor stayed dry for the debounce time after an edge."""
+        while not self._stopped.is_set():
+            self._edge.wait()
+            self._edge.clear()
+            # Any further edge within the debounce time restarts it
+            if self._stopped.wait(self.debounce) or self._edge.is_set():
+                continue
+            if self.sensor.is_dry():
+                self.evaluate()
+
+    def evaluate(self) -> bool:
+        """
+        Have the pump evaluate its running moisture plan.
+
+        Returns:
+            True if watering was started, False otherwise
+        """
+        self.evaluations += 1
+        try:
+            watered = self.pump.evaluate_moisture_edge(self.relay)
+        except Exception as e:
+            logging.error(f"Moisture plan evaluation on dry soil failed: {e}")
+            return False
+        if watered:
+            self.waterings += 1
+        return watered
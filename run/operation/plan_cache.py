@@ -0,0 +1,100 @@
+"""
+Plan cache for water plant automation system.
+
+This module decodes plan dictionaries received from the server into plan
+objects once. Decoded plans are kept by a hash of their content, so a plan
+the server sends again is reused instead of being validated and, for time
+plans, compiled into a schedule index again.
+"""
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Type
+
+from run.model.plan import Plan
+
+DEFAULT_MAX_SIZE = 16
+
+
+def content_hash(plan_dict: Dict[str, Any]) -> str:
+    """
+    Hash the content of a plan dictionary independently of its key order.
+
+    Args:
+        plan_dict: Plan dictionary
+
+    Returns:
+        Hex digest of the canonical JSON form
+    """
+    canonical = json.dumps(plan_dict, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class PlanCache:
+    """
+    Least recently used cache of decoded plans keyed by plan class and content hash.
+
+    Plans that fail to decode are not cached. Cached plans are shared, so
+    they must not be modified.
+
+    Attributes:
+        max_size: Maximum number of decoded plans kept
+        hits: Number of decodes answered from the cache
+        misses: Number of decodes that built a new plan
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size: Maximum number of decoded plans kept
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._plans: 'OrderedDict[Tuple[str, str], Plan]' = OrderedDict()
+
+    def decode(self, plan_dict: Dict[str, Any], plan_class: Type[Plan]) -> Optional[Plan]:
+        """
+        Decode a plan dictionary, reusing the plan decoded from identical content.
+
+        Args:
+            plan_dict: Plan dictionary as received from the server
+            plan_class: Plan class providing from_dict
+
+        Returns:
+            Decoded plan, None if the dictionary is not a valid plan
+        """
+        try:
+            key = (plan_class.__name__, content_hash(plan_dict))
+        except (TypeError, ValueError) as e:
+            logging.warning(f"Cannot hash plan, decoding without cache: {e}")
+            return plan_class.from_dict(plan_dict)
+
+        plan = self._plans.get(key)
+        if plan is not None:
+            self._plans.move_to_end(key)
+            self.hits += 1
+            logging.debug(f"Plan cache hit for {plan}")
+            return plan
+
+        self.misses += 1
+        plan = plan_class.from_dict(plan_dict)
+        if plan is not None:
+            self._plans[key] = plan
+            if len(self._plans) > self.max_size:
+                self._plans.popitem(last=False)
+        return plan
+
+    def clear(self) -> None:
+        """Drop all cached plans."""
+        self._plans.clear()
+
+    def __len__(self) -> int:
+        """Return the number of cached plans."""
+        return len(self._plans)
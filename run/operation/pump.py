@@ -7,15 +7,26 @@ and status tracking.
 """
 import time
 import logging
+import threading
+import datetime
 from datetime import date
 import calendar
-from typing import Dict, Any, Optional, Union
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
 from run.common import time_keeper as tk
 import run.model.status as s
 import run.model.plan as p
 import run.model.moisture_plan as m
 import run.model.time_plan as t
-import run.common.json_creator as j
+from run.common.time_engine import (SECONDS_PER_MINUTE, SYSTEM_TIME, TimeEngine, minute_of_day, minutes_between,
+                                    time_string)
+from run.model.watertime import WaterTime
+from run.operation.watering_job import WateringJob
+from run.operation.pump_journal import PumpJournal
+from run.operation.plan_cache import PlanCache, content_hash
+from run.operation.moisture_trend import MoistureTrend
+
+# Minutes a missed time plan slot is still watered after it started
+DEFAULT_CATCH_UP_MINUTES = 60
 
 
 class IPumpInterface:
@@ -73,7 +84,10 @@ class Pump(IPumpInterface):
     MOISTURE_SENSOR_KEY = 'moisture_sensor'
     PLAN_TYPE_KEY = 'plan_type'
 
-    def __init__(self, water_max_capacity: int, water_pumped_in_second: int, moisture_max_level: int):
+    def __init__(self, water_max_capacity: int, water_pumped_in_second: int, moisture_max_level: int,
+                 non_blocking: bool = False, journal: Optional[PumpJournal] = None,
+                 catch_up_minutes: int = DEFAULT_CATCH_UP_MINUTES, time_engine: Optional[TimeEngine] = None,
+                 sleep: Optional[Callable[[float], None]] = None, moisture_trend: Optional[MoistureTrend] = None):
         """
         Initialize the pump with capacity and performance parameters.
         
@@ -81,8 +95,16 @@ class Pump(IPumpInterface):
             water_max_capacity: Maximum water capacity in milliliters
             water_pumped_in_second: Water pumping rate in ml/second
             moisture_max_level: Maximum moisture level for sensor calibration
+            non_blocking: Water in a cancellable background job instead of blocking the caller
+            journal: Journal the state is restored from and checkpointed to, not persisted if None
+            catch_up_minutes: Minutes a missed time plan slot is still watered after it started
+            time_engine: Time engine providing the current time and date, the system clock if None
+            sleep: Callable sleeping while a blocking watering runs, time.sleep if None
+            moisture_trend: Trend predicting the next moisture check, a default trend if None
         """
         super().__init__()
+        self.time_engine = time_engine or SYSTEM_TIME
+        self.sleep = sleep
         
         # Initialize time tracking
         self._initialize_time_tracking()
@@ -99,19 +121,36 @@ class Pump(IPumpInterface):
         self.watering_status: Optional[s.Status] = None
         self.moisture_sensor = None
         self.water_reset = True
+        self.non_blocking = non_blocking
+        self.watering_job: Optional[WateringJob] = None
+        self.catch_up_minutes = catch_up_minutes
+        self.schedule_evaluated_at: Optional[datetime.datetime] = None
+        self.plan_cache = PlanCache()
+        self.moisture_trend = moisture_trend or MoistureTrend()
+        self.moisture_check_at: Optional[datetime.datetime] = None
+        self.moisture_watered_at: Optional[int] = None
+        # Plans run on the main loop, dry soil edges on the moisture trigger thread
+        self._lock = threading.RLock()
+        self.journal = journal
+        self._journaled_state: Dict[str, Any] = {}
+        if journal is not None:
+            try:
+                self.restore_state(journal.load())
+            except (TypeError, ValueError) as e:
+                logging.error(f"Failed to restore pump state, starting fresh: {e}")
         
         logging.info(f"Pump initialized: capacity={water_max_capacity}ml, rate={water_pumped_in_second}ml/s")
 
     def _initialize_time_tracking(self) -> None:
         """Initialize time tracking for watering operations."""
         self.water_time = self._create_time_keeper()
-        self.water_time.set_date_last_watered(self.water_time.get_current_date())
-        self.water_time.set_time_last_watered(self.water_time.get_current_time())
+        self.water_time.set_date_last_watered(self.time_engine.current_date())
+        self.water_time.set_time_last_watered(self.water_time.current_time)
         logging.info("Time tracking initialized")
 
     def _create_time_keeper(self) -> tk.TimeKeeper:
         """Create a new time keeper instance."""
-        return tk.TimeKeeper(tk.TimeKeeper.get_current_time())
+        return tk.TimeKeeper(engine=self.time_engine)
 
     def execute_water_plan(self, plan: Union[Dict[str, Any], p.Plan], **sensors) -> s.Status:
         """
@@ -132,19 +171,21 @@ class Pump(IPumpInterface):
         
         logging.info(f"Plan type: {plan_type}")
         
-        # Route to appropriate handler based on plan type
-        if plan_type == self.WATER_PLAN_BASIC:
-            self._execute_basic_plan(plan, relay)
-        elif plan_type == self.WATER_PLAN_MOISTURE:
-            self._execute_moisture_plan(plan, relay, sensors)
-        elif plan_type == self.WATER_PLAN_TIME:
-            self._execute_time_plan(plan, relay)
-        elif plan_type == self.DELETE_RUNNING_PLAN:
-            self._delete_running_plan()
-        else:
-            self._handle_invalid_plan(plan_type)
-            
-        return self.watering_status
+        with self._lock:
+            # Route to appropriate handler based on plan type
+            if plan_type == self.WATER_PLAN_BASIC:
+                self._execute_basic_plan(plan, relay)
+            elif plan_type == self.WATER_PLAN_MOISTURE:
+                self._execute_moisture_plan(plan, relay, sensors)
+            elif plan_type == self.WATER_PLAN_TIME:
+                self._execute_time_plan(plan, relay)
+            elif plan_type == self.DELETE_RUNNING_PLAN:
+                self._delete_running_plan()
+            else:
+                self._handle_invalid_plan(plan_type)
+                
+            self.checkpoint()
+            return self.watering_status
 
     def _extract_plan_type(self, plan: Union[Dict[str, Any], p.Plan]) -> str:
         """Extract plan type from plan object or dictionary."""
@@ -158,9 +199,7 @@ class Pump(IPumpInterface):
         
         # Convert dict to Plan object if needed
         if isinstance(plan, dict):
-            json_string = j.dump_json(plan)
-            logging.info(f"Plan JSON: {json_string}")
-            plan_obj = p.Plan.from_json(json_string)
+            plan_obj = self.plan_cache.decode(plan, p.Plan)
         else:
             plan_obj = plan
             
@@ -179,7 +218,10 @@ class Pump(IPumpInterface):
         
         # Convert dict to MoisturePlan object if needed
         if isinstance(plan, dict):
-            plan_obj = m.MoisturePlan.from_json(j.dump_json(plan))
+            plan_obj = self.plan_cache.decode(plan, m.MoisturePlan)
+            # The predicted check depends on the threshold and interval of the plan
+            if not self._is_running_plan(plan_obj):
+                self.moisture_check_at = None
             self.running_plan = plan_obj
         else:
             self.running_plan = plan
@@ -193,17 +235,31 @@ class Pump(IPumpInterface):
         
         # Convert dict to TimePlan object if needed
         if isinstance(plan, dict):
-            plan_obj = t.TimePlan.from_json(j.dump_json(plan))
+            plan_obj = self.plan_cache.decode(plan, t.TimePlan)
+            # A new plan does not catch up on slots from before it arrived, a resent running plan does
+            if not self._is_running_plan(plan_obj):
+                self.schedule_evaluated_at = None
             self.running_plan = plan_obj
         else:
             self.running_plan = plan
             
         self.water_plant_by_timer(relay, self.running_plan)
 
+    def _is_running_plan(self, plan) -> bool:
+        """Return whether a decoded plan has the same content as the running plan, e.g. resent after a restart."""
+        if plan is None or self.running_plan is None:
+            return False
+        if plan is self.running_plan:
+            return True
+        return (type(plan) is type(self.running_plan)
+                and content_hash(plan.to_dict()) == content_hash(self.running_plan.to_dict()))
+
     def _delete_running_plan(self) -> None:
-        """Delete the currently running plan."""
+        """Delete the currently running plan and stop any watering in progress."""
         logging.info(f"Deleting running plan: {self.DELETE_RUNNING_PLAN}")
+        self.stop_watering()
         self.running_plan = None
+        self.moisture_check_at = None
         self.watering_status = s.Status(watering_status=False, message=s.MESSAGE_DELETED_PLAN)
 
     def _handle_invalid_plan(self, plan_type: str) -> None:
@@ -220,8 +276,12 @@ class Pump(IPumpInterface):
             water_milliliters: Amount of water to dispense
             
         Returns:
-            True if watering was successful, False otherwise
+            True if watering was successful (or started when non-blocking), False otherwise
         """
+        if self.is_watering():
+            logging.warning("Cannot water plant - watering already in progress")
+            return False
+            
         # Check water availability
         if not self.is_water_level_sufficient(water_milliliters):
             logging.warning("Cannot water plant - insufficient water")
@@ -231,11 +291,14 @@ class Pump(IPumpInterface):
         water_seconds = self.get_water_time_in_seconds_from_percent(water_milliliters)
         logging.info(f"Watering for {water_seconds} seconds ({water_milliliters}ml)")
         
+        if self.non_blocking:
+            return self._start_watering_job(relay, water_seconds, water_milliliters)
+            
         # Execute watering sequence
         try:
             relay.on()
             logging.info("Plant watering started")
-            time.sleep(water_seconds)
+            (self.sleep or time.sleep)(water_seconds)
             logging.info("Plant watering completed")
             return True
         except Exception as e:
@@ -245,6 +308,60 @@ class Pump(IPumpInterface):
             relay.off()
             logging.info("Relay turned off")
 
+    def _start_watering_job(self, relay, water_seconds: int, water_milliliters: int) -> bool:
+        """Start watering in the background and return without waiting for it."""
+        job = WateringJob(relay, water_seconds, water_milliliters)
+        try:
+            job.start()
+        except Exception as e:
+            logging.error(f"Error starting watering: {e}")
+            relay.off()
+            return False
+        self.watering_job = job
+        return True
+
+    def is_watering(self) -> bool:
+        """Return whether a background watering is in progress."""
+        return self.watering_job is not None and self.watering_job.is_running()
+
+    def _defer_while_watering(self) -> bool:
+        """Return whether plan evaluation waits for a background watering, its due slots stay due meanwhile."""
+        if not self.is_watering():
+            return False
+        logging.info("Watering in progress, plan evaluated once it has finished")
+        self.watering_status = s.Status(watering_status=True, message=s.MESSAGE_WATERING_IN_PROGRESS)
+        return True
+
+    def stop_watering(self) -> bool:
+        """
+        Stop a background watering immediately.
+        
+        The water that was not pumped is returned to the water level.
+        
+        Returns:
+            True if a watering was stopped, False if none was running
+        """
+        job = self.watering_job
+        if job is None or not job.is_running():
+            return False
+        job.cancel()
+        unpumped = job.water_milliliters - job.progress()['water_pumped']
+        self.water_level += unpumped
+        logging.info(f"Watering stopped after {job.elapsed():.1f}s, {unpumped}ml not pumped")
+        self.checkpoint()
+        return True
+
+    def get_watering_progress(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the progress of the last background watering.
+        
+        Returns:
+            Progress dictionary of the watering job, None if there was none
+        """
+        if self.watering_job is None:
+            return None
+        return self.watering_job.progress()
+
     def water_plant_by_moisture(self, relay, moisture_sensor, moisture_plan: m.MoisturePlan) -> None:
         """
         Water plant based on moisture sensor readings and timing constraints.
@@ -255,14 +372,62 @@ class Pump(IPumpInterface):
             moisture_plan: Moisture-based watering plan
         """
         logging.info(f"Starting moisture-based watering with interval: {moisture_plan.check_interval}min")
+        if self._defer_while_watering():
+            return
         
-        # Check timing constraints
-        if not self._check_moisture_timing_constraints(moisture_plan.check_interval):
+        # Check the predicted check time once the trend is known, the timing constraints otherwise
+        if self.moisture_check_at is not None:
+            if self.time_engine.now() < self.moisture_check_at:
+                logging.info(f"Moisture check not due until {self.moisture_check_at}")
+                self.watering_status = s.Status(watering_status=False, message=s.MESSAGE_PLAN_CONDITION_NOT_MET)
+                return
+        elif not self._check_moisture_timing_constraints(moisture_plan.check_interval):
             return
             
         # Check moisture level and water if needed
         self._evaluate_moisture_and_water(relay, moisture_sensor, moisture_plan)
 
+    def evaluate_moisture_edge(self, relay) -> bool:
+        """
+        Evaluate the running moisture plan right away after the sensor reported dry soil.
+        
+        The edge only brings the check forward: the plan's threshold decides
+        whether to water, and no watering starts within check_interval
+        minutes of the last moisture watering.
+        
+        Args:
+            relay: Relay control object
+            
+        Returns:
+            True if watering was started, False otherwise
+        """
+        with self._lock:
+            moisture_plan = self.running_plan
+            if not isinstance(moisture_plan, m.MoisturePlan) or self.moisture_sensor is None:
+                logging.debug("Dry soil reported without a running moisture plan")
+                return False
+            if self.is_watering():
+                logging.info("Dry soil reported while watering")
+                return False
+            if not self._is_moisture_interval_elapsed(moisture_plan.check_interval):
+                logging.info(f"Dry soil reported within {moisture_plan.check_interval}min of the last watering")
+                return False
+            
+            logging.info("Dry soil reported, evaluating moisture plan")
+            self._evaluate_moisture_and_water(relay, self.moisture_sensor, moisture_plan)
+            self.checkpoint()
+            return bool(self.watering_status and self.watering_status.watering_status)
+
+    def _is_moisture_interval_elapsed(self, check_interval: int) -> bool:
+        """Return whether check_interval minutes have passed since the last moisture watering."""
+        if self.moisture_watered_at is not None:
+            minutes = (self.time_engine.epoch() - self.moisture_watered_at) / SECONDS_PER_MINUTE
+        else:
+            # Without a watering in this run the last watering time of day is all there is
+            minutes = minutes_between(minute_of_day(self.water_time.time_last_watered),
+                                      self.time_engine.minute_of_day())
+        return minutes >= check_interval
+
     def _check_moisture_timing_constraints(self, check_interval: int) -> bool:
         """
         Check if moisture watering timing constraints are met.
@@ -273,14 +438,14 @@ class Pump(IPumpInterface):
         Returns:
             True if timing constraints are met, False otherwise
         """
-        current_time_minus_delta = self.get_time().get_current_time_minus_delta(check_interval)
+        current_time_minus_delta = self.get_time().get_current_time_minus_delta(check_interval, self.time_engine)
         logging.info(f"Current time minus delta: {current_time_minus_delta}")
         
         # Initialize water time if needed
         self._set_watered_time_if_none(current_time_minus_delta)
         
         # Check if time is out of range and reset if needed
-        if self._is_water_time_out_of_range(check_interval):
+        if self._is_water_time_out_of_range(check_interval, current_time_minus_delta):
             self._reset_water_time(current_time_minus_delta)
             
         # Verify timing constraint
@@ -307,10 +472,24 @@ class Pump(IPumpInterface):
         
         # Check if moisture is below threshold
         if moisture_level < moisture_plan.moisture_threshold:
+            # Watering starts a new trend, checks follow the check interval until it is known
+            self.moisture_trend.clear()
+            self.moisture_check_at = None
             self._execute_moisture_watering(relay, moisture_sensor, moisture_plan)
         else:
             logging.info("Moisture level sufficient - no watering needed")
             self.watering_status = s.Status(watering_status=False, message=s.MESSAGE_PLAN_CONDITION_NOT_MET)
+            self._predict_next_moisture_check(moisture_level, moisture_plan)
+
+    def _predict_next_moisture_check(self, moisture_level: int, moisture_plan: m.MoisturePlan) -> None:
+        """Record a moisture check and predict the next one from the drying trend."""
+        epoch = self.time_engine.epoch()
+        self.moisture_trend.record(epoch, moisture_level)
+        check_at = self.moisture_trend.next_check(epoch, moisture_plan.moisture_threshold,
+                                                  moisture_plan.check_interval)
+        self.moisture_check_at = None if check_at is None else datetime.datetime.fromtimestamp(check_at)
+        if self.moisture_check_at is not None:
+            logging.info(f"Next moisture check predicted at {self.moisture_check_at}")
 
     def _execute_moisture_watering(self, relay, moisture_sensor, moisture_plan: m.MoisturePlan) -> None:
         """
@@ -339,7 +518,8 @@ class Pump(IPumpInterface):
 
     def _update_moisture_watering_tracking(self, moisture_sensor) -> None:
         """Update time and moisture tracking after successful watering."""
-        self.water_time.set_time_last_watered(self.get_time().get_current_time())
+        self.water_time.set_time_last_watered(self.get_time().get_current_time(self.time_engine))
+        self.moisture_watered_at = self.time_engine.epoch()
         self.moisture_level = moisture_sensor.value
         self.watering_status = s.Status(watering_status=True, message=s.MESSAGE_SUCCESS_MOISTURE)
 
@@ -350,25 +530,30 @@ class Pump(IPumpInterface):
             self.water_time.set_time_last_watered(current_time_minus_delta)
             logging.info("Water time initialized")
 
-    def _is_water_time_out_of_range(self, check_interval: int) -> bool:
+    def _is_water_time_out_of_range(self, check_interval: int, current_time_minus_delta: str) -> bool:
         """
         Check if the last watering time is out of the acceptable range.
         
+        The minutes since the last watering are counted modulo one day, so
+        a watering before midnight is not out of range just after it.
+        
         Args:
             check_interval: Time interval in minutes between checks
+            current_time_minus_delta: Current time minus check_interval in HH:MM format
             
         Returns:
             True if time is out of range, False otherwise
         """
         out_of_range_delta = check_interval * 2
-        out_of_range_time = self.get_time().get_current_time_minus_delta(out_of_range_delta)
+        current_minute = minute_of_day(current_time_minus_delta) + check_interval
+        minutes_since_watered = minutes_between(minute_of_day(self.water_time.time_last_watered), current_minute)
         
         logging.info(f"Checking time range: last_watered={self.water_time.time_last_watered}, "
-                    f"out_of_range_time={out_of_range_time}")
+                    f"{minutes_since_watered} minutes ago")
         
-        if self.water_time.time_last_watered < out_of_range_time:
+        if minutes_since_watered > out_of_range_delta:
             logging.info(f"Time {self.water_time.time_last_watered} is out of range "
-                        f"(less than {out_of_range_time})")
+                        f"(more than {out_of_range_delta} minutes ago)")
             return True
         return False
 
@@ -382,20 +567,31 @@ class Pump(IPumpInterface):
         """
         Water plant based on scheduled times and days.
         
+        Every slot that started since the schedule was last evaluated is due,
+        so a cycle taking longer than a minute does not skip a slot. Due slots
+        are watered one per call in chronological order and each slot fires
+        at most once.
+        
         Args:
             relay: Relay control object
             time_plan: Time-based watering plan
         """
+        if self._defer_while_watering():
+            return
         current_weekday = self._get_current_weekday()
-        current_time = self.get_time().get_current_time()
+        current_time = self.get_time().get_current_time(self.time_engine)
         
         logging.info(f"Checking time-based watering: weekday={current_weekday}, time={current_time}")
         
-        # Check each scheduled time in the plan
-        for scheduled_time in time_plan.weekday_times:
-            if self._should_execute_scheduled_watering(scheduled_time, current_weekday, current_time):
-                self._execute_scheduled_watering(relay, time_plan, scheduled_time)
-                return
+        now = self._get_schedule_instant(current_time)
+        if now is not None:
+            for slot, scheduled_time in self._find_due_scheduled_waterings(time_plan, now):
+                # Slots are passed once, whether they water or not
+                self.schedule_evaluated_at = slot
+                if self._should_execute_scheduled_watering(scheduled_time, slot):
+                    self._execute_scheduled_watering(relay, time_plan, scheduled_time, slot)
+                    return
+            self.schedule_evaluated_at = now
                 
         # No scheduled watering found
         logging.info("No scheduled watering time matches current conditions")
@@ -403,43 +599,76 @@ class Pump(IPumpInterface):
 
     def _get_current_weekday(self) -> str:
         """Get current weekday name."""
-        today = date.today()
+        today = self._get_current_date()
         weekday = calendar.day_name[today.weekday()]
         logging.info(f"Current weekday: {weekday}")
         return weekday
 
-    def _should_execute_scheduled_watering(self, scheduled_time, current_weekday: str, current_time: str) -> bool:
+    def _get_current_date(self) -> date:
+        """Get the current date from the pump's time engine."""
+        return self.time_engine.current_date()
+
+    def _get_schedule_instant(self, current_time: str) -> Optional[datetime.datetime]:
+        """Get the start of the current minute today, None if the current time is invalid."""
+        try:
+            minute = minute_of_day(current_time)
+        except (TypeError, ValueError):
+            logging.warning(f"Cannot evaluate schedule at invalid time {current_time}")
+            return None
+        return datetime.datetime.combine(self._get_current_date(), datetime.time()) + datetime.timedelta(minutes=minute)
+
+    def _find_due_scheduled_waterings(self, time_plan: t.TimePlan,
+                                      now: datetime.datetime) -> List[Tuple[datetime.datetime, WaterTime]]:
+        """
+        Find the slots of the plan's schedule index that started since the last evaluation.
+        
+        The first evaluation, and one after the clock went backwards, only
+        covers the current minute. Slots older than catch_up_minutes are dropped.
+        
+        Args:
+            time_plan: Time-based watering plan
+            now: Start of the current minute
+            
+        Returns:
+            Slot starts and scheduled watering time objects in chronological order
+        """
+        current_minute = now - datetime.timedelta(minutes=1)
+        last = self.schedule_evaluated_at
+        if last is None or last > now:
+            last = current_minute
+        oldest = now - datetime.timedelta(minutes=max(self.catch_up_minutes, 1))
+        if last < oldest:
+            missed = time_plan.schedule.due_between(last, oldest)
+            if missed:
+                logging.warning(f"Dropping {len(missed)} scheduled waterings older than "
+                                f"{self.catch_up_minutes} minutes, first at {missed[0][0]}")
+            last = oldest
+        due = time_plan.schedule.due_between(last, now)
+        if due and due[0][0] <= current_minute:
+            logging.info(f"Catching up {len(due)} scheduled waterings since {last}")
+        return due
+
+    def _should_execute_scheduled_watering(self, scheduled_time: WaterTime, slot: datetime.datetime) -> bool:
         """
         Check if scheduled watering should be executed.
         
         Args:
             scheduled_time: Scheduled watering time object
-            current_weekday: Current weekday name
-            current_time: Current time string
+            slot: Start of the due slot
             
         Returns:
             True if watering should be executed, False otherwise
         """
-        # Parse scheduled time
-        water_time_obj = tk.TimeKeeper.get_time_from_time_string(scheduled_time.time_water)
-        
-        # Check weekday match
-        if scheduled_time.weekday != current_weekday:
-            return False
-            
-        # Check time match
-        if water_time_obj != current_time:
-            return False
-            
-        # Check if already watered today or at this time
-        if (water_time_obj == self.water_time.time_last_watered and 
-            self.get_date().get_current_date() == self.water_time.date_last_watered):
-            logging.info("Already watered at this time today")
+        # Check if this slot was already watered, e.g. before a restart
+        if (time_string(slot.hour * 60 + slot.minute) == self.water_time.time_last_watered and
+            slot.date() == self.water_time.date_last_watered):
+            logging.info(f"Already watered at {scheduled_time.weekday} {scheduled_time.time_water}")
             return False
             
         return True
 
-    def _execute_scheduled_watering(self, relay, time_plan: t.TimePlan, scheduled_time) -> None:
+    def _execute_scheduled_watering(self, relay, time_plan: t.TimePlan, scheduled_time,
+                                    slot: datetime.datetime) -> None:
         """
         Execute scheduled watering operation.
         
@@ -447,8 +676,9 @@ class Pump(IPumpInterface):
             relay: Relay control object
             time_plan: Time-based watering plan
             scheduled_time: Scheduled watering time object
+            slot: Start of the due slot
         """
-        logging.info(f"Executing scheduled watering: {scheduled_time} at {scheduled_time.time_water}")
+        logging.info(f"Executing scheduled watering: {scheduled_time.weekday} at {scheduled_time.time_water}")
         
         water_milliliters = time_plan.water_volume
         
@@ -461,16 +691,15 @@ class Pump(IPumpInterface):
         # Execute watering
         if self.water_plant(relay, water_milliliters):
             # Update tracking after successful watering
-            self._update_scheduled_watering_tracking(scheduled_time, time_plan)
+            self._update_scheduled_watering_tracking(slot, time_plan)
             logging.info("Scheduled watering completed successfully")
         else:
             self.watering_status = s.Status(watering_status=False, message=s.MESSAGE_INSUFFICIENT_WATER)
 
-    def _update_scheduled_watering_tracking(self, scheduled_time, time_plan: t.TimePlan) -> None:
+    def _update_scheduled_watering_tracking(self, slot: datetime.datetime, time_plan: t.TimePlan) -> None:
         """Update tracking after successful scheduled watering."""
-        water_time_obj = tk.TimeKeeper.get_time_from_time_string(scheduled_time.time_water)
-        self.water_time.set_time_last_watered(water_time_obj)
-        self.water_time.set_date_last_watered(self.get_date().get_current_date())
+        self.water_time.set_time_last_watered(time_string(slot.hour * 60 + slot.minute))
+        self.water_time.set_date_last_watered(slot.date())
         self.watering_status = s.Status(watering_status=True, message=s.MESSAGE_SUCCESS_TIMER)
         
         # Clear plan if it should only execute once
@@ -479,16 +708,12 @@ class Pump(IPumpInterface):
             logging.info("Plan cleared after single execution")
 
     def get_time(self) -> tk.TimeKeeper:
-        """Get a new time keeper instance with current time."""
-        time_keeper = tk.TimeKeeper(tk.TimeKeeper.get_current_time())
-        logging.info(f"Created time keeper with current time: {time_keeper.get_current_time()}")
-        return time_keeper
+        """Get a time keeper on the pump's time engine."""
+        return tk.TimeKeeper(engine=self.time_engine)
 
     def get_date(self) -> tk.TimeKeeper:
-        """Get a new time keeper instance with current date."""
-        date_keeper = tk.TimeKeeper(tk.TimeKeeper.get_current_date())
-        logging.info(f"Created date keeper with current date: {date_keeper.get_current_date()}")
-        return date_keeper
+        """Get a time keeper on the pump's time engine, for reading the current date."""
+        return tk.TimeKeeper(engine=self.time_engine)
 
     def reset_water_level(self, capacity: int) -> None:
         """
@@ -501,6 +726,7 @@ class Pump(IPumpInterface):
         self.water_level = capacity
         self.water_reset = True
         logging.info(f"Water level reset to {self.get_water_level_in_percent():.1f}%")
+        self.checkpoint()
 
     def is_water_level_sufficient(self, water_milliliters: int) -> bool:
         """
@@ -582,3 +808,70 @@ class Pump(IPumpInterface):
             Current running plan or None if no plan is active
         """
         return self.running_plan
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get the pump state that survives a restart.
+        
+        Returns:
+            Dictionary with water level and capacity, water reset flag,
+            running plan and last watering date and time
+        """
+        date_last_watered = getattr(self.water_time, 'date_last_watered', None)
+        return {
+            'water_level': self.water_level,
+            'water_max_capacity': self.water_max_capacity,
+            'water_reset': self.water_reset,
+            'running_plan': self.running_plan.to_dict() if self.running_plan is not None else None,
+            'time_last_watered': getattr(self.water_time, 'time_last_watered', None),
+            'date_last_watered': date_last_watered.strftime(tk.DATE_FORMAT) if date_last_watered else None
+        }
+
+    def checkpoint(self) -> None:
+        """Journal the state fields changed since the last checkpoint."""
+        if self.journal is None:
+            return
+        state = self.get_state()
+        changes = {key: value for key, value in state.items() if self._journaled_state.get(key, ...) != value}
+        try:
+            self.journal.record(changes)
+        except (OSError, TypeError, ValueError) as e:
+            logging.error(f"Failed to journal pump state: {e}")
+            return
+        self._journaled_state = state
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restore the pump state from a journaled state.
+        
+        Args:
+            state: State as returned by get_state, missing fields keep their initial value
+        """
+        if not state:
+            return
+        self.water_level = state.get('water_level', self.water_level)
+        self.water_max_capacity = state.get('water_max_capacity', self.water_max_capacity)
+        self.water_reset = state.get('water_reset', self.water_reset)
+        plan = state.get('running_plan')
+        self.running_plan = self._plan_from_dict(plan) if plan else None
+        if state.get('time_last_watered'):
+            self.water_time.set_time_last_watered(state['time_last_watered'])
+        if state.get('date_last_watered'):
+            self.water_time.set_date_last_watered(state['date_last_watered'])
+        if state.get('time_last_watered') and state.get('date_last_watered'):
+            # Time plan slots missed while the pump was down are caught up from the last watering
+            self.schedule_evaluated_at = datetime.datetime.strptime(
+                f"{state['date_last_watered']} {state['time_last_watered']}", f"{tk.DATE_FORMAT} {tk.TIME_FORMAT}")
+        self._journaled_state = self.get_state()
+        logging.info(f"Pump state restored: water={self.water_level}ml, plan={self.running_plan}, "
+                     f"last watered={state.get('date_last_watered')} {state.get('time_last_watered')}")
+
+    def _plan_from_dict(self, plan: Dict[str, Any]) -> Optional[Union[m.MoisturePlan, t.TimePlan]]:
+        """Create a running plan from its dictionary, None for plans that do not keep running."""
+        plan_type = plan.get(self.PLAN_TYPE_KEY)
+        if plan_type == self.WATER_PLAN_MOISTURE:
+            return self.plan_cache.decode(plan, m.MoisturePlan)
+        if plan_type == self.WATER_PLAN_TIME:
+            return self.plan_cache.decode(plan, t.TimePlan)
+        logging.warning(f"Cannot restore running plan of type {plan_type}")
+        return None
@@ -0,0 +1,130 @@
+"""
+Pump state journal for water plant automation system.
+
+This module persists the pump state across restarts. Changes are appended
+to a log as one JSON line each; every few entries the merged state is
+written to a snapshot file, replaced atomically, and the log is cleared.
+Loading applies the log on top of the snapshot, so the last consistent
+state is restored even after a crash in the middle of a write.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+DEFAULT_COMPACT_EVERY = 100
+LOG_SUFFIX = '.log'
+
+
+class PumpJournal:
+    """
+    Snapshot plus append-only change log of the pump state.
+
+    Entries hold absolute field values, so replaying an entry that is
+    already part of the snapshot is harmless.
+
+    Attributes:
+        path: Path of the snapshot file, the log is stored next to it
+        compact_every: Number of log entries after which a snapshot is written
+        fsync: Whether every write is flushed to the storage device
+    """
+
+    def __init__(self, path: str, compact_every: int = DEFAULT_COMPACT_EVERY, fsync: bool = True):
+        """
+        Initialize the journal without reading it.
+
+        Args:
+            path: Path of the snapshot file
+            compact_every: Number of log entries after which a snapshot is written
+            fsync: Whether every write is flushed to the storage device
+        """
+        if compact_every < 1:
+            raise ValueError("compact_every must be at least 1")
+
+        self.path = path
+        self.log_path = f'{path}{LOG_SUFFIX}'
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._state: Dict[str, Any] = {}
+        self._entries = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Read the snapshot and apply the logged changes.
+
+        An unreadable snapshot is ignored and reading the log stops at the
+        first torn entry, after which the journal is compacted so the torn
+        bytes are dropped.
+
+        Returns:
+            Restored state, empty if nothing was journaled
+        """
+        state: Dict[str, Any] = {}
+        try:
+            with open(self.path) as snapshot_file:
+                state = json.load(snapshot_file)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable pump snapshot {self.path}: {e}")
+
+        entries = 0
+        torn = False
+        try:
+            with open(self.log_path) as log_file:
+                for line in log_file:
+                    try:
+                        state.update(json.loads(line))
+                    except ValueError:
+                        logging.warning(f"Pump journal ends with a torn entry after {entries} entries")
+                        torn = True
+                        break
+                    entries += 1
+        except FileNotFoundError:
+            pass
+
+        self._state = state
+        self._entries = entries
+        if torn:
+            # Later entries appended after the torn bytes would never be replayed
+            self.compact()
+        logging.info(f"Pump journal loaded from {self.path} with {entries} log entries")
+        return dict(state)
+
+    def record(self, changes: Dict[str, Any]) -> None:
+        """
+        Append changed fields to the log, compacting it when it has grown.
+
+        Args:
+            changes: Changed fields with their new values
+        """
+        if not changes:
+            return
+        self._state.update(changes)
+        with open(self.log_path, 'a') as log_file:
+            log_file.write(json.dumps(changes) + '\n')
+            self._flush(log_file)
+        self._entries += 1
+        if self._entries >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """Write the merged state as snapshot and clear the log."""
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w') as snapshot_file:
+            json.dump(self._state, snapshot_file)
+            self._flush(snapshot_file)
+        os.replace(temp_path, self.path)
+        # A crash before the log is cleared only replays entries already in the snapshot
+        with open(self.log_path, 'w') as log_file:
+            self._flush(log_file)
+        self._entries = 0
+        logging.debug(f"Pump journal compacted into {self.path}")
+
+    def _flush(self, journal_file) -> None:
+        """Flush a journal file, down to the storage device if enabled."""
+        journal_file.flush()
+        if self.fsync:
+            os.fsync(journal_file.fileno())
@@ -0,0 +1,224 @@
+"""
+Cycle scheduler for water plant automation system.
+
+This module computes when the main loop has something to do: the next
+run of one of its phases (network poll, photo poll, heartbeat, telemetry),
+each at its own period, the next weekday/time slot of a running time plan,
+or the next check boundary of a running moisture plan. The loop sleeps
+exactly until the earliest of them instead of waking on a fixed interval.
+"""
+import datetime
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import run.model.moisture_plan as m
+import run.model.time_plan as t
+from run.common.time_keeper import TIME_FORMAT
+
+ONE_MINUTE = datetime.timedelta(minutes=1)
+DEFAULT_POLL_INTERVAL = 60
+
+# Phases of the main loop
+PHASE_POLL = 'poll'
+PHASE_PHOTO = 'photo'
+PHASE_HEARTBEAT = 'heartbeat'
+PHASE_TELEMETRY = 'telemetry'
+# TIMING_CONFIG keys of the phase periods, a missing key runs the phase with the poll
+PHASE_CONFIG_KEYS = {
+    PHASE_PHOTO: 'photo_poll_interval',
+    PHASE_HEARTBEAT: 'health_check_interval',
+    PHASE_TELEMETRY: 'sensor_read_interval'
+}
+
+
+class CycleScheduler:
+    """
+    Compute and wait for the next due instant of the main loop.
+
+    Every phase runs at its own period. Phases without a period of their
+    own run together with the network poll.
+
+    Attributes:
+        poll_interval: Seconds between two network polls
+        intervals: Seconds between two runs per phase
+    """
+
+    def __init__(self, poll_interval: float, clock: Callable[[], datetime.datetime] = datetime.datetime.now,
+                 sleep: Callable[[float], None] = time.sleep, phase_intervals: Optional[Dict[str, float]] = None):
+        """
+        Initialize the scheduler with every phase due immediately.
+
+        Args:
+            poll_interval: Seconds between two network polls
+            clock: Callable returning the current local time
+            sleep: Callable sleeping for a number of seconds
+            phase_intervals: Seconds between two runs of further phases, keyed by phase
+        """
+        self.intervals = {**(phase_intervals or {}), PHASE_POLL: poll_interval}
+        self._clock = clock
+        self._sleep = sleep
+        now = clock()
+        self._next_due = {phase: now for phase in self.intervals}
+        self._next_plan: Optional[datetime.datetime] = None
+
+    @classmethod
+    def from_config(cls, timing_config: Optional[Dict[str, Any]] = None, poll_interval: Optional[float] = None,
+                    clock: Callable[[], datetime.datetime] = datetime.datetime.now,
+                    sleep: Callable[[float], None] = time.sleep) -> 'CycleScheduler':
+        """
+        Create a scheduler from a TIMING_CONFIG dictionary.
+
+        Args:
+            timing_config: Timing configuration, phases without a period run with the poll
+            poll_interval: Seconds between two network polls, wait_time_between_cycle if None
+            clock: Callable returning the current local time
+            sleep: Callable sleeping for a number of seconds
+
+        Returns:
+            CycleScheduler instance
+        """
+        timing_config = timing_config or {}
+        if poll_interval is None:
+            poll_interval = timing_config.get('wait_time_between_cycle', DEFAULT_POLL_INTERVAL)
+        return cls(poll_interval, clock=clock, sleep=sleep,
+                   phase_intervals={phase: timing_config[key]
+                                    for phase, key in PHASE_CONFIG_KEYS.items() if key in timing_config})
+
+    @property
+    def poll_interval(self) -> float:
+        """Seconds between two network polls."""
+        return self.intervals[PHASE_POLL]
+
+    @poll_interval.setter
+    def poll_interval(self, seconds: float) -> None:
+        self.intervals[PHASE_POLL] = seconds
+
+    def next_due(self, phase: str) -> datetime.datetime:
+        """Return the next run of a phase, phases without a period follow the poll."""
+        return self._next_due.get(phase, self._next_due[PHASE_POLL])
+
+    def is_due(self, phase: str) -> bool:
+        """Return whether a phase is due."""
+        return self._clock() >= self.next_due(phase)
+
+    def due_phases(self) -> List[str]:
+        """Return the phases that are due."""
+        return [phase for phase in self.intervals if self.is_due(phase)]
+
+    def mark_done(self, phase: str) -> None:
+        """Schedule the next run of a phase one period from now."""
+        if phase in self.intervals:
+            self._next_due[phase] = self._clock() + datetime.timedelta(seconds=self.intervals[phase])
+
+    def is_poll_due(self) -> bool:
+        """Return whether the next network poll is due."""
+        return self.is_due(PHASE_POLL)
+
+    def mark_polled(self) -> None:
+        """Schedule the next network poll one poll interval from now."""
+        self.mark_done(PHASE_POLL)
+
+    def is_plan_due(self) -> bool:
+        """Return whether the plan event the last wait slept for has come."""
+        return self._next_plan is not None and self._clock() >= self._next_plan
+
+    def next_plan_due(self, plan, time_last_watered: Optional[str],
+                      moisture_check_at: Optional[datetime.datetime] = None) -> Optional[datetime.datetime]:
+        """
+        Compute the next instant a running plan can water.
+
+        Args:
+            plan: Running plan of the pump
+            time_last_watered: Last watering time in HH:MM format
+            moisture_check_at: Moisture check predicted by the pump, the check interval is used if None
+
+        Returns:
+            Next due instant, None if the plan has no time based trigger
+        """
+        now = self._clock()
+        if isinstance(plan, t.TimePlan):
+            return self._next_time_slot(plan, now)
+        if isinstance(plan, m.MoisturePlan):
+            return self._next_moisture_check(plan, time_last_watered, now, moisture_check_at)
+        return None
+
+    def _next_time_slot(self, plan: t.TimePlan, now: datetime.datetime) -> Optional[datetime.datetime]:
+        """Return the start of the next weekday/time slot after now."""
+        next_slot = plan.schedule.next_due(now)
+        return next_slot[0] if next_slot else None
+
+    def _next_moisture_check(self, plan: m.MoisturePlan, time_last_watered: Optional[str],
+                             now: datetime.datetime,
+                             moisture_check_at: Optional[datetime.datetime] = None) -> datetime.datetime:
+        """
+        Return the next check boundary of a moisture plan.
+
+        The pump checks moisture once check_interval minutes have passed since
+        the last watering. Once that boundary has passed without watering the
+        pump may reset its reference on any later minute, so the next minute
+        is due. Once the pump predicts its next check from the drying trend,
+        that check is due instead.
+        """
+        next_minute = now.replace(second=0, microsecond=0) + ONE_MINUTE
+        if moisture_check_at is not None:
+            return moisture_check_at if moisture_check_at > now else next_minute
+        if not time_last_watered:
+            return next_minute
+        try:
+            last_time = datetime.datetime.strptime(time_last_watered, TIME_FORMAT).time()
+        except ValueError:
+            return next_minute
+        last_watered = datetime.datetime.combine(now.date(), last_time)
+        if last_watered > now:
+            last_watered -= datetime.timedelta(days=1)
+        boundary = last_watered + datetime.timedelta(minutes=plan.check_interval)
+        return boundary if boundary > now else next_minute
+
+    def seconds_until(self, instant: Optional[datetime.datetime]) -> Optional[float]:
+        """Return the non-negative seconds until an instant, None for no instant."""
+        if instant is None:
+            return None
+        return max((instant - self._clock()).total_seconds(), 0.0)
+
+    def seconds_until_phase(self, phase: str) -> float:
+        """Return the seconds until a phase is due again, a phase due now counts as run in this cycle."""
+        seconds = self.seconds_until(self.next_due(phase))
+        return seconds if seconds > 0 else self.intervals.get(phase, self.poll_interval)
+
+    def seconds_until_next(self, plan, time_last_watered: Optional[str],
+                           moisture_check_at: Optional[datetime.datetime] = None) -> float:
+        """
+        Compute the seconds until the next phase or plan event.
+
+        Args:
+            plan: Running plan of the pump
+            time_last_watered: Last watering time in HH:MM format
+            moisture_check_at: Moisture check predicted by the pump
+
+        Returns:
+            Seconds until the earliest due instant
+        """
+        phase_in = min(self.seconds_until(due) for due in self._next_due.values())
+        self._next_plan = self.next_plan_due(plan, time_last_watered, moisture_check_at)
+        plan_in = self.seconds_until(self._next_plan)
+        return phase_in if plan_in is None else min(phase_in, plan_in)
+
+    def wait(self, plan, time_last_watered: Optional[str],
+             moisture_check_at: Optional[datetime.datetime] = None) -> float:
+        """
+        Sleep until the next phase or plan event is due.
+
+        Args:
+            plan: Running plan of the pump
+            time_last_watered: Last watering time in HH:MM format
+            moisture_check_at: Moisture check predicted by the pump
+
+        Returns:
+            Seconds slept
+        """
+        seconds = self.seconds_until_next(plan, time_last_watered, moisture_check_at)
+        logging.debug(f"Next cycle in {seconds:.1f}s")
+        if seconds > 0:
+            self._sleep(seconds)
+        return seconds
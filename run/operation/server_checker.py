@@ -4,12 +4,16 @@ Server checker module for water plant automation system.
 This module provides the main execution loop that coordinates between the pump,
 server communication, and sensor operations.
 """
+import datetime
 import logging
-from time import sleep
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import run.common.json_creator as j
 import run.model.status as st
 from run.operation.camera_op import PHOTO_ID, CAMERA_KEY
+from run.operation.async_cycle import AsyncCycleDriver, PollResult
+from run.operation.scheduler import CycleScheduler, PHASE_HEARTBEAT, PHASE_PHOTO, PHASE_TELEMETRY
+from run.operation.cycle_profiler import CycleProfiler
+from run.http_communicator.async_server_communicator import AsyncServerCommunicator
 
 
 class IServerCheckerInterface:
@@ -38,8 +42,22 @@ class ServerChecker(IServerCheckerInterface):
     
     # Constants
     WATER_CONST = 'water'
+    COMMAND_TYPE = 'type'
+    COMMAND_PAYLOAD = 'payload'
+    COMMAND_WATER = 'water_level'
+    COMMAND_PICTURE = 'picture'
+    COMMAND_PLAN = 'plan'
+    # Profiled phases of a cycle
+    PROFILE_HEALTH_CHECK = 'health_check'
+    PROFILE_COMMANDS = 'commands'
+    PROFILE_POLL = 'poll'
+    PROFILE_WATER_LEVEL = 'water_level'
+    PROFILE_PHOTO = 'photo'
+    PROFILE_PLAN = 'watering_plan'
 
-    def __init__(self, pump, communicator, wait_time_between_cycle: int):
+    def __init__(self, pump, communicator, wait_time_between_cycle: int,
+                 cycle_driver: Optional[AsyncCycleDriver] = None, scheduler: Optional[CycleScheduler] = None,
+                 long_poll: bool = True, profiler: Optional[CycleProfiler] = None):
         """
         Initialize the server checker.
         
@@ -47,12 +65,23 @@ class ServerChecker(IServerCheckerInterface):
             pump: Pump instance for watering operations
             communicator: Server communicator for API calls
             wait_time_between_cycle: Wait time in seconds between execution cycles
+            cycle_driver: Driver polling the server concurrently, created from communicator if None
+            scheduler: Scheduler deciding when the loop wakes and which phases run, all phases
+                run every wait_time_between_cycle if None
+            long_poll: Whether to wait on the command channel, the single endpoints are polled if False
+            profiler: Profiler recording the phases of each cycle, created with default budget if None
         """
         super().__init__()
         
         self.pump = pump
-        self.communicator = communicator
+        self.profiler = profiler or CycleProfiler()
+        # Network calls are counted per profiled phase
+        self.communicator = self.profiler.count_calls(communicator)
         self.wait_time_between_cycle = wait_time_between_cycle
+        self.cycle_driver = cycle_driver or AsyncCycleDriver(AsyncServerCommunicator(self.communicator))
+        self.scheduler = scheduler or CycleScheduler.from_config(poll_interval=wait_time_between_cycle)
+        self.long_poll = long_poll
+        self._heartbeat_pending = False
         
         logging.info(f"ServerChecker initialized with {wait_time_between_cycle}s cycle time")
 
@@ -76,40 +105,228 @@ class ServerChecker(IServerCheckerInterface):
         
         while True:
             try:
-                self._execute_cycle(sensors)
-                sleep(self.wait_time_between_cycle)
+                self._run_scheduled_cycle(sensors)
                 logging.info("Execution cycle completed\n" + "="*50)
             except Exception as e:
                 logging.error(f"Exception in execution cycle: {e}")
 
-    def _execute_cycle(self, sensors: Dict[str, Any]) -> None:
+    def _run_scheduled_cycle(self, sensors: Dict[str, Any]) -> None:
+        """
+        Run the phases that are due and sleep until the next phase or plan event.
+        
+        Args:
+            sensors: Dictionary of sensor objects
+        """
+        if self.run_due_phases(sensors):
+            # The long-poll already waited until a command arrived or the next plan event
+            return
+        self.scheduler.wait(*self._plan_schedule())
+
+    def run_due_phases(self, sensors: Dict[str, Any], polls: Optional[PollResult] = None) -> bool:
+        """
+        Run the phases that are due without sleeping afterwards.
+        
+        A due network poll runs a full cycle. Between two polls a plan event,
+        telemetry or heartbeat only evaluates the running plan and reports,
+        and a due photo phase only polls for a photo request.
+        
+        Args:
+            sensors: Dictionary of sensor objects
+            polls: Results of a due network poll made by the caller, polled here if None
+            
+        Returns:
+            True if the cycle already waited on the command channel
+        """
+        if not self.scheduler.is_poll_due():
+            empty = self.communicator.return_emply_json()
+            if self.scheduler.is_due(PHASE_HEARTBEAT):
+                self._send_health_check()
+            if self.scheduler.is_due(PHASE_PHOTO):
+                if self.communicator.is_server_available():
+                    self._poll_photo(sensors)
+                else:
+                    self._skip_photo()
+            if self.scheduler.is_plan_due() or self.scheduler.is_due(PHASE_TELEMETRY) or self._heartbeat_pending:
+                self._execute_watering_plan(sensors, empty)
+            return False
+        if self._execute_cycle(sensors, polls):
+            return True
+        self.scheduler.mark_polled()
+        return False
+
+    def _plan_schedule(self) -> Tuple[Any, Optional[str], Optional[datetime.datetime]]:
+        """Return the running plan, the last watering time and the predicted moisture check used for scheduling."""
+        water_time = getattr(self.pump, 'water_time', None)
+        return (self.pump.get_running_plan(), getattr(water_time, 'time_last_watered', None),
+                getattr(self.pump, 'moisture_check_at', None))
+
+    def _poll_timeout(self) -> float:
+        """Return how long a long-poll may block, at most until the next plan event or reporting phase."""
+        due_in = [self.scheduler.seconds_until(self.scheduler.next_plan_due(*self._plan_schedule()))]
+        due_in += [self.scheduler.seconds_until_phase(phase) for phase in (PHASE_HEARTBEAT, PHASE_TELEMETRY)]
+        return min([self.wait_time_between_cycle] + [seconds for seconds in due_in if seconds is not None])
+
+    def _poll_photo(self, sensors: Dict[str, Any]) -> None:
+        """Poll for a photo request on its own, between two network polls."""
+        self.scheduler.mark_done(PHASE_PHOTO)
+        self._handle_photo_capture(sensors)
+
+    def _skip_photo(self) -> None:
+        """Skip a due photo poll while the server is unavailable, it is tried again one photo period later."""
+        if self.scheduler.is_due(PHASE_PHOTO):
+            self.scheduler.mark_done(PHASE_PHOTO)
+
+    def _execute_cycle(self, sensors: Dict[str, Any], polls: Optional[PollResult] = None) -> bool:
         """
         Execute a single cycle of the main loop.
         
+        The cycle waits on the command channel, which returns as soon as a
+        command is queued or after the cycle time. Without a command channel
+        the single endpoints are polled instead, and while the server is
+        unavailable only the running plan is evaluated.
+        
+        Args:
+            sensors: Dictionary of sensor objects
+            polls: Results of the single endpoint polls made by the caller, polled here if None
+            
+        Returns:
+            True if the cycle already waited on the command channel
+        """
+        self.profiler.start_cycle()
+        try:
+            return self._run_cycle_phases(sensors, polls)
+        finally:
+            self.profiler.end_cycle()
+
+    def _run_cycle_phases(self, sensors: Dict[str, Any], polls: Optional[PollResult]) -> bool:
+        """Run the profiled phases of a cycle, see _execute_cycle."""
+        # Queue a health check when due
+        with self.profiler.phase(self.PROFILE_HEALTH_CHECK):
+            if self.scheduler.is_due(PHASE_HEARTBEAT):
+                self._send_health_check()
+        
+        # Skip the server polls while the backend is known to be down
+        if not self.communicator.is_server_available():
+            logging.info("Server unavailable, skipping server polls")
+            self._skip_photo()
+            empty = self.communicator.return_emply_json()
+            self.process_poll_results(sensors, PollResult(water_level=empty, picture=empty, plan=empty))
+            return False
+        
+        if polls is None and self.long_poll:
+            # Waiting for a command is idle time, not part of the cycle budget
+            with self.profiler.phase(self.PROFILE_COMMANDS, idle=True):
+                commands = self.communicator.get_commands(timeout=self._poll_timeout())
+            if commands is not None:
+                # Photo requests arrive on the command channel, no separate photo poll needed
+                self.scheduler.mark_done(PHASE_PHOTO)
+                self.process_commands(sensors, commands)
+                return True
+        
+        # Poll water level, photo and plan requests concurrently
+        if polls is None:
+            with self.profiler.phase(self.PROFILE_POLL):
+                polls = self.cycle_driver.poll(picture=self._take_photo_phase())
+        
+        self.process_poll_results(sensors, polls)
+        return False
+
+    def get_cycle_stats(self) -> Dict[str, Any]:
+        """
+        Get the rolling cycle statistics.
+        
+        Returns:
+            Per-phase and per-cycle wall time and network call statistics
+        """
+        return self.profiler.stats()
+
+    async def poll_async(self) -> PollResult:
+        """
+        Poll the single endpoints of a due network poll from an event loop.
+        
+        Returns:
+            PollResult to hand to run_due_phases
+        """
+        return await self.cycle_driver.poll_async(picture=self._take_photo_phase())
+
+    def _take_photo_phase(self) -> bool:
+        """Return whether the photo request is polled with this cycle and mark the photo phase done if so."""
+        poll_picture = self.scheduler.is_due(PHASE_PHOTO)
+        if poll_picture:
+            self.scheduler.mark_done(PHASE_PHOTO)
+        return poll_picture
+
+    def process_commands(self, sensors: Dict[str, Any], commands: List[Dict[str, Any]]) -> None:
+        """
+        Dispatch commands received from the command channel to their handlers.
+        
+        The watering plan step runs once per cycle, also without a plan
+        command, so running plans continue and moisture is reported.
+        
         Args:
             sensors: Dictionary of sensor objects
+            commands: Commands in the order they were queued
         """
-        # Send health check
-        self._send_health_check()
+        plan = self.communicator.return_emply_json()
+        for command in commands:
+            command_type = command.get(self.COMMAND_TYPE)
+            payload = command.get(self.COMMAND_PAYLOAD) or {}
+            if command_type == self.COMMAND_WATER:
+                with self.profiler.phase(self.PROFILE_WATER_LEVEL):
+                    self._handle_water_level_update(payload)
+            elif command_type == self.COMMAND_PICTURE:
+                with self.profiler.phase(self.PROFILE_PHOTO):
+                    self._handle_photo_capture(sensors, payload)
+            elif command_type == self.COMMAND_PLAN:
+                plan = payload
+            else:
+                logging.warning(f"Unknown command: {command}")
         
+        with self.profiler.phase(self.PROFILE_PLAN):
+            self._execute_watering_plan(sensors, plan)
+
+    def process_poll_results(self, sensors: Dict[str, Any], polls: PollResult) -> None:
+        """
+        Handle the server responses polled for a cycle.
+        
+        Args:
+            sensors: Dictionary of sensor objects
+            polls: Water level, photo and plan responses
+        """
         # Handle water level updates
-        self._handle_water_level_update()
+        with self.profiler.phase(self.PROFILE_WATER_LEVEL):
+            self._handle_water_level_update(polls.water_level)
         
         # Handle photo capture requests
-        self._handle_photo_capture(sensors)
+        with self.profiler.phase(self.PROFILE_PHOTO):
+            self._handle_photo_capture(sensors, polls.picture)
         
         # Execute watering plan
-        self._execute_watering_plan(sensors)
+        with self.profiler.phase(self.PROFILE_PLAN):
+            self._execute_watering_plan(sensors, polls.plan)
 
     def _send_health_check(self) -> None:
-        """Send health check status to server."""
-        health_status = st.Status(watering_status=False, message=st.HEALTH_CHECK)
-        self.communicator.post_plan_execution(health_status)
-        logging.debug("Health check sent")
-
-    def _handle_water_level_update(self) -> None:
-        """Handle water level updates from server."""
-        water_level_json = self.communicator.get_water_level()
+        """Queue a health check to be sent with the next telemetry."""
+        self._heartbeat_pending = True
+        self.scheduler.mark_done(PHASE_HEARTBEAT)
+        logging.debug("Health check queued")
+
+    def _take_heartbeat(self) -> bool:
+        """Return whether a health check is queued and clear the flag, telemetry is sent with it."""
+        heartbeat = self._heartbeat_pending
+        self._heartbeat_pending = False
+        self.scheduler.mark_done(PHASE_TELEMETRY)
+        return heartbeat
+
+    def _handle_water_level_update(self, water_level_json: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Handle water level updates from server.
+        
+        Args:
+            water_level_json: Already polled response, fetched from the server if None
+        """
+        if water_level_json is None:
+            water_level_json = self.communicator.get_water_level()
         logging.info(f"Water level from server: {water_level_json}")
         
         if water_level_json != self.communicator.return_emply_json():
@@ -125,14 +342,16 @@ class ServerChecker(IServerCheckerInterface):
             self.communicator.post_water(current_percent)
             logging.info(f"Water level reset to {current_percent:.1f}%")
 
-    def _handle_photo_capture(self, sensors: Dict[str, Any]) -> None:
+    def _handle_photo_capture(self, sensors: Dict[str, Any], photo_json: Optional[Dict[str, Any]] = None) -> None:
         """
         Handle photo capture requests from server.
         
         Args:
             sensors: Dictionary of sensor objects
+            photo_json: Already polled response, fetched from the server if None
         """
-        photo_json = self.communicator.get_picture()
+        if photo_json is None:
+            photo_json = self.communicator.get_picture()
         logging.info(f"Photo capture request: {photo_json}")
         
         if photo_json != self.communicator.return_emply_json():
@@ -151,19 +370,26 @@ class ServerChecker(IServerCheckerInterface):
             else:
                 logging.warning("Camera sensor not available")
 
-    def _execute_watering_plan(self, sensors: Dict[str, Any]) -> None:
+    def _execute_watering_plan(self, sensors: Dict[str, Any], plan: Optional[Dict[str, Any]] = None) -> None:
         """
         Execute watering plan based on server requests or running plans.
         
         Args:
             sensors: Dictionary of sensor objects
+            plan: Already polled plan, fetched from the server if None
         """
         # Get plan from server
-        plan = self.communicator.get_plan()
+        if plan is None:
+            plan = self.communicator.get_plan()
         running_plan = self.pump.get_running_plan()
         
         logging.info(f"Server plan: {plan}, Running plan: {running_plan}")
         
+        # Keep cycling while water flows; new plans (including delete) still reach the pump
+        if not plan and self.pump.is_watering():
+            self._send_watering_progress()
+            return
+        
         # Determine which plan to execute
         plan_to_execute = self._determine_plan_to_execute(plan, running_plan)
         
@@ -192,8 +418,8 @@ class ServerChecker(IServerCheckerInterface):
         Returns:
             Plan to execute or None if no plan should be executed
         """
-        # If server has a new plan, use it
-        if server_plan != self.communicator.return_emply_json():
+        # If server has a new plan, use it; an unchanged plan arrives empty
+        if server_plan:
             return server_plan
             
         # If no server plan but we have a running plan, continue with it
@@ -205,11 +431,28 @@ class ServerChecker(IServerCheckerInterface):
         logging.info("No plan available for execution")
         return None
 
+    def _send_watering_progress(self) -> None:
+        """Send the progress of a background watering at the telemetry period, queued health checks go with it."""
+        progress = self.pump.get_watering_progress()
+        logging.info(f"Watering in progress: {progress}")
+        if not self._heartbeat_pending and not self.scheduler.is_due(PHASE_TELEMETRY):
+            return
+        message = st.MESSAGE_WATERING_IN_PROGRESS
+        if progress:
+            message += f" {progress['water_pumped']}ml pumped, {progress['remaining']:.0f}s remaining"
+        self.communicator.post_telemetry(status=st.Status.success(message),
+                                         water_level=self.pump.get_water_level_in_percent(),
+                                         moisture_level=self.pump.get_moisture_level_in_percent(),
+                                         heartbeat=self._take_heartbeat())
+
     def _send_regular_moisture_reading(self) -> None:
-        """Send regular moisture reading when no plan is active."""
+        """Send regular moisture reading when no plan is active, at the telemetry period."""
+        if not self._heartbeat_pending and not self.scheduler.is_due(PHASE_TELEMETRY):
+            logging.debug("Moisture reading not due")
+            return
         logging.info("No active plan - sending regular moisture reading")
         moisture_level = self.pump.get_moisture_level_in_percent()
-        self.communicator.post_moisture(moisture_level)
+        self.communicator.post_telemetry(moisture_level=moisture_level, heartbeat=self._take_heartbeat())
         logging.info(f"Regular moisture reading sent: {moisture_level}%")
 
     def send_result(self, moisture_level: int, status: st.Status, water_level: float) -> None:
@@ -223,10 +466,9 @@ class ServerChecker(IServerCheckerInterface):
         """
         logging.info(f"Sending results: moisture={moisture_level}%, water={water_level:.1f}%, status={status}")
         
-        # Send all results to server
-        self.communicator.post_plan_execution(status)
-        self.communicator.post_water(water_level)
-        self.communicator.post_moisture(moisture_level)
+        # Send all results to server in one batch
+        self.communicator.post_telemetry(status=status, water_level=water_level, moisture_level=moisture_level,
+                                         heartbeat=self._take_heartbeat())
         
         logging.info("Results sent to server successfully")
 
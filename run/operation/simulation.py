@@ -0,0 +1,440 @@
+"""
+Fast-forward simulation for water plant automation system.
+
+This module runs the real pump, scheduler and server checker on a virtual
+clock. Sleeping advances the clock instantly, the server is replaced by a
+scripted communicator and the hardware by simulated relay and moisture
+sensor, so months of time and moisture plans replay in seconds. The run
+reports the waterings, the water pumped and consumed, the time plan slots
+that were not watered and cycles that did not sleep.
+"""
+import datetime
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import run.model.time_plan as t
+from run.common.time_engine import TimeEngine
+from run.operation.async_cycle import PollResult
+from run.operation.cycle_profiler import CycleProfiler
+from run.operation.pump import DEFAULT_CATCH_UP_MINUTES, Pump
+from run.operation.scheduler import CycleScheduler
+from run.operation.server_checker import ServerChecker
+
+# Kinds of scripted server events
+EVENT_PLAN = 'plan'
+EVENT_WATER_LEVEL = 'water_level'
+EVENT_PICTURE = 'picture'
+# Consecutive cycles without sleeping after which the main loop counts as spinning
+DEFAULT_MAX_SPINNING_CYCLES = 100
+
+
+class VirtualClock:
+    """
+    Clock whose time only moves when something sleeps on it.
+
+    Attributes:
+        start: Local time the clock started at
+    """
+
+    def __init__(self, start: datetime.datetime):
+        """
+        Initialize the clock.
+
+        Args:
+            start: Naive local time to start at
+        """
+        self.start = start
+        self._epoch = start.timestamp()
+
+    def time(self) -> float:
+        """Return the current epoch time in seconds."""
+        return self._epoch
+
+    def monotonic(self) -> float:
+        """Return the seconds since the clock started."""
+        return self._epoch - self.start.timestamp()
+
+    def now(self) -> datetime.datetime:
+        """Return the current naive local time."""
+        return datetime.datetime.fromtimestamp(self._epoch)
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the clock by a number of seconds, negative values are ignored."""
+        self._epoch += max(seconds, 0.0)
+
+
+class ScriptEvent(NamedTuple):
+    """Server response delivered once its time has come."""
+    at: datetime.datetime
+    kind: str
+    payload: Dict[str, Any]
+
+
+class ScriptedCommunicator:
+    """
+    Server communicator answering from a script of timed events.
+
+    Every poll returns the oldest due event of its kind once, and an empty
+    response when none is due, like the server does for unchanged data.
+    Posted data is recorded with the virtual time it was posted at.
+
+    Attributes:
+        posts: Posted data as (time, endpoint, arguments) tuples
+    """
+
+    def __init__(self, clock: VirtualClock, script: Iterable[ScriptEvent] = ()):
+        """
+        Initialize the communicator.
+
+        Args:
+            clock: Virtual clock deciding which events are due
+            script: Events to deliver
+        """
+        self._clock = clock
+        self._pending = sorted(script, key=lambda event: event.at)
+        self.posts: List[Tuple[datetime.datetime, str, Dict[str, Any]]] = []
+
+    def return_emply_json(self) -> Dict[str, Any]:
+        """Return the empty server response."""
+        return {}
+
+    def is_server_available(self) -> bool:
+        """Return whether the server is reachable, always True."""
+        return True
+
+    def get_commands(self, timeout: float) -> None:
+        """Return None, the scripted server has no command channel."""
+        return None
+
+    def get_plan(self) -> Dict[str, Any]:
+        """Return the next due plan."""
+        return self._next_due(EVENT_PLAN)
+
+    def get_water_level(self) -> Dict[str, Any]:
+        """Return the next due water refill."""
+        return self._next_due(EVENT_WATER_LEVEL)
+
+    def get_picture(self) -> Dict[str, Any]:
+        """Return the next due photo request."""
+        return self._next_due(EVENT_PICTURE)
+
+    def post_water(self, water_level) -> None:
+        """Record a posted water level."""
+        self._record('water', water_level=water_level)
+
+    def post_moisture(self, moisture_level) -> None:
+        """Record a posted moisture level."""
+        self._record('moisture', moisture_level=moisture_level)
+
+    def post_picture(self, photo_name) -> None:
+        """Record a posted photo confirmation."""
+        self._record('picture', photo_name=photo_name)
+
+    def post_plan_execution(self, status) -> None:
+        """Record a posted plan execution status."""
+        self._record('plan_execution', status=status)
+
+    def post_telemetry(self, status=None, water_level=None, moisture_level=None, heartbeat=False) -> None:
+        """Record posted telemetry."""
+        self._record('telemetry', status=status, water_level=water_level, moisture_level=moisture_level,
+                     heartbeat=heartbeat)
+
+    def _next_due(self, kind: str) -> Dict[str, Any]:
+        """Remove and return the payload of the oldest due event of a kind, empty if none is due."""
+        now = self._clock.now()
+        for index, event in enumerate(self._pending):
+            if event.at > now:
+                break
+            if event.kind == kind:
+                del self._pending[index]
+                return dict(event.payload)
+        return {}
+
+    def _record(self, endpoint: str, **data) -> None:
+        """Record posted data at the current virtual time."""
+        self.posts.append((self._clock.now(), endpoint, data))
+
+
+class SimulatedCycleDriver:
+    """Cycle driver polling the scripted communicator synchronously, without an event loop."""
+
+    def __init__(self, communicator: ScriptedCommunicator):
+        """
+        Initialize the driver.
+
+        Args:
+            communicator: Communicator to poll
+        """
+        self.communicator = communicator
+
+    def poll(self, picture: bool = True) -> PollResult:
+        """Poll water level, picture and plan, see AsyncCycleDriver.poll."""
+        return PollResult(water_level=self.communicator.get_water_level(),
+                          picture=self.communicator.get_picture() if picture else {},
+                          plan=self.communicator.get_plan())
+
+    async def poll_async(self, picture: bool = True) -> PollResult:
+        """Poll water level, picture and plan, see AsyncCycleDriver.poll_async."""
+        return self.poll(picture)
+
+    def close(self) -> None:
+        """Nothing to close."""
+
+
+class SimulatedRelay:
+    """
+    Relay recording when and how long the pump ran.
+
+    Attributes:
+        waterings: Start time and seconds of every completed run
+    """
+
+    def __init__(self, clock: VirtualClock, on_watered: Optional[Callable[[float], None]] = None):
+        """
+        Initialize the relay switched off.
+
+        Args:
+            clock: Virtual clock the runs are timed with
+            on_watered: Callable receiving the seconds of every completed run
+        """
+        self._clock = clock
+        self._on_watered = on_watered
+        self._switched_on: Optional[float] = None
+        self.waterings: List[Tuple[datetime.datetime, float]] = []
+
+    def on(self) -> None:
+        """Switch the pump on."""
+        if self._switched_on is None:
+            self._switched_on = self._clock.time()
+
+    def off(self) -> None:
+        """Switch the pump off and record the run."""
+        if self._switched_on is None:
+            return
+        seconds = self._clock.time() - self._switched_on
+        self.waterings.append((datetime.datetime.fromtimestamp(self._switched_on), seconds))
+        self._switched_on = None
+        if self._on_watered is not None:
+            self._on_watered(seconds)
+
+
+class SimulatedMoistureSensor:
+    """
+    Moisture sensor of soil drying at a constant rate.
+
+    The value follows the real sensor: 0 is wet and 1 is dry.
+
+    Attributes:
+        drying_per_hour: Value the soil dries by per hour
+        wetting_per_second: Value the soil wets by per second of watering
+    """
+
+    def __init__(self, clock: VirtualClock, value: float = 0.5, drying_per_hour: float = 0.01,
+                 wetting_per_second: float = 0.05):
+        """
+        Initialize the sensor.
+
+        Args:
+            clock: Virtual clock the soil dries on
+            value: Initial sensor value
+            drying_per_hour: Value the soil dries by per hour
+            wetting_per_second: Value the soil wets by per second of watering
+        """
+        self._clock = clock
+        self._value = value
+        self._updated = clock.time()
+        self.drying_per_hour = drying_per_hour
+        self.wetting_per_second = wetting_per_second
+
+    @property
+    def value(self) -> float:
+        """Return the current sensor value."""
+        now = self._clock.time()
+        self._value = min(self._value + (now - self._updated) / 3600 * self.drying_per_hour, 1.0)
+        self._updated = now
+        return self._value
+
+    def water(self, seconds: float) -> None:
+        """Wet the soil by a watering of a number of seconds."""
+        self._value = max(self.value - seconds * self.wetting_per_second, 0.0)
+
+
+class SimulatedPump(Pump):
+    """
+    Pump keeping count of the water refilled, so the tank accounting spans refills.
+
+    Attributes:
+        water_refilled: Milliliters added to the tank by water level resets
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the pump, see Pump."""
+        super().__init__(*args, **kwargs)
+        self.water_refilled = 0
+
+    def reset_water_level(self, capacity: int) -> None:
+        """Reset the water level and count the water added, see Pump.reset_water_level."""
+        self.water_refilled += capacity - self.water_level
+        super().reset_water_level(capacity)
+
+
+class Simulation:
+    """
+    Run the pump and server checker on a virtual clock.
+
+    Attributes:
+        clock: Virtual clock of the run
+        communicator: Scripted server communicator
+        pump: Blocking pump on the virtual clock
+        relay: Simulated relay
+        moisture_sensor: Simulated moisture sensor
+        checker: Server checker polling the single endpoints
+    """
+
+    def __init__(self, start: datetime.datetime, script: Iterable[ScriptEvent] = (), water_max_capacity: int = 2000,
+                 water_pumped_in_second: int = 10, moisture_max_level: int = 100,
+                 timing_config: Optional[Dict[str, Any]] = None, wait_time_between_cycle: int = 60,
+                 catch_up_minutes: int = DEFAULT_CATCH_UP_MINUTES,
+                 moisture_sensor: Optional[SimulatedMoistureSensor] = None,
+                 max_spinning_cycles: int = DEFAULT_MAX_SPINNING_CYCLES):
+        """
+        Set up a simulated device.
+
+        Args:
+            start: Naive local time the simulation starts at
+            script: Scripted server events
+            water_max_capacity: Water tank capacity in milliliters
+            water_pumped_in_second: Pumping rate in ml/second
+            moisture_max_level: Maximum moisture level for sensor calibration
+            timing_config: TIMING_CONFIG with the phase periods and cycle budget
+            wait_time_between_cycle: Seconds between two network polls
+            catch_up_minutes: Minutes a missed time plan slot is still watered after it started
+            moisture_sensor: Sensor to use, a default simulated sensor if None
+            max_spinning_cycles: Consecutive cycles without sleeping after which the run fails
+        """
+        self.clock = VirtualClock(start)
+        self.communicator = ScriptedCommunicator(self.clock, script)
+        self.pump = SimulatedPump(water_max_capacity, water_pumped_in_second, moisture_max_level,
+                                  catch_up_minutes=catch_up_minutes, time_engine=TimeEngine(self.clock.time),
+                                  sleep=self.clock.sleep)
+        self._initial_water_level = self.pump.water_level
+        self.moisture_sensor = moisture_sensor or SimulatedMoistureSensor(self.clock)
+        self.relay = SimulatedRelay(self.clock, on_watered=self.moisture_sensor.water)
+        self.pump.moisture_sensor = self.moisture_sensor
+        scheduler = CycleScheduler.from_config(timing_config, wait_time_between_cycle,
+                                               clock=self.clock.now, sleep=self.clock.sleep)
+        profiler = CycleProfiler.from_config(timing_config, clock=self.clock.monotonic)
+        self.checker = ServerChecker(pump=self.pump, communicator=self.communicator,
+                                     wait_time_between_cycle=wait_time_between_cycle,
+                                     cycle_driver=SimulatedCycleDriver(self.communicator), scheduler=scheduler,
+                                     long_poll=False, profiler=profiler)
+        self.sensors = {Pump.RELAY_SENSOR_KEY: self.relay, Pump.MOISTURE_SENSOR_KEY: self.moisture_sensor}
+        self.max_spinning_cycles = max_spinning_cycles
+        self.cycles = 0
+        self.errors = 0
+        self.spinning_cycles = 0
+        self._plan_windows: List[List[Any]] = []
+
+    def run(self, duration: datetime.timedelta) -> Dict[str, Any]:
+        """
+        Run the main loop for a stretch of virtual time.
+
+        Args:
+            duration: Virtual time to simulate
+
+        Returns:
+            Report of the whole simulation so far, see report
+
+        Raises:
+            RuntimeError: If max_spinning_cycles cycles in a row did not sleep
+        """
+        end = self.clock.now() + duration
+        started = time.perf_counter()
+        spinning = 0
+        while self.clock.now() < end:
+            cycle_start = self.clock.now()
+            try:
+                self.checker._run_scheduled_cycle(self.sensors)
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"Exception in simulated cycle at {cycle_start}: {e}")
+            self.cycles += 1
+            self._track_plan(cycle_start)
+            if self.clock.now() > cycle_start:
+                spinning = 0
+                continue
+            # The real loop would wake again at once, the virtual clock would never move on
+            self.spinning_cycles += 1
+            self.errors += 1
+            spinning += 1
+            logging.error(f"Simulated cycle at {cycle_start} did not sleep")
+            if spinning >= self.max_spinning_cycles:
+                raise RuntimeError(f"Main loop spins at {cycle_start}: {spinning} cycles in a row did not sleep")
+        report = self.report()
+        report['wall_seconds'] = time.perf_counter() - started
+        logging.info(f"Simulated {duration} in {report['wall_seconds']:.2f}s: {report['waterings']} waterings, "
+                     f"{report['missed_slots']} missed slots")
+        return report
+
+    def _track_plan(self, cycle_start: datetime.datetime) -> None:
+        """Extend the window of the running time plan up to a cycle it was evaluated in."""
+        plan = self.pump.get_running_plan()
+        if not isinstance(plan, t.TimePlan):
+            return
+        if self._plan_windows and self._plan_windows[-1][0] is plan:
+            self._plan_windows[-1][2] = cycle_start
+        else:
+            self._plan_windows.append([plan, cycle_start, cycle_start])
+
+    def missed_slots(self) -> List[datetime.datetime]:
+        """
+        Find the time plan slots that were not watered within the catch-up window.
+
+        Every slot of a running time plan is matched with the first unmatched
+        watering that started within catch_up_minutes after it.
+
+        Returns:
+            Starts of the missed slots in chronological order
+        """
+        catch_up = datetime.timedelta(minutes=self.pump.catch_up_minutes)
+        unmatched = [started for started, _ in self.relay.waterings]
+        missed = []
+        for plan, start, end in self._plan_windows:
+            # A plan arriving within a minute still waters that minute's slot
+            window_start = start.replace(second=0, microsecond=0) - datetime.timedelta(minutes=1)
+            for slot, _ in plan.schedule.due_between(window_start, end):
+                match = next((started for started in unmatched if slot <= started <= slot + catch_up), None)
+                if match is None:
+                    missed.append(slot)
+                else:
+                    unmatched.remove(match)
+        return sorted(missed)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the simulation.
+
+        The water pumped is the relay time at the pumping rate, the water
+        consumed is what the pump deducted from the tank over all refills.
+
+        Returns:
+            Dictionary with the simulated time, cycles, waterings, water pumped,
+            consumed and left, missed slots, telemetry posts, cycle errors and
+            cycles that did not sleep
+        """
+        missed = self.missed_slots()
+        return {
+            'simulated_until': self.clock.now(),
+            'cycles': self.cycles,
+            'errors': self.errors,
+            'spinning_cycles': self.spinning_cycles,
+            'waterings': len(self.relay.waterings),
+            'watering_times': [started for started, _ in self.relay.waterings],
+            'water_pumped_ml': sum(seconds for _, seconds in self.relay.waterings) * self.pump.water_pumped_in_second,
+            'water_consumed_ml': self._initial_water_level + self.pump.water_refilled - self.pump.water_level,
+            'water_level_ml': self.pump.water_level,
+            'missed_slots': len(missed),
+            'missed_slot_times': missed,
+            'telemetry_posts': sum(1 for _, endpoint, _ in self.communicator.posts if endpoint == 'telemetry')
+        }
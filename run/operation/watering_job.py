@@ -0,0 +1,137 @@
+"""
+Watering job module for water plant automation system.
+
+This module runs a single watering as a background job. The relay is held
+on until a monotonic deadline or until the job is cancelled, so the main
+loop keeps running while water flows and a stop request cuts the relay
+immediately.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class WateringJob:
+    """
+    Cancellable background watering with progress reporting.
+
+    Attributes:
+        relay: Relay switching the pump
+        duration: Planned watering duration in seconds
+        water_milliliters: Planned water volume
+    """
+
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    CANCELLED = 'cancelled'
+    FAILED = 'failed'
+
+    def __init__(self, relay, duration: float, water_milliliters: int = 0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the job without starting it.
+
+        Args:
+            relay: Relay switching the pump
+            duration: Planned watering duration in seconds
+            water_milliliters: Planned water volume, used for progress reporting
+            clock: Monotonic clock returning seconds
+        """
+        self.relay = relay
+        self.duration = duration
+        self.water_milliliters = water_milliliters
+        self.state: Optional[str] = None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._started_at: Optional[float] = None
+        self._stopped_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Switch the relay on and start waiting for the deadline in the background."""
+        self.relay.on()
+        self._started_at = self._clock()
+        self.state = self.RUNNING
+        logging.info(f"Watering job started for {self.duration}s ({self.water_milliliters}ml)")
+        self._thread = threading.Thread(target=self._run, name='watering-job', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Hold the relay on until the deadline or a cancellation."""
+        deadline = self._started_at + self.duration
+        try:
+            remaining = deadline - self._clock()
+            while remaining > 0 and not self._cancelled.wait(remaining):
+                remaining = deadline - self._clock()
+            self._finish(self.CANCELLED if self._cancelled.is_set() else self.COMPLETED)
+        except Exception as e:
+            logging.error(f"Error during watering job: {e}")
+            self._finish(self.FAILED)
+
+    def _finish(self, state: str) -> None:
+        """Switch the relay off once and record the final state."""
+        with self._lock:
+            if self._stopped_at is not None:
+                return
+            try:
+                self.relay.off()
+            finally:
+                self._stopped_at = self._clock()
+                self.state = state
+                self._done.set()
+        logging.info(f"Watering job {state} after {self.elapsed():.1f}s, relay turned off")
+
+    def cancel(self) -> None:
+        """Stop watering immediately; the relay is switched off before returning."""
+        if self._started_at is None:
+            return
+        self._cancelled.set()
+        self._finish(self.CANCELLED)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the job has finished.
+
+        Args:
+            timeout: Maximum seconds to wait, forever if None
+
+        Returns:
+            True if the job has finished
+        """
+        return self._done.wait(timeout)
+
+    def is_running(self) -> bool:
+        """Return whether the relay is still switched on by this job."""
+        return self._started_at is not None and not self._done.is_set()
+
+    def elapsed(self) -> float:
+        """Return the seconds the relay has been on."""
+        if self._started_at is None:
+            return 0.0
+        end = self._stopped_at if self._stopped_at is not None else self._clock()
+        return min(end - self._started_at, self.duration)
+
+    def fraction_done(self) -> float:
+        """Return the share of the planned duration that has been watered."""
+        return self.elapsed() / self.duration if self.duration > 0 else 1.0
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Get the progress of the job.
+
+        Returns:
+            Dictionary with state, elapsed and remaining seconds, fraction done
+            and the water volume pumped so far
+        """
+        elapsed = self.elapsed()
+        fraction = self.fraction_done()
+        return {
+            'state': self.state,
+            'elapsed': elapsed,
+            'remaining': max(self.duration - elapsed, 0.0) if self.is_running() else 0.0,
+            'fraction': fraction,
+            'water_pumped': round(self.water_milliliters * fraction)
+        }
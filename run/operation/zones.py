@@ -0,0 +1,178 @@
+"""
+Multi-zone operation for water plant automation system.
+
+This module drives several zones from one process. Every zone has its own
+pump, relay, sensors and device GUID, while all zones share one pooled HTTP
+connection, one event loop and one sleep: the network polls of all zones
+that are due fan out concurrently, and the loop sleeps until the earliest
+phase or plan event of any zone.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from run.operation.async_cycle import PollResult
+from run.operation.cycle_profiler import CycleProfiler
+from run.operation.scheduler import CycleScheduler
+from run.operation.server_checker import ServerChecker
+
+
+class Zone:
+    """
+    One plant slot: pump, sensors and the device the server knows it as.
+
+    Attributes:
+        name: Zone name used in logs
+        pump: Pump watering the zone
+        communicator: Server communicator of the zone's device GUID
+        sensors: Sensor objects of the zone (relay, moisture sensor, camera)
+        checker: Server checker running the zone's phases
+    """
+
+    def __init__(self, name: str, pump, communicator, sensors: Dict[str, Any], checker: ServerChecker):
+        """
+        Initialize a zone.
+
+        Args:
+            name: Zone name used in logs
+            pump: Pump watering the zone
+            communicator: Server communicator of the zone's device GUID
+            sensors: Sensor objects of the zone
+            checker: Server checker running the zone's phases
+        """
+        self.name = name
+        self.pump = pump
+        self.communicator = communicator
+        self.sensors = sensors
+        self.checker = checker
+
+    @classmethod
+    def create(cls, name: str, pump, communicator, sensors: Dict[str, Any], wait_time_between_cycle: int,
+               timing_config: Optional[Dict[str, Any]] = None) -> 'Zone':
+        """
+        Create a zone with a server checker polling the single endpoints.
+
+        Zones share one sleep, so the checker does not block on the command
+        channel on behalf of all zones.
+
+        Args:
+            name: Zone name used in logs
+            pump: Pump watering the zone
+            communicator: Server communicator of the zone's device GUID
+            sensors: Sensor objects of the zone
+            wait_time_between_cycle: Seconds between two network polls
+            timing_config: TIMING_CONFIG with the phase periods and cycle budget
+
+        Returns:
+            Zone instance
+        """
+        scheduler = CycleScheduler.from_config(timing_config, wait_time_between_cycle)
+        checker = ServerChecker(pump=pump, communicator=communicator, wait_time_between_cycle=wait_time_between_cycle,
+                                scheduler=scheduler, long_poll=False,
+                                profiler=CycleProfiler.from_config(timing_config))
+        return cls(name, pump, communicator, sensors, checker)
+
+
+class MultiZoneChecker:
+    """
+    Main loop running the phases of several zones.
+
+    Network polls of the zones run concurrently. Handling their results
+    touches hardware and runs zone by zone, so zones can share a camera.
+    """
+
+    def __init__(self, zones: List[Zone], sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the multi-zone checker.
+
+        Args:
+            zones: Zones to drive, at least one
+            sleep: Callable sleeping for a number of seconds
+        """
+        if not zones:
+            raise ValueError("at least one zone is required")
+        self.zones = zones
+        self._sleep = sleep
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        logging.info(f"MultiZoneChecker initialized with zones: {', '.join(zone.name for zone in zones)}")
+
+    def plan_executor(self) -> None:
+        """Run the cycles of all zones until the process ends."""
+        for zone in self.zones:
+            zone.pump.moisture_sensor = zone.sensors.get(zone.pump.MOISTURE_SENSOR_KEY)
+
+        logging.info("Starting multi-zone execution loop")
+
+        while True:
+            try:
+                self.run_cycle()
+                self.wait()
+                logging.info("Multi-zone execution cycle completed\n" + "=" * 50)
+            except Exception as e:
+                logging.error(f"Exception in multi-zone execution cycle: {e}")
+
+    def run_cycle(self) -> None:
+        """Poll the server for all zones with a due poll, then run every zone's due phases."""
+        polls = self.poll_zones()
+        for zone in self.zones:
+            try:
+                zone.checker.run_due_phases(zone.sensors, polls.get(zone.name))
+            except Exception as e:
+                logging.error(f"Exception in zone {zone.name}: {e}")
+
+    def poll_zones(self) -> Dict[str, PollResult]:
+        """
+        Poll the server concurrently for every zone whose network poll is due.
+
+        Zones whose server is unavailable are left out; their checker skips
+        the polls itself.
+
+        Returns:
+            Poll results keyed by zone name
+        """
+        polling = [zone for zone in self.zones
+                   if zone.checker.scheduler.is_poll_due() and zone.communicator.is_server_available()]
+        if not polling:
+            return {}
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        results = self._loop.run_until_complete(self._poll_async(polling))
+
+        polls = {}
+        for zone, result in zip(polling, results):
+            if isinstance(result, Exception):
+                logging.error(f"Polling zone {zone.name} failed: {result}")
+            else:
+                polls[zone.name] = result
+        logging.debug(f"Polled {len(polls)} of {len(self.zones)} zones")
+        return polls
+
+    async def _poll_async(self, zones: List[Zone]) -> List[Any]:
+        """Poll the zones concurrently, returning their results or the raised exceptions."""
+        return await asyncio.gather(*(zone.checker.poll_async() for zone in zones), return_exceptions=True)
+
+    def seconds_until_next(self) -> float:
+        """Return the seconds until the earliest phase or plan event of any zone."""
+        return min(zone.checker.scheduler.seconds_until_next(*zone.checker._plan_schedule()) for zone in self.zones)
+
+    def wait(self) -> float:
+        """
+        Sleep until the earliest phase or plan event of any zone.
+
+        Returns:
+            Seconds slept
+        """
+        seconds = self.seconds_until_next()
+        logging.debug(f"Next multi-zone cycle in {seconds:.1f}s")
+        if seconds > 0:
+            self._sleep(seconds)
+        return seconds
+
+    def close(self) -> None:
+        """Close the event loop and the zones' cycle drivers."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.close()
+        for zone in self.zones:
+            zone.checker.cycle_driver.close()
@@ -0,0 +1,145 @@
+"""
+Moisture sampler for water plant automation system.
+
+This module reads the moisture sensor on a background thread at a fixed
+rate. Readings are kept in a ring buffer; the median of the buffer rejects
+single noisy charge timings and an exponential moving average of the
+medians smooths the rest. Readers get the cached filtered value without
+touching the sensor, so they never block on its charge timing.
+"""
+import logging
+import statistics
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+DEFAULT_SAMPLE_INTERVAL = 1.0
+DEFAULT_BUFFER_SIZE = 15
+DEFAULT_EMA_ALPHA = 0.3
+
+
+class MoistureSampler:
+    """
+    Background sampler exposing the filtered value of a moisture sensor.
+
+    The sampler can be used wherever the sensor is, its value follows the
+    sensor's scale.
+
+    Attributes:
+        sensor: Sensor providing the raw value
+        sample_interval: Seconds between two readings
+        buffer_size: Number of readings the median is taken over
+        alpha: Weight of a new median in the moving average, 1 disables the smoothing
+        errors: Number of failed readings
+    """
+
+    def __init__(self, sensor, sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE, alpha: float = DEFAULT_EMA_ALPHA):
+        """
+        Initialize the sampler without starting it.
+
+        Args:
+            sensor: Sensor with a value attribute
+            sample_interval: Seconds between two readings
+            buffer_size: Number of readings the median is taken over
+            alpha: Weight of a new median in the moving average, between 0 exclusive and 1
+        """
+        if sample_interval <= 0:
+            raise ValueError("sample_interval must be positive")
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+
+        self.sensor = sensor
+        self.sample_interval = sample_interval
+        self.buffer_size = buffer_size
+        self.alpha = alpha
+        self.errors = 0
+        self._readings: Deque[float] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._filtered: Optional[float] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, sensor, sensor_config: Optional[Dict[str, Any]] = None) -> 'MoistureSampler':
+        """
+        Create a sampler from a SENSOR_CONFIG dictionary.
+
+        Args:
+            sensor: Sensor with a value attribute
+            sensor_config: Sensor configuration, missing keys fall back to defaults
+
+        Returns:
+            MoistureSampler instance
+        """
+        sensor_config = sensor_config or {}
+        return cls(sensor, sample_interval=sensor_config.get('moisture_sample_interval', DEFAULT_SAMPLE_INTERVAL),
+                   buffer_size=sensor_config.get('moisture_buffer_size', DEFAULT_BUFFER_SIZE),
+                   alpha=sensor_config.get('moisture_ema_alpha', DEFAULT_EMA_ALPHA))
+
+    @property
+    def value(self) -> float:
+        """Return the filtered value, reading the sensor once if nothing was sampled yet."""
+        filtered = self._filtered
+        if filtered is None:
+            self.sample()
+            filtered = self._filtered
+        return self.sensor.value if filtered is None else filtered
+
+    def sample(self) -> Optional[float]:
+        """
+        Read the sensor once and update the filtered value.
+
+        Returns:
+            Raw reading, None if the sensor could not be read
+        """
+        try:
+            reading = float(self.sensor.value)
+        except Exception as e:
+            self.errors += 1
+            logging.warning(f"Moisture sensor reading failed: {e}")
+            return None
+        with self._lock:
+            self._readings.append(reading)
+            median = statistics.median(self._readings)
+            previous = self._filtered
+            self._filtered = median if previous is None else previous + self.alpha * (median - previous)
+        return reading
+
+    def readings(self) -> List[float]:
+        """Return the buffered raw readings, oldest first."""
+        with self._lock:
+            return list(self._readings)
+
+    def start(self) -> None:
+        """Take a first reading and start sampling in the background."""
+        if self.is_running():
+            return
+        self._stopped.clear()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name='moisture-sampler', daemon=True)
+        self._thread.start()
+        logging.info(f"Moisture sampler started every {self.sample_interval}s over {self.buffer_size} readings")
+
+    def _run(self) -> None:
+        """Sample until stopped."""
+        while not self._stopped.wait(self.sample_interval):
+            self.sample()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop sampling; the last filtered value stays available.
+
+        Args:
+            timeout: Seconds to wait for the sampling thread, forever if None
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        """Return whether the sampling thread is running."""
+        return self._thread is not None and self._thread.is_alive()
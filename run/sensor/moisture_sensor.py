@@ -2,6 +2,8 @@ from gpiozero import LightSensor
 
 
 class Moisture(LightSensor):
+    """Moisture sensor read through a charging capacitor, dry soil is reported like light."""
+
     def __init__(self, pin=None, queue_len=5,
                  charge_time_limit=0.01, threshold=0.1,
                  partial=False, pin_factory=None):
@@ -11,17 +13,31 @@ class Moisture(LightSensor):
                                        charge_time_limit=charge_time_limit,
                                        pin_factory=pin_factory)
 
-    def wait_for_dry(self):
-        return super(Moisture, self).wait_for_light
+    def wait_for_dry(self, timeout=None):
+        """Wait until the soil is dry, return False if the timeout passed first."""
+        return self.wait_for_light(timeout)
 
-    def wait_for_wet(self):
-        return super().wait_for_dark
+    def wait_for_wet(self, timeout=None):
+        """Wait until the soil is wet, return False if the timeout passed first."""
+        return self.wait_for_dark(timeout)
 
+    @property
     def when_dry(self):
-        return super().when_light
+        """Callback run when the soil turns dry, None if not set."""
+        return self.when_light
+
+    @when_dry.setter
+    def when_dry(self, value):
+        self.when_light = value
 
+    @property
     def when_wet(self):
-        return super().when_dark
+        """Callback run when the soil turns wet, None if not set."""
+        return self.when_dark
+
+    @when_wet.setter
+    def when_wet(self, value):
+        self.when_dark = value
 
     def is_dry(self):
-        return super().is_active
+        return self.is_active
@@ -106,6 +106,8 @@ def mock_server_communicator():
     communicator.post_plan_execution = Mock(return_value={})
     communicator.get_water_level = Mock(return_value={})
     communicator.get_picture = Mock(return_value={})
+    communicator.post_telemetry = Mock(return_value={})
+    communicator.get_commands = Mock(return_value=None)
     communicator.return_emply_json = Mock(return_value={})
     return communicator
 
@@ -57,6 +57,8 @@ class TestWaterPlantWorkflow:
         communicator.post_water = Mock(return_value={})
         communicator.post_moisture = Mock(return_value={})
         communicator.post_picture = Mock(return_value={})
+        communicator.post_telemetry = Mock(return_value={})
+        communicator.get_commands = Mock(return_value=None)
         communicator.return_emply_json = Mock(return_value={})
         return communicator
 
@@ -179,9 +181,8 @@ class TestWaterPlantWorkflow:
         
         # Verify all communications
         mock_communicator.get_plan.assert_called()
-        mock_communicator.post_plan_execution.assert_called()
-        mock_communicator.post_water.assert_called_with(80)
-        mock_communicator.post_moisture.assert_called_with(75)
+        mock_communicator.post_telemetry.assert_called_once_with(status=result, water_level=80, moisture_level=75,
+                                                                 heartbeat=False)
 
     def test_water_level_management_workflow(self, pump):
         """Test the complete water level management workflow."""
@@ -317,8 +318,7 @@ class TestWaterPlantWorkflow:
         # Verify complete workflow
         assert result.watering_status is True
         mock_communicator.get_plan.assert_called()
-        mock_communicator.post_plan_execution.assert_called()
-        mock_communicator.post_water.assert_called_with(85)
-        mock_communicator.post_moisture.assert_called_with(70)
+        mock_communicator.post_telemetry.assert_called_once_with(status=result, water_level=85, moisture_level=70,
+                                                                 heartbeat=False)
         mock_relay.on.assert_called_once()
         mock_relay.off.assert_called_once()
\ No newline at end of file
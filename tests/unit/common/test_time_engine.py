@@ -0,0 +1,53 @@
+"""
+Unit tests for the time engine.
+"""
+import datetime
+import time
+
+import pytest
+
+from run.common.time_engine import TimeEngine, minute_of_day, minutes_between, time_string
+
+
+def epoch_of(*args) -> float:
+    """Return the epoch seconds of a local date and time."""
+    return time.mktime(datetime.datetime(*args).timetuple())
+
+
+class TestTimeEngine:
+    """Test cases for the time engine."""
+
+    def test_minute_of_day_and_time_string(self):
+        """Test conversion between time strings and minutes of the day."""
+        assert minute_of_day("00:00") == 0
+        assert minute_of_day("23:59") == 1439
+        assert time_string(485) == "08:05"
+        assert time_string(-1) == "23:59"
+        assert time_string(1440) == "00:00"
+
+        with pytest.raises(ValueError):
+            minute_of_day("24:00")
+
+    def test_minutes_between_across_midnight(self):
+        """Test that intervals wrap around midnight."""
+        assert minutes_between(minute_of_day("23:50"), minute_of_day("00:10")) == 20
+        assert minutes_between(minute_of_day("08:00"), minute_of_day("10:00")) == 120
+        assert minutes_between(600, 600) == 0
+
+    def test_injected_clock(self):
+        """Test that the engine reads the injected clock."""
+        engine = TimeEngine(clock=lambda: epoch_of(2024, 1, 10, 8, 30, 45))
+
+        assert engine.current_time() == "08:30"
+        assert engine.current_date() == datetime.date(2024, 1, 10)
+        assert engine.minute_of_day() == 510
+        assert engine.now() == datetime.datetime(2024, 1, 10, 8, 30, 45)
+        assert engine.epoch_minute() == int(epoch_of(2024, 1, 10, 8, 30)) // 60
+
+    def test_time_minus_delta_across_midnight(self):
+        """Test going back over midnight."""
+        engine = TimeEngine(clock=lambda: epoch_of(2024, 1, 10, 0, 10))
+
+        assert engine.time_minus_delta(30) == "23:40"
+        assert engine.time_minus_delta(0) == "00:10"
+        assert engine.time_minus_delta(1440) == "00:10"
@@ -0,0 +1,76 @@
+"""
+Unit tests for AsyncServerCommunicator.
+"""
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import Mock
+from run.http_communicator.async_server_communicator import AsyncServerCommunicator
+from run.model.status import Status
+
+
+class TestAsyncServerCommunicator:
+    """Test cases for AsyncServerCommunicator class."""
+
+    @pytest.fixture
+    def communicator(self):
+        """Create a mock synchronous communicator."""
+        communicator = Mock()
+        communicator.get_plan = Mock(return_value={"plan_type": "basic"})
+        communicator.get_water_level = Mock(return_value={"water": 1500})
+        communicator.get_picture = Mock(return_value={})
+        communicator.post_water = Mock(return_value={"success": True})
+        communicator.post_telemetry = Mock(return_value={"success": True})
+        communicator.get_commands = Mock(return_value=[])
+        communicator.return_emply_json = Mock(return_value={})
+        return communicator
+
+    @pytest.fixture
+    def async_communicator(self, communicator):
+        """Create an AsyncServerCommunicator for testing."""
+        async_communicator = AsyncServerCommunicator(communicator)
+        yield async_communicator
+        async_communicator.close()
+
+    def test_get_methods_are_awaitable(self, async_communicator):
+        """Test that GET methods return the wrapped communicator responses."""
+        async def run():
+            return await async_communicator.get_plan(), await async_communicator.get_water_level()
+
+        plan, water = asyncio.run(run())
+
+        assert plan == {"plan_type": "basic"}
+        assert water == {"water": 1500}
+
+    def test_post_methods_forward_arguments(self, async_communicator, communicator):
+        """Test that POST methods forward their arguments."""
+        status = Status(True, "ok")
+
+        async def run():
+            await async_communicator.post_water(80.0)
+            await async_communicator.post_telemetry(status=status, moisture_level=40, heartbeat=True)
+
+        asyncio.run(run())
+
+        communicator.post_water.assert_called_once_with(80.0)
+        communicator.post_telemetry.assert_called_once_with(status=status, water_level=None,
+                                                            moisture_level=40, heartbeat=True)
+
+    def test_get_commands_forwards_timeout(self, async_communicator, communicator):
+        """Test that the long-poll timeout is forwarded."""
+        assert asyncio.run(async_communicator.get_commands(10)) == []
+        communicator.get_commands.assert_called_once_with(10)
+
+    def test_calls_run_off_the_event_loop_thread(self, async_communicator, communicator):
+        """Test that blocking calls run on worker threads."""
+        threads = []
+        communicator.get_picture.side_effect = lambda: threads.append(threading.current_thread()) or {}
+
+        asyncio.run(async_communicator.get_picture())
+
+        assert threads[0] is not threading.main_thread()
+
+    def test_return_empty_json(self, async_communicator):
+        """Test that the empty response comes from the wrapped communicator."""
+        assert async_communicator.return_emply_json() == {}
@@ -0,0 +1,93 @@
+"""
+Unit tests for CircuitBreaker.
+"""
+import pytest
+from run.http_communicator.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker class."""
+
+    @pytest.fixture
+    def clock(self):
+        """Create a manually advanced clock."""
+        return FakeClock()
+
+    @pytest.fixture
+    def breaker(self, clock):
+        """Create a breaker without jitter."""
+        return CircuitBreaker(failure_threshold=2, reset_timeout=5, max_reset_timeout=12, jitter=0,
+                              clock=clock)
+
+    def test_opens_after_threshold(self, breaker):
+        """Test that consecutive failures open the circuit."""
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.is_open()
+        assert breaker.allow_request() is False
+        assert breaker.retry_in() == 5
+
+    def test_success_resets_failure_count(self, breaker):
+        """Test that a success between failures keeps the circuit closed."""
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_single_probe(self, breaker, clock):
+        """Test that only one probe is let through once the delay has passed."""
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now += 5
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+
+        breaker.record_success()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request() is True
+
+    def test_failed_probe_doubles_delay_up_to_max(self, breaker, clock):
+        """Test exponential backoff of the probe delay."""
+        breaker.record_failure()
+        breaker.record_failure()
+        delays = []
+        for _ in range(3):
+            clock.now += breaker.retry_in()
+            assert breaker.allow_request() is True
+            breaker.record_failure()
+            delays.append(breaker.retry_in())
+
+        assert delays == [10, 12, 12]
+
+    def test_jitter_shortens_delay(self, clock):
+        """Test that jitter randomizes the delay below the exponential bound."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, jitter=0.5, clock=clock, rng=lambda: 0.5)
+
+        breaker.record_failure()
+
+        assert breaker.retry_in() == 7.5
+
+    def test_invalid_arguments(self):
+        """Test that invalid settings are rejected."""
+        with pytest.raises(ValueError):
+            CircuitBreaker(failure_threshold=0)
+        with pytest.raises(ValueError):
+            CircuitBreaker(jitter=2)
@@ -0,0 +1,133 @@
+"""
+Unit tests for ConnectionPool.
+"""
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+from run.http_communicator.circuit_breaker import CircuitBreaker, CircuitOpenError
+from run.http_communicator.connection_pool import ConnectionPool
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    """Minimal HTTP/1.1 handler that keeps connections open."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestConnectionPool:
+    """Test cases for ConnectionPool class."""
+
+    @pytest.fixture
+    def server_url(self):
+        """Start a local keep-alive HTTP server."""
+        server = HTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f'http://127.0.0.1:{server.server_address[1]}/getPlan'
+        server.shutdown()
+        server.server_close()
+
+    def test_from_config_defaults(self):
+        """Test pool creation with an empty configuration."""
+        pool = ConnectionPool.from_config({})
+
+        assert pool.pool_size == 4
+        assert pool.keep_alive is True
+        assert pool.timeout == (5, 30)
+
+    def test_from_config_values(self):
+        """Test pool creation with SERVER_CONFIG values."""
+        pool = ConnectionPool.from_config({'pool_size': 2, 'connect_timeout': 3, 'request_timeout': 15,
+                                           'verify_ssl': False})
+
+        assert pool.pool_size == 2
+        assert pool.timeout == (3, 15)
+        assert pool.session.verify is False
+
+    def test_invalid_pool_size(self):
+        """Test that an empty pool is rejected."""
+        with pytest.raises(ValueError):
+            ConnectionPool(pool_size=0)
+
+    def test_keep_alive_disabled_sets_header(self):
+        """Test that disabling keep-alive closes connections after each request."""
+        pool = ConnectionPool(keep_alive=False)
+
+        assert pool.session.headers['Connection'] == 'close'
+
+    def test_connections_are_reused(self, server_url):
+        """Test that consecutive requests share one connection."""
+        pool = ConnectionPool()
+
+        for _ in range(3):
+            assert pool.get(server_url).status_code == 200
+
+        stats = pool.get_stats()
+        assert stats['requests'] == 3
+        assert stats['connections_opened'] == 1
+        assert stats['connections_reused'] == 2
+        pool.close()
+
+    def test_connections_not_reused_without_keep_alive(self, server_url):
+        """Test that every request opens a connection when keep-alive is off."""
+        pool = ConnectionPool(keep_alive=False)
+
+        for _ in range(2):
+            pool.get(server_url)
+
+        stats = pool.get_stats()
+        assert stats['connections_opened'] == 2
+        assert stats['connections_reused'] == 0
+        pool.close()
+
+    def test_circuit_breaker_short_circuits_unreachable_server(self):
+        """Test that an open circuit fails requests without sending them."""
+        with socket.socket() as unused:
+            unused.bind(('127.0.0.1', 0))
+            url = f'http://127.0.0.1:{unused.getsockname()[1]}/'
+        pool = ConnectionPool(connect_timeout=1, circuit_breaker=CircuitBreaker(failure_threshold=2))
+
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                pool.get(url)
+        with pytest.raises(CircuitOpenError):
+            pool.get(url)
+
+        assert pool.is_available() is False
+        assert pool.get_stats()['requests'] == 2
+        pool.close()
+
+    def test_circuit_breaker_stays_closed_on_success(self, server_url):
+        """Test that answered requests keep the circuit closed."""
+        pool = ConnectionPool(circuit_breaker=CircuitBreaker(failure_threshold=1))
+
+        pool.get(server_url)
+
+        assert pool.circuit_breaker.state == CircuitBreaker.CLOSED
+        assert pool.is_available() is True
+        pool.close()
+
+    def test_metrics_per_endpoint(self, server_url):
+        """Test that latency, status and bytes are recorded per endpoint."""
+        pool = ConnectionPool()
+
+        pool.get(server_url)
+
+        metrics = pool.get_metrics()['getPlan']
+        assert metrics['latency']['count'] == 1
+        assert metrics['status'] == {'200': 1}
+        assert metrics['bytes_in'] == 2
+        pool.close()
@@ -0,0 +1,24 @@
+"""
+Unit tests for EndpointRegistry.
+"""
+from run.http_communicator.endpoints import EndpointRegistry
+
+
+class TestEndpointRegistry:
+    """Test cases for EndpointRegistry class."""
+
+    def test_urls_are_built_up_front(self):
+        """Test that the given endpoints are built on initialization."""
+        registry = EndpointRegistry('https', 'example.org', '444', 'api', ['getPlan', 'postWater'])
+
+        assert registry.urls() == {'getPlan': 'https://example.org:444/api/getPlan',
+                                   'postWater': 'https://example.org:444/api/postWater'}
+
+    def test_unknown_endpoint_is_built_once(self):
+        """Test that unknown endpoints are built on first use and then reused."""
+        registry = EndpointRegistry('http', 'localhost', '8080', 'api')
+
+        first = registry.url('getPhoto')
+
+        assert first == 'http://localhost:8080/api/getPhoto'
+        assert registry.url('getPhoto') is first
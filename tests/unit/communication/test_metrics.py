@@ -0,0 +1,93 @@
+"""
+Unit tests for request metrics.
+"""
+import json
+
+import pytest
+from run.http_communicator.metrics import LatencyHistogram, MetricsReporter, RequestMetrics
+
+
+class TestLatencyHistogram:
+    """Test cases for LatencyHistogram class."""
+
+    def test_quantiles_use_bucket_bounds(self):
+        """Test that quantiles are estimated from the bucket upper bounds."""
+        histogram = LatencyHistogram(buckets=(0.1, 0.5, 1.0))
+        for seconds in (0.05, 0.05, 0.05, 0.3, 0.8):
+            histogram.observe(seconds)
+
+        assert histogram.quantile(0.5) == 0.1
+        assert histogram.quantile(0.95) == 0.8
+        assert histogram.snapshot()['buckets'] == [(0.1, 3), (0.5, 4), (1.0, 5)]
+
+    def test_overflow_bucket_reports_max(self):
+        """Test that samples above the last bound report the maximum."""
+        histogram = LatencyHistogram(buckets=(0.1,))
+        histogram.observe(3.0)
+
+        assert histogram.quantile(0.5) == 3.0
+        assert histogram.snapshot()['max'] == 3.0
+
+    def test_empty_histogram(self):
+        """Test quantiles without samples."""
+        assert LatencyHistogram().quantile(0.95) == 0.0
+
+
+class TestRequestMetrics:
+    """Test cases for RequestMetrics class."""
+
+    @pytest.fixture
+    def metrics(self):
+        """Create metrics with a few recorded requests."""
+        metrics = RequestMetrics(buckets=(0.1, 1.0))
+        metrics.observe('getPlan', 0.05, 200, bytes_out=0, bytes_in=120)
+        metrics.observe('getPlan', 0.5, 304)
+        metrics.observe('postTelemetry', None, 'circuit_open')
+        metrics.record_retry('postTelemetry')
+        return metrics
+
+    def test_snapshot(self, metrics):
+        """Test that the snapshot holds latency, status, bytes and retries per endpoint."""
+        snapshot = metrics.snapshot()
+
+        assert snapshot['getPlan']['latency']['count'] == 2
+        assert snapshot['getPlan']['status'] == {'200': 1, '304': 1}
+        assert snapshot['getPlan']['bytes_in'] == 120
+        assert snapshot['postTelemetry']['latency']['count'] == 0
+        assert snapshot['postTelemetry']['status'] == {'circuit_open': 1}
+        assert snapshot['postTelemetry']['retries'] == 1
+
+    def test_to_prometheus(self, metrics):
+        """Test the Prometheus exposition format."""
+        text = metrics.to_prometheus(prefix='test')
+
+        assert '# TYPE test_request_duration_seconds histogram' in text
+        assert 'test_request_duration_seconds_bucket{endpoint="getPlan",le="0.1"} 1' in text
+        assert 'test_request_duration_seconds_bucket{endpoint="getPlan",le="+Inf"} 2' in text
+        assert 'test_responses_total{endpoint="getPlan",status="304"} 1' in text
+        assert 'test_received_bytes_total{endpoint="getPlan"} 120' in text
+        assert 'test_retries_total{endpoint="postTelemetry"} 1' in text
+
+
+class TestMetricsReporter:
+    """Test cases for MetricsReporter class."""
+
+    def test_write_replaces_file(self, tmp_path):
+        """Test that a snapshot is written as JSON."""
+        path = tmp_path / "metrics.json"
+        reporter = MetricsReporter(lambda: {'breaker': 'closed'}, str(path))
+
+        reporter.write()
+
+        assert json.loads(path.read_text()) == {'breaker': 'closed'}
+        assert not (tmp_path / "metrics.json.tmp").exists()
+
+    def test_stop_writes_last_snapshot(self, tmp_path):
+        """Test that stopping the reporter flushes a final snapshot."""
+        path = tmp_path / "metrics.json"
+        reporter = MetricsReporter(lambda: {'requests': 1}, str(path), interval=60)
+
+        reporter.start()
+        reporter.stop()
+
+        assert json.loads(path.read_text()) == {'requests': 1}
@@ -0,0 +1,70 @@
+"""
+Unit tests for MultipartFileStream.
+"""
+import pytest
+from run.http_communicator.multipart import MultipartFileStream
+
+
+class TestMultipartFileStream:
+    """Test cases for MultipartFileStream class."""
+
+    @pytest.fixture
+    def photo_path(self, tmp_path):
+        """Create a photo file for testing."""
+        path = tmp_path / "photo.jpg"
+        path.write_bytes(bytes(range(256)) * 40)
+        return str(path)
+
+    def _read_all(self, stream, size):
+        """Read a stream to the end in chunks of the given size."""
+        chunks = []
+        while True:
+            chunk = stream.read(size)
+            if not chunk:
+                return b''.join(chunks), chunks
+            chunks.append(chunk)
+
+    def test_length_matches_body(self, photo_path):
+        """Test that the declared length matches the streamed body."""
+        stream = MultipartFileStream({'device_id': 'dev'}, 'image_file', photo_path, boundary='b0und')
+
+        body, _ = self._read_all(stream, 1000)
+
+        assert len(stream) == len(body)
+        assert stream.bytes_read == len(body)
+
+    def test_body_format(self, photo_path):
+        """Test multipart encoding of fields and file."""
+        stream = MultipartFileStream({'device_id': 'dev', 'photo_id': 'p1'}, 'image_file', photo_path,
+                                     content_type='image/jpeg', boundary='b0und')
+
+        body, _ = self._read_all(stream, 1000)
+
+        assert body.startswith(b'--b0und\r\nContent-Disposition: form-data; name="device_id"\r\n\r\ndev\r\n')
+        assert b'name="photo_id"\r\n\r\np1\r\n' in body
+        assert (b'Content-Disposition: form-data; name="image_file"; filename="photo.jpg"\r\n'
+                b'Content-Type: image/jpeg\r\n\r\n' + bytes(range(256)) * 40) in body
+        assert body.endswith(b'\r\n--b0und--\r\n')
+        assert stream.content_type == 'multipart/form-data; boundary=b0und'
+
+    def test_file_read_in_chunks(self, photo_path):
+        """Test that file content is never read beyond the chunk size."""
+        stream = MultipartFileStream({}, 'image_file', photo_path, chunk_size=512)
+
+        _, chunks = self._read_all(stream, 4096)
+
+        assert max(len(chunk) for chunk in chunks) <= 4096
+        assert sum(1 for chunk in chunks if len(chunk) == 512) >= 20
+
+    def test_file_closed_after_read(self, photo_path):
+        """Test that the file is closed once streamed."""
+        stream = MultipartFileStream({}, 'image_file', photo_path)
+
+        self._read_all(stream, 1024)
+
+        assert stream._file.closed
+
+    def test_missing_file_raises(self, tmp_path):
+        """Test that a missing file raises OSError."""
+        with pytest.raises(OSError):
+            MultipartFileStream({}, 'image_file', str(tmp_path / "missing.jpg"))
@@ -0,0 +1,124 @@
+"""
+Unit tests for Outbox.
+"""
+import threading
+
+import pytest
+from run.http_communicator.outbox import Outbox
+
+
+class TestOutbox:
+    """Test cases for Outbox class."""
+
+    @pytest.fixture
+    def outbox(self, tmp_path):
+        """Create an outbox in a temporary directory."""
+        outbox = Outbox(str(tmp_path / "data" / "outbox.db"), batch_size=3, retry_delay=0.01,
+                        max_retry_delay=0.05, idle_interval=0.01)
+        yield outbox
+        outbox.close()
+
+    def test_put_and_ack(self, outbox):
+        """Test that acknowledged records are removed."""
+        record_id = outbox.put('water', {'water_level': 80.0})
+
+        assert outbox.pending() == 1
+        outbox.ack(record_id)
+        assert outbox.pending() == 0
+
+    def test_records_survive_reopen(self, tmp_path):
+        """Test that stored records are durable across restarts."""
+        path = str(tmp_path / "outbox.db")
+        outbox = Outbox(path)
+        outbox.put('moisture', {'moisture_level': 40})
+        outbox.close()
+
+        reopened = Outbox(path)
+
+        assert reopened.peek(10) == [(1, 'moisture', {'moisture_level': 40})]
+        reopened.close()
+
+    def test_outbox_is_bounded(self, tmp_path):
+        """Test that the oldest records are dropped when the outbox is full."""
+        outbox = Outbox(str(tmp_path / "outbox.db"), max_records=3)
+
+        for level in range(5):
+            outbox.put('water', {'water_level': level})
+
+        assert outbox.pending() == 3
+        assert [payload['water_level'] for _, _, payload in outbox.peek(10)] == [2, 3, 4]
+        outbox.close()
+
+    def test_peek_skips_in_flight_records(self, outbox):
+        """Test that records being sent inline are not replayed."""
+        in_flight_id = outbox.put('water', {'water_level': 1}, in_flight=True)
+        outbox.put('water', {'water_level': 2})
+
+        assert [record[0] for record in outbox.peek(10)] == [in_flight_id + 1]
+
+        outbox.release(in_flight_id)
+        assert [record[0] for record in outbox.peek(10)] == [in_flight_id, in_flight_id + 1]
+
+    def test_drain_once_replays_in_order_in_batches(self, outbox):
+        """Test that a drain pass replays one batch oldest first."""
+        for level in range(5):
+            outbox.put('water', {'water_level': level})
+        sent = []
+
+        delivered, failed = outbox.drain_once(lambda kind, payload: sent.append(payload['water_level']) or True)
+
+        assert (delivered, failed) == (3, False)
+        assert sent == [0, 1, 2]
+        assert outbox.pending() == 2
+
+    def test_drain_once_stops_at_first_failure(self, outbox):
+        """Test that undelivered records stay in the outbox."""
+        for level in range(3):
+            outbox.put('water', {'water_level': level})
+
+        delivered, failed = outbox.drain_once(lambda kind, payload: payload['water_level'] < 1)
+
+        assert (delivered, failed) == (1, True)
+        assert outbox.pending() == 2
+
+    def test_drain_once_treats_exceptions_as_failures(self, outbox):
+        """Test that a raising sender does not lose records."""
+        outbox.put('water', {'water_level': 1})
+
+        def send(kind, payload):
+            raise RuntimeError("boom")
+
+        assert outbox.drain_once(send) == (0, True)
+        assert outbox.pending() == 1
+
+    def test_drainer_replays_after_recovery(self, outbox):
+        """Test that the background drainer delivers once the server is back."""
+        for level in range(4):
+            outbox.put('water', {'water_level': level})
+        server_up = threading.Event()
+        drained = threading.Event()
+        sent = []
+
+        def send(kind, payload):
+            if not server_up.is_set():
+                return False
+            sent.append(payload['water_level'])
+            if len(sent) == 4:
+                drained.set()
+            return True
+
+        outbox.start_drainer(send)
+        server_up.set()
+        outbox.wake()
+
+        assert drained.wait(5)
+        outbox.stop_drainer(timeout=5)
+        assert sent == [0, 1, 2, 3]
+        assert outbox.pending() == 0
+
+    def test_invalid_limits(self, tmp_path):
+        """Test that empty limits are rejected."""
+        with pytest.raises(ValueError):
+            Outbox(str(tmp_path / "outbox.db"), max_records=0)
+        with pytest.raises(ValueError):
+            Outbox(str(tmp_path / "outbox.db"), batch_size=0)
@@ -1,12 +1,15 @@
 """
 Unit tests for ServerCommunicator.
 """
+import gzip
+import json
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import requests
 import http as h
 from run.http_communicator.server_communicator import ServerCommunicator
 from run.model.status import Status
+from run.http_communicator.outbox import Outbox
 
 
 class TestServerCommunicator:
@@ -30,7 +33,25 @@ class TestServerCommunicator:
         assert communicator.PORT == "444"
         assert communicator.PROTOCOL == "https"
 
-    @patch('run.http_communicator.server_communicator.requests.get')
+    def test_server_communicator_uses_server_config(self):
+        """Test that SERVER_CONFIG values configure the connection pool."""
+        communicator = ServerCommunicator("test-device-456", "/tmp/test_photos",
+                                          server_config={'pool_size': 2, 'connect_timeout': 3, 'read_timeout': 10})
+        
+        assert communicator.connection_pool.pool_size == 2
+        assert communicator.connection_pool.timeout == (3, 10)
+
+    def test_server_communicator_shared_connection_pool(self):
+        """Test that an injected connection pool is shared and reports stats."""
+        pool = Mock(timeout=(5, 30))
+        pool.get_stats.return_value = {'requests': 2, 'connections_opened': 1, 'connections_reused': 1}
+        
+        communicator = ServerCommunicator("test-device-456", "/tmp/test_photos", connection_pool=pool)
+        
+        assert communicator.connection_pool is pool
+        assert communicator.get_connection_stats()['connections_reused'] == 1
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
     def test_get_plan_success(self, mock_get, communicator):
         """Test successful plan retrieval."""
         # Mock successful response
@@ -44,7 +65,36 @@ class TestServerCommunicator:
         assert result == {"plan_type": "basic", "water_volume": 200}
         mock_get.assert_called_once()
 
-    @patch('run.http_communicator.server_communicator.requests.get')
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
+    def test_get_plan_sends_etag(self, mock_get, communicator):
+        """Test that the plan ETag is sent back on the next request."""
+        mock_response = Mock()
+        mock_response.status_code = h.HTTPStatus.OK
+        mock_response.headers = {'ETag': '"v1"'}
+        mock_response.json.return_value = {"plan_type": "basic", "water_volume": 200}
+        mock_get.return_value = mock_response
+        
+        communicator.get_plan()
+        communicator.get_plan()
+        
+        assert mock_get.call_args_list[0][1]['headers'] == {}
+        assert mock_get.call_args_list[1][1]['headers'] == {'If-None-Match': '"v1"'}
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
+    def test_get_plan_not_modified(self, mock_get, communicator):
+        """Test that an unchanged plan returns empty JSON without parsing a body."""
+        communicator.plan_etag = '"v1"'
+        mock_response = Mock()
+        mock_response.status_code = h.HTTPStatus.NOT_MODIFIED
+        mock_get.return_value = mock_response
+        
+        result = communicator.get_plan()
+        
+        assert result == {}
+        mock_response.json.assert_not_called()
+        assert communicator.plan_etag == '"v1"'
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
     def test_get_plan_no_content(self, mock_get, communicator):
         """Test plan retrieval with no content."""
         # Mock no content response
@@ -57,7 +107,7 @@ class TestServerCommunicator:
         assert result == {}
         mock_get.assert_called_once()
 
-    @patch('run.http_communicator.server_communicator.requests.get')
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
     def test_get_plan_forbidden(self, mock_get, communicator):
         """Test plan retrieval with forbidden response."""
         # Mock forbidden response
@@ -70,7 +120,7 @@ class TestServerCommunicator:
         assert result == {}
         mock_get.assert_called_once()
 
-    @patch('run.http_communicator.server_communicator.requests.get')
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
     def test_get_plan_request_exception(self, mock_get, communicator):
         """Test plan retrieval with request exception."""
         # Mock request exception
@@ -81,7 +131,51 @@ class TestServerCommunicator:
         assert result == {}
         mock_get.assert_called_once()
 
-    @patch('run.http_communicator.server_communicator.requests.request')
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
+    def test_get_commands(self, mock_get, communicator):
+        """Test that queued commands are returned from the long-poll."""
+        commands = [{"type": "picture", "payload": {"photo_id": "photo_1"}}]
+        mock_response = Mock()
+        mock_response.status_code = h.HTTPStatus.OK
+        mock_response.json.return_value = {"commands": commands}
+        mock_get.return_value = mock_response
+        
+        result = communicator.get_commands(timeout=10)
+        
+        assert result == commands
+        assert mock_get.call_args[0][0].endswith('/getCommands')
+        assert mock_get.call_args[1]['params'] == {'device': 'test-device-123', 'timeout': 10}
+        assert mock_get.call_args[1]['timeout'][1] == 10 + communicator.LONG_POLL_GRACE
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
+    def test_get_commands_timeout(self, mock_get, communicator):
+        """Test that an expired long-poll returns no commands."""
+        mock_response = Mock()
+        mock_response.status_code = h.HTTPStatus.NO_CONTENT
+        mock_get.return_value = mock_response
+        
+        assert communicator.get_commands(timeout=10) == []
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
+    def test_get_commands_not_supported(self, mock_get, communicator):
+        """Test that a server without command channel is not asked again."""
+        mock_response = Mock()
+        mock_response.status_code = h.HTTPStatus.NOT_FOUND
+        mock_get.return_value = mock_response
+        
+        assert communicator.get_commands(timeout=10) is None
+        assert communicator.get_commands(timeout=10) is None
+        mock_get.assert_called_once()
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
+    def test_get_commands_request_exception(self, mock_get, communicator):
+        """Test that a failed long-poll makes the caller poll the single endpoints."""
+        mock_get.side_effect = requests.exceptions.RequestException("Network error")
+        
+        assert communicator.get_commands(timeout=10) is None
+        assert communicator.command_channel_supported is True
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
     def test_post_water_success(self, mock_request, communicator):
         """Test successful water level posting."""
         # Mock successful response
@@ -95,7 +189,7 @@ class TestServerCommunicator:
         assert result == {"status": "success"}
         mock_request.assert_called_once()
 
-    @patch('run.http_communicator.server_communicator.requests.request')
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
     def test_post_water_forbidden(self, mock_request, communicator):
         """Test water level posting with forbidden response."""
         # Mock forbidden response
@@ -108,7 +202,7 @@ class TestServerCommunicator:
         assert result == {}
         mock_request.assert_called_once()
 
-    @patch('run.http_communicator.server_communicator.requests.request')
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
     def test_post_moisture_success(self, mock_request, communicator):
         """Test successful moisture level posting."""
         # Mock successful response
@@ -122,7 +216,7 @@ class TestServerCommunicator:
         assert result == {"status": "success"}
         mock_request.assert_called_once()
 
-    @patch('run.http_communicator.server_communicator.requests.request')
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
     def test_post_plan_execution_success(self, mock_request, communicator):
         """Test successful plan execution status posting."""
         # Mock successful response
@@ -137,7 +231,7 @@ class TestServerCommunicator:
         assert result == {"status": "success"}
         mock_request.assert_called_once()
 
-    @patch('run.http_communicator.server_communicator.requests.get')
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
     def test_get_water_level_success(self, mock_get, communicator):
         """Test successful water level retrieval."""
         # Mock successful response
@@ -151,7 +245,7 @@ class TestServerCommunicator:
         assert result == {"water": 1500}
         mock_get.assert_called_once()
 
-    @patch('run.http_communicator.server_communicator.requests.get')
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
     def test_get_picture_success(self, mock_get, communicator):
         """Test successful picture request retrieval."""
         # Mock successful response
@@ -165,45 +259,149 @@ class TestServerCommunicator:
         assert result == {"photo_id": "test_photo"}
         mock_get.assert_called_once()
 
-    @patch('run.http_communicator.server_communicator.os.system')
-    def test_post_picture(self, mock_system, communicator):
-        """Test picture posting."""
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_post_picture(self, mock_request, tmp_path):
+        """Test picture posting streams a multipart body."""
         photo_name = "test_photo"
+        (tmp_path / f"{photo_name}.jpg").write_bytes(b"\xff\xd8jpeg-bytes\xff\xd9")
+        communicator = ServerCommunicator(device_guid="test-device-123", photos_dir=str(tmp_path))
+        uploaded = {}
+
+        def consume_body(method, url, data=None, headers=None, timeout=None):
+            uploaded['body'] = b''.join(iter(lambda: data.read(4), b''))
+            uploaded['headers'] = headers
+            mock_response = Mock()
+            mock_response.status_code = h.HTTPStatus.CREATED
+            mock_response.json.return_value = {"photo_id": photo_name}
+            return mock_response
+
+        mock_request.side_effect = consume_body
+        
+        result = communicator.post_picture(photo_name)
+        
+        assert result == {"photo_id": photo_name}
+        assert uploaded['headers']['Content-Type'].startswith('multipart/form-data; boundary=')
+        assert b'\xff\xd8jpeg-bytes\xff\xd9' in uploaded['body']
+        assert b'name="image_file"; filename="test_photo.jpg"' in uploaded['body']
+        assert communicator.device_guid.encode() in uploaded['body']
+        assert communicator.last_upload['bytes'] == len(uploaded['body'])
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_post_picture_missing_file(self, mock_request, communicator):
+        """Test picture posting when the photo does not exist."""
+        result = communicator.post_picture("missing_photo")
+        
+        assert result == {}
+        mock_request.assert_not_called()
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_post_picture_request_exception(self, mock_request, tmp_path):
+        """Test picture posting with request exception."""
+        (tmp_path / "test_photo.jpg").write_bytes(b"jpeg")
+        communicator = ServerCommunicator(device_guid="test-device-123", photos_dir=str(tmp_path))
+        mock_request.side_effect = requests.exceptions.RequestException("Network error")
+        
+        result = communicator.post_picture("test_photo")
+        
+        assert result == {}
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
+    def test_endpoint_timeouts(self, mock_get):
+        """Test that every endpoint gets its own read timeout."""
+        communicator = ServerCommunicator("test-device-123", "/tmp/photos",
+                                          server_config={'connect_timeout': 2,
+                                                         'endpoint_read_timeouts': {'getPlan': 4}})
+        mock_get.return_value = Mock(status_code=h.HTTPStatus.NO_CONTENT)
+        
+        communicator.get_plan()
+        
+        assert mock_get.call_args[1]['timeout'] == (2, 4)
+        assert communicator.timeout_for(communicator.POST_PICTURE) == (2, 60)
+
+    def test_breaker_state(self, communicator):
+        """Test that the breaker state is exposed to the control loop."""
+        assert communicator.is_server_available() is True
+        assert communicator.get_breaker_state() == 'closed'
+        
+        for _ in range(communicator.connection_pool.circuit_breaker.failure_threshold):
+            communicator.connection_pool.circuit_breaker.record_failure()
+        
+        assert communicator.is_server_available() is False
+        assert communicator.get_breaker_state() == 'open'
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_post_json_gzip(self, mock_request):
+        """Test that large JSON bodies are sent gzip compressed when enabled."""
+        communicator = ServerCommunicator("test-device-123", "/tmp/photos",
+                                          server_config={'gzip_requests': True, 'gzip_min_bytes': 10})
+        mock_request.return_value = Mock(status_code=h.HTTPStatus.CREATED)
+        
+        communicator.post_water(75.5)
+        
+        kwargs = mock_request.call_args[1]
+        assert kwargs['headers']['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(kwargs['data'])) == {'device': 'test-device-123', 'water_level': 75.5}
+        assert 'json' not in kwargs
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_post_json_small_body_not_compressed(self, mock_request):
+        """Test that bodies below the minimum size are sent as plain JSON."""
+        communicator = ServerCommunicator("test-device-123", "/tmp/photos", server_config={'gzip_requests': True})
+        mock_request.return_value = Mock(status_code=h.HTTPStatus.CREATED)
         
-        communicator.post_picture(photo_name)
+        communicator.post_water(75.5)
         
-        # Verify os.system was called with curl command
-        mock_system.assert_called_once()
-        call_args = mock_system.call_args[0][0]
-        assert "curl" in call_args
-        assert photo_name in call_args
-        assert communicator.device_guid in call_args
+        assert mock_request.call_args[1]['json'] == {'device': 'test-device-123', 'water_level': 75.5}
 
-    @patch('run.http_communicator.server_communicator.socket.socket')
-    def test_get_ip_address(self, mock_socket_class, communicator):
-        """Test IP address retrieval."""
-        # Mock socket
-        mock_socket = Mock()
-        mock_socket.getsockname.return_value = ("192.168.1.100", 12345)
-        mock_socket_class.return_value = mock_socket
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_post_json_gzip_not_supported(self, mock_request):
+        """Test that a server rejecting gzip bodies gets the record uncompressed."""
+        communicator = ServerCommunicator("test-device-123", "/tmp/photos",
+                                          server_config={'gzip_requests': True, 'gzip_min_bytes': 10})
+        mock_request.side_effect = [Mock(status_code=h.HTTPStatus.UNSUPPORTED_MEDIA_TYPE),
+                                    Mock(status_code=h.HTTPStatus.CREATED)]
+        
+        communicator.post_water(75.5)
+        
+        assert communicator.gzip_requests is False
+        assert mock_request.call_args[1]['json'] == {'device': 'test-device-123', 'water_level': 75.5}
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_replay_counts_retry(self, mock_request, communicator):
+        """Test that outbox replays are counted as retries of their endpoint."""
+        mock_request.return_value = Mock(status_code=h.HTTPStatus.CREATED)
+        
+        communicator.replay_record('water', {'water_level': 75.5})
         
-        result = communicator.get_ip_address()
+        assert communicator.get_metrics()['endpoints']['postWater']['retries'] == 1
+
+    def test_get_metrics_snapshot(self, communicator):
+        """Test that the metrics snapshot covers all communication counters."""
+        snapshot = communicator.get_metrics()
         
-        # Should return the hardcoded IP address, not the actual one
-        assert result == "wmeautomation.de"
-        mock_socket.connect.assert_called_with(("8.8.8.8", 80))
-        mock_socket.close.assert_called_once()
+        assert set(snapshot) == {'endpoints', 'traffic', 'connections', 'breaker', 'outbox_pending'}
+        assert snapshot['breaker'] == 'closed'
+        assert snapshot['outbox_pending'] == 0
 
-    def test_build_url_for_request(self, communicator):
-        """Test URL building for requests."""
-        protocol = "https"
-        ip = "192.168.1.100"
-        request_url = "getPlan"
+    @patch('socket.socket')
+    def test_init_needs_no_network(self, mock_socket_class):
+        """Test that the communicator starts without any network access."""
+        mock_socket_class.side_effect = OSError("Network is unreachable")
         
-        result = communicator.build_ulr_for_request(protocol, ip, request_url)
+        communicator = ServerCommunicator("test-device-123", "/tmp/photos")
         
-        expected = f"{protocol}://{ip}:{communicator.PORT}/{communicator.APP_MASTER_URL}/{request_url}"
-        assert result == expected
+        mock_socket_class.assert_not_called()
+        assert communicator.endpoints.url(communicator.GET_PLAN_URL) == \
+            f"https://wmeautomation.de:{communicator.PORT}/{communicator.APP_MASTER_URL}/getPlan"
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_send_picture_network_error_is_not_delivered(self, mock_request, tmp_path):
+        """Test that a failed upload is kept for a retry instead of being dropped."""
+        (tmp_path / "test_photo.jpg").write_bytes(b"jpeg")
+        communicator = ServerCommunicator(device_guid="test-device-123", photos_dir=str(tmp_path))
+        mock_request.side_effect = requests.exceptions.ConnectionError("Network error")
+        
+        assert communicator.send_picture("test_photo") == (False, {})
 
     def test_return_empty_json(self, communicator):
         """Test returning empty JSON."""
@@ -211,7 +409,7 @@ class TestServerCommunicator:
         
         assert result == {}
 
-    @patch('run.http_communicator.server_communicator.requests.get')
+    @patch('run.http_communicator.connection_pool.ConnectionPool.get')
     def test_get_plan_with_different_status_codes(self, mock_get, communicator):
         """Test get_plan with various HTTP status codes."""
         test_cases = [
@@ -233,7 +431,7 @@ class TestServerCommunicator:
             
             assert result == expected_result
 
-    @patch('run.http_communicator.server_communicator.requests.request')
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
     def test_post_methods_with_exception(self, mock_request, communicator):
         """Test POST methods with request exceptions."""
         mock_request.side_effect = requests.exceptions.RequestException("Network error")
@@ -249,3 +447,85 @@ class TestServerCommunicator:
             result = method(*args)
             assert result == {}
 
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_post_telemetry_batched(self, mock_request, communicator):
+        """Test that telemetry is sent in a single request."""
+        mock_response = Mock()
+        mock_response.status_code = h.HTTPStatus.CREATED
+        mock_response.json.return_value = {"success": True}
+        mock_request.return_value = mock_response
+        
+        result = communicator.post_telemetry(status=Status(True, "ok"), water_level=80.0,
+                                             moisture_level=60, heartbeat=True)
+        
+        assert result == {"success": True}
+        mock_request.assert_called_once()
+        assert mock_request.call_args[0][1].endswith('/postTelemetry')
+        assert mock_request.call_args[1]['json'] == {
+            'device': 'test-device-123', 'heartbeat': True, 'execution_status': True,
+            'message': 'ok', 'water_level': 80.0, 'moisture_level': 60
+        }
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_post_telemetry_falls_back_on_not_found(self, mock_request, communicator):
+        """Test fallback to per-metric endpoints when the server answers 404."""
+        not_found = Mock()
+        not_found.status_code = h.HTTPStatus.NOT_FOUND
+        created = Mock()
+        created.status_code = h.HTTPStatus.CREATED
+        created.json.return_value = {}
+        mock_request.side_effect = [not_found] + [created] * 7
+        
+        communicator.post_telemetry(status=Status(True, "ok"), water_level=80.0, moisture_level=60, heartbeat=True)
+        
+        urls = [call[0][1].rsplit('/', 1)[1] for call in mock_request.call_args_list]
+        assert urls == ['postTelemetry', 'postStatus', 'postStatus', 'postWater', 'postMoisture']
+        assert communicator.telemetry_batch_supported is False
+        
+        # Later calls go straight to the legacy endpoints
+        communicator.post_telemetry(moisture_level=55)
+        assert mock_request.call_args[0][1].endswith('/postMoisture')
+        assert mock_request.call_count == 6
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_post_telemetry_request_exception(self, mock_request, communicator):
+        """Test that a network error does not disable batching."""
+        mock_request.side_effect = requests.exceptions.RequestException("Network error")
+        
+        result = communicator.post_telemetry(moisture_level=60, heartbeat=True)
+        
+        assert result == {}
+        assert communicator.telemetry_batch_supported is True
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_outbox_keeps_undelivered_records(self, mock_request, tmp_path):
+        """Test that failed posts stay in the outbox and delivered ones are removed."""
+        outbox = Outbox(str(tmp_path / "outbox.db"))
+        communicator = ServerCommunicator("test-device-123", "/tmp/photos", outbox=outbox)
+        created = Mock()
+        created.status_code = h.HTTPStatus.CREATED
+        created.json.return_value = {}
+        mock_request.side_effect = [requests.exceptions.RequestException("Network error"), created]
+        
+        communicator.post_water(75.5)
+        communicator.post_moisture(60)
+        
+        assert outbox.peek(10) == [(1, 'water', {'water_level': 75.5})]
+        outbox.close()
+
+    @patch('run.http_communicator.connection_pool.ConnectionPool.request')
+    def test_replay_record(self, mock_request, communicator):
+        """Test that replayed records are posted to their endpoint."""
+        server_error = Mock()
+        server_error.status_code = h.HTTPStatus.INTERNAL_SERVER_ERROR
+        forbidden = Mock()
+        forbidden.status_code = h.HTTPStatus.FORBIDDEN
+        mock_request.side_effect = [server_error, forbidden]
+        
+        assert communicator.replay_record('status', {'execution_status': True, 'message': 'ok'}) is False
+        assert communicator.replay_record('moisture', {'moisture_level': 60}) is True
+        assert mock_request.call_args_list[0][0][1].endswith('/postStatus')
+        assert mock_request.call_args_list[0][1]['json'] == {'device': 'test-device-123',
+                                                             'execution_status': True, 'message': 'ok'}
+        assert mock_request.call_args_list[1][0][1].endswith('/postMoisture')
@@ -0,0 +1,88 @@
+"""
+Unit tests for TrafficCounter.
+"""
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from run.http_communicator.connection_pool import ConnectionPool
+from run.http_communicator.traffic import TrafficCounter
+
+PLAN = {'plan_type': 'time_based', 'weekday_times': [{'weekday': day, 'time_water': f'{hour:02d}:00'}
+                                                     for day in range(7) for hour in range(24)]}
+
+
+class _GzipHandler(BaseHTTPRequestHandler):
+    """HTTP handler answering with a gzip compressed plan and echoing POST sizes."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = gzip.compress(json.dumps(PLAN).encode())
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestTrafficCounter:
+    """Test cases for TrafficCounter class."""
+
+    @pytest.fixture
+    def server_url(self):
+        """Start a local HTTP server serving gzip bodies."""
+        server = HTTPServer(('127.0.0.1', 0), _GzipHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f'http://127.0.0.1:{server.server_port}/api'
+        server.shutdown()
+        server.server_close()
+
+    def test_report_computes_savings(self):
+        """Test that the report sums both directions."""
+        counter = TrafficCounter()
+        counter.record('postTelemetry', sent_raw=800, sent_wire=200, received_raw=0, received_wire=0)
+        counter.record('postTelemetry', sent_raw=200, sent_wire=100, received_raw=0, received_wire=0)
+
+        report = counter.report()['postTelemetry']
+
+        assert report['requests'] == 2
+        assert report['saved_bytes'] == 700
+        assert report['ratio'] == 0.3
+
+    def test_compressed_plan_response_is_counted(self, server_url):
+        """Test that a gzip plan is decoded and counted compressed and uncompressed."""
+        pool = ConnectionPool()
+
+        response = pool.get(f'{server_url}/getPlan')
+
+        report = pool.get_traffic_report()['getPlan']
+        assert response.json() == PLAN
+        assert report['received_raw'] == len(json.dumps(PLAN))
+        assert report['received_wire'] == int(response.headers['Content-Length'])
+        assert report['saved_bytes'] > 0
+        pool.close()
+
+    def test_compressed_request_body_is_counted(self, server_url):
+        """Test that the uncompressed size of a gzip request body is taken from its trailer."""
+        pool = ConnectionPool()
+        raw = json.dumps(PLAN).encode()
+        body = gzip.compress(raw)
+
+        pool.request('POST', f'{server_url}/postTelemetry', data=body, headers={'Content-Encoding': 'gzip'})
+
+        report = pool.get_traffic_report()['postTelemetry']
+        assert (report['sent_raw'], report['sent_wire']) == (len(raw), len(body))
+        pool.close()
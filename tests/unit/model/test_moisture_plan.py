@@ -56,6 +56,21 @@ class TestMoisturePlan:
         assert plan.moisture_threshold == 0.3
         assert plan.check_interval == 45
 
+    def test_moisture_plan_from_dict(self):
+        """Test creating moisture plan from an already parsed dictionary."""
+        plan = MoisturePlan.from_dict({
+            "name": "moisture_plan",
+            "plan_type": "moisture",
+            "water_volume": 150,
+            "moisture_threshold": 0.3,
+            "check_interval": 45,
+            "unknown": "ignored"
+        })
+        
+        assert plan.moisture_threshold == 0.3
+        assert plan.check_interval == 45
+        assert MoisturePlan.from_dict({"name": "moisture_plan"}) is None
+
     def test_moisture_plan_from_json_invalid(self):
         """Test creating moisture plan from invalid JSON."""
         invalid_json = "invalid json string"
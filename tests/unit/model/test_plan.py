@@ -55,6 +55,15 @@ class TestPlan:
         result = Plan.from_json(json_string)
         assert result is None
 
+    def test_plan_from_dict(self):
+        """Test creating plan from an already parsed dictionary."""
+        plan = Plan.from_dict({"name": "plant1", "plan_type": "basic", "water_volume": 200, "extra": 1})
+        
+        assert plan.name == "plant1"
+        assert plan.water_volume == 200
+        assert Plan.from_dict({"name": "test"}) is None
+        assert Plan.from_dict(None) is None
+
     def test_plan_with_different_types(self):
         """Test plan with different data types."""
         name = "numeric_plan"
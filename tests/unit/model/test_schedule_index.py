@@ -0,0 +1,115 @@
+"""
+Unit tests for ScheduleIndex model.
+"""
+import datetime
+
+import pytest
+
+from run.common.time_engine import minute_of_day, time_string
+from run.model.schedule_index import ScheduleIndex
+from run.model.time_plan import TimePlan
+from run.model.watertime import WaterTime
+
+
+class TestScheduleIndex:
+    """Test cases for ScheduleIndex class."""
+
+    @pytest.fixture
+    def index(self):
+        """Create an index with slots on Monday, Wednesday and Sunday."""
+        return ScheduleIndex([WaterTime("Wednesday", "18:00"), WaterTime("Monday", "07:00"),
+                              WaterTime("Wednesday", "08:00"), WaterTime("Sunday", "23:30")])
+
+    def test_minute_of_day_round_trip(self):
+        """Test conversion between time strings and minutes of the day."""
+        assert minute_of_day("08:05") == 485
+        assert time_string(485) == "08:05"
+        assert time_string(minute_of_day("8:05")) == "08:05"
+
+        with pytest.raises(ValueError):
+            minute_of_day("25:70")
+
+    def test_slots_are_sorted_per_weekday(self, index):
+        """Test that slots of a weekday are sorted minutes of the day."""
+        assert index.slots(2) == [480, 1080]
+        assert index.slots(1) == []
+        assert len(index) == 4
+
+    def test_entry_at(self, index):
+        """Test looking up the entry of a slot."""
+        entry = index.entry_at(2, 480)
+
+        assert entry.weekday == "Wednesday" and entry.time_water == "08:00"
+        assert index.entry_at(2, 481) is None
+
+    def test_invalid_and_duplicate_entries(self):
+        """Test that invalid entries are skipped and duplicate slots are kept once."""
+        first = WaterTime("Monday", "07:00")
+        index = ScheduleIndex([WaterTime("Someday", "07:00"), WaterTime("Monday", "99:00"),
+                               first, WaterTime("Monday", "7:00")])
+
+        assert len(index) == 1
+        assert index.entry_at(0, 420) is first
+
+    def test_next_due_later_today(self, index):
+        """Test that the next slot of the current day is found."""
+        # 2024-01-10 is a Wednesday
+        slot, entry = index.next_due(datetime.datetime(2024, 1, 10, 8, 0))
+
+        assert slot == datetime.datetime(2024, 1, 10, 18, 0)
+        assert entry.time_water == "18:00"
+
+    def test_next_due_wraps_around_the_week(self, index):
+        """Test that the search continues into the next week."""
+        slot, _ = index.next_due(datetime.datetime(2024, 1, 14, 23, 45))
+
+        assert slot == datetime.datetime(2024, 1, 15, 7, 0)
+
+    def test_next_due_single_slot_next_week(self):
+        """Test that a passed single slot is due on the same weekday next week."""
+        index = ScheduleIndex([WaterTime("Wednesday", "08:00")])
+
+        slot, _ = index.next_due(datetime.datetime(2024, 1, 10, 8, 0, 30))
+
+        assert slot == datetime.datetime(2024, 1, 17, 8, 0)
+
+    def test_next_due_empty(self):
+        """Test that an empty index has no next slot."""
+        assert ScheduleIndex([]).next_due(datetime.datetime(2024, 1, 10)) is None
+
+    def test_due_between_excludes_start_and_includes_end(self, index):
+        """Test the window bounds of due_between."""
+        due = index.due_between(datetime.datetime(2024, 1, 10, 8, 0), datetime.datetime(2024, 1, 10, 18, 0))
+
+        assert [slot for slot, _ in due] == [datetime.datetime(2024, 1, 10, 18, 0)]
+
+    def test_due_between_spans_days(self, index):
+        """Test that a window over several days returns the slots in order."""
+        due = index.due_between(datetime.datetime(2024, 1, 10, 12, 0), datetime.datetime(2024, 1, 15, 7, 30))
+
+        assert [slot for slot, _ in due] == [datetime.datetime(2024, 1, 10, 18, 0),
+                                             datetime.datetime(2024, 1, 14, 23, 30),
+                                             datetime.datetime(2024, 1, 15, 7, 0)]
+
+    def test_due_between_current_minute(self, index):
+        """Test that a slot is due during its whole minute."""
+        now = datetime.datetime(2024, 1, 10, 8, 0, 59)
+
+        due = index.due_between(now - datetime.timedelta(minutes=1), now)
+
+        assert [entry.time_water for _, entry in due] == ["08:00"]
+
+    def test_due_between_empty_window(self, index):
+        """Test that a window ending before it starts has no slots."""
+        now = datetime.datetime(2024, 1, 10, 8, 0)
+
+        assert index.due_between(now, now) == []
+
+    def test_time_plan_recompiles_on_assignment(self):
+        """Test that assigning weekday_times recompiles the plan's index."""
+        plan = TimePlan("plan", "time_based", 100, [WaterTime("Monday", "07:00")])
+
+        plan.weekday_times = [WaterTime("Tuesday", "09:00")]
+
+        assert plan.schedule.entry_at(0, 420) is None
+        assert plan.schedule.entry_at(1, 540).time_water == "09:00"
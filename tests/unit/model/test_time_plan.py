@@ -68,6 +68,28 @@ class TestTimePlan:
         assert plan.weekday_times[1].weekday == "Friday"
         assert plan.weekday_times[1].time_water == "18:00"
 
+    def test_time_plan_from_dict(self):
+        """Test creating time plan from an already parsed dictionary."""
+        plan = TimePlan.from_dict({
+            "name": "time_plan",
+            "plan_type": "time_based",
+            "water_volume": 150,
+            "weekday_times": [{"weekday": "Monday", "time_water": "08:00"}]
+        })
+        
+        assert plan.water_volume == 150
+        assert plan.execute_only_once is False
+        assert plan.weekday_times[0].time_water == "08:00"
+        assert plan.schedule.entry_at(0, 480) is plan.weekday_times[0]
+
+    def test_time_plan_from_dict_invalid(self):
+        """Test creating time plan from invalid dictionaries."""
+        assert TimePlan.from_dict({}) is None
+        assert TimePlan.from_dict({"name": "time_plan", "plan_type": "time_based", "water_volume": 150}) is None
+        assert TimePlan.from_dict({"name": "time_plan", "plan_type": "time_based", "water_volume": 150,
+                                   "weekday_times": [{"weekday": "Monday"}]}) is None
+        assert TimePlan.from_dict(["not", "a", "plan"]) is None
+
     def test_time_plan_from_json_invalid(self):
         """Test creating time plan from invalid JSON."""
         invalid_json = "invalid json string"
@@ -0,0 +1,84 @@
+"""
+Unit tests for AsyncCycleDriver.
+"""
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import Mock
+from run.http_communicator.async_server_communicator import AsyncServerCommunicator
+from run.operation.async_cycle import AsyncCycleDriver, PollResult
+
+
+class TestAsyncCycleDriver:
+    """Test cases for AsyncCycleDriver class."""
+
+    @pytest.fixture
+    def communicator(self):
+        """Create a mock communicator whose polls only finish together."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def respond(value):
+            def poll():
+                barrier.wait()
+                return value
+            return poll
+
+        communicator = Mock()
+        communicator.get_water_level = Mock(side_effect=respond({"water": 1500}))
+        communicator.get_picture = Mock(side_effect=respond({"photo_id": "p1"}))
+        communicator.get_plan = Mock(side_effect=respond({}))
+        return communicator
+
+    @pytest.fixture
+    def driver(self, communicator):
+        """Create an AsyncCycleDriver for testing."""
+        driver = AsyncCycleDriver(AsyncServerCommunicator(communicator))
+        yield driver
+        driver.close()
+
+    def test_poll_runs_requests_concurrently(self, driver):
+        """Test that the three polls are in flight at the same time."""
+        result = driver.poll()
+
+        assert result == PollResult(water_level={"water": 1500}, picture={"photo_id": "p1"}, plan={})
+
+    def test_poll_without_picture(self, driver, communicator):
+        """Test that the photo request poll can be left out."""
+        communicator.get_water_level.side_effect = None
+        communicator.get_water_level.return_value = {"water": 1500}
+        communicator.get_plan.side_effect = None
+        communicator.get_plan.return_value = {}
+
+        result = driver.poll(picture=False)
+
+        assert result == PollResult(water_level={"water": 1500}, picture={}, plan={})
+        communicator.get_picture.assert_not_called()
+
+    def test_poll_reuses_event_loop(self, driver):
+        """Test that consecutive synchronous polls share one event loop."""
+        driver.poll()
+        loop = driver._loop
+        driver.poll()
+
+        assert driver._loop is loop
+
+    def test_poll_propagates_exceptions(self, driver, communicator):
+        """Test that a failing poll raises to the caller."""
+        communicator.get_plan.side_effect = RuntimeError("boom")
+        communicator.get_water_level.side_effect = None
+        communicator.get_picture.side_effect = None
+
+        with pytest.raises(RuntimeError):
+            driver.poll()
+
+    def test_run_cycle_processes_poll_results(self, driver):
+        """Test that a full async cycle hands the polls to the server checker."""
+        server_checker = Mock()
+        sensors = {"camera_sensor": Mock()}
+
+        asyncio.run(driver.run_cycle(server_checker, sensors))
+
+        server_checker._send_health_check.assert_called_once()
+        server_checker.process_poll_results.assert_called_once_with(
+            sensors, PollResult(water_level={"water": 1500}, picture={"photo_id": "p1"}, plan={}))
@@ -0,0 +1,114 @@
+"""
+Unit tests for CycleProfiler.
+"""
+import pytest
+from unittest.mock import Mock
+from run.operation.cycle_profiler import CycleProfiler, CountingCommunicator, percentile
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCycleProfiler:
+    """Test cases for CycleProfiler class."""
+
+    @pytest.fixture
+    def clock(self):
+        """Create a clock standing at 0."""
+        return FakeClock()
+
+    @pytest.fixture
+    def profiler(self, clock):
+        """Create a profiler with a 2 second budget."""
+        return CycleProfiler(budget=2, window=10, clock=clock)
+
+    def test_percentile_nearest_rank(self):
+        """Test the nearest-rank percentile."""
+        values = list(range(1, 21))
+
+        assert percentile(values, 0.5) == 10
+        assert percentile(values, 0.95) == 19
+        assert percentile([], 0.5) == 0.0
+
+    def test_phase_records_time_and_network_calls(self, profiler, clock):
+        """Test that a phase records its wall time and the network calls made in it."""
+        communicator = profiler.count_calls(Mock())
+
+        with profiler.phase('poll'):
+            communicator.get_plan()
+            communicator.get_picture()
+            communicator.return_emply_json()
+            clock.now += 0.5
+
+        stats = profiler.stats()['phases']['poll']
+        assert stats['count'] == 1
+        assert stats['seconds']['max'] == 0.5
+        assert stats['network_calls']['max'] == 2
+
+    def test_rolling_window(self, profiler, clock):
+        """Test that only the last window samples are kept."""
+        for seconds in range(20):
+            with profiler.phase('plan'):
+                clock.now += seconds
+
+        stats = profiler.stats()['phases']['plan']
+        assert stats['count'] == 10
+        assert stats['seconds']['p50'] == 14
+        assert stats['seconds']['max'] == 19
+
+    def test_slow_cycle_record(self, profiler, clock):
+        """Test that a cycle over budget produces one record with the breakdown."""
+        communicator = profiler.count_calls(Mock())
+        profiler.start_cycle()
+        with profiler.phase('poll'):
+            communicator.get_plan()
+            clock.now += 1
+        with profiler.phase('photo'):
+            communicator.post_picture('p1')
+            clock.now += 1.5
+
+        record = profiler.end_cycle()
+
+        assert record['seconds'] == 2.5
+        assert record['network_calls'] == 2
+        assert record['phases'] == {'poll': {'seconds': 1, 'network_calls': 1},
+                                    'photo': {'seconds': 1.5, 'network_calls': 1}}
+        assert profiler.stats()['slow_cycles'] == 1
+        assert list(profiler.slow_cycles) == [record]
+
+    def test_idle_phase_not_in_budget(self, profiler, clock):
+        """Test that waiting phases are left out of the cycle time."""
+        profiler.start_cycle()
+        with profiler.phase('commands', idle=True):
+            clock.now += 30
+        with profiler.phase('plan'):
+            clock.now += 1
+
+        assert profiler.end_cycle() is None
+        assert profiler.stats()['cycle']['seconds']['max'] == 1
+
+    def test_counting_communicator_is_transparent(self):
+        """Test that the proxy passes calls and attributes through."""
+        communicator = Mock()
+        communicator.get_plan.return_value = {'plan_type': 'basic'}
+        calls = Mock()
+        proxy = CountingCommunicator(communicator, calls)
+
+        assert proxy.get_plan() == {'plan_type': 'basic'}
+        assert proxy.is_server_available is communicator.is_server_available
+        assert proxy == communicator
+        calls.assert_called_once()
+
+    def test_from_config(self):
+        """Test creating a profiler from TIMING_CONFIG."""
+        profiler = CycleProfiler.from_config({'cycle_budget': 3, 'profiler_window': 50})
+
+        assert profiler.budget == 3
+        assert profiler.window == 50
@@ -0,0 +1,74 @@
+"""
+Unit tests for the moisture trend.
+"""
+import pytest
+from run.operation.moisture_trend import MoistureTrend
+
+HOUR = 3600
+INTERVAL = 30
+
+
+def drying_trend(levels, hours_apart=1, **kwargs):
+    """Create a trend with readings taken some hours apart."""
+    trend = MoistureTrend(**kwargs)
+    for index, level in enumerate(levels):
+        trend.record(index * hours_apart * HOUR, level)
+    return trend
+
+
+class TestMoistureTrend:
+    """Test cases for MoistureTrend class."""
+
+    def test_slope_and_crossing(self):
+        """Test the fitted drying rate and the predicted threshold crossing."""
+        trend = drying_trend([80, 78, 76])
+
+        assert trend.slope() == pytest.approx(-2 / HOUR)
+        assert trend.predict_crossing(40) == pytest.approx(20 * HOUR)
+
+    def test_window_keeps_latest_readings(self):
+        """Test that the fit only uses the most recent readings."""
+        trend = drying_trend([10, 90, 80, 70], window=3)
+
+        assert len(trend) == 3
+        assert trend.slope() == pytest.approx(-10 / HOUR)
+
+    def test_no_prediction_without_drying_trend(self):
+        """Test that too few, simultaneous or rising readings predict no crossing."""
+        assert drying_trend([80, 78]).predict_crossing(40) is None
+        assert drying_trend([80, 78, 76], hours_apart=0).predict_crossing(40) is None
+        assert drying_trend([70, 72, 74]).predict_crossing(40) is None
+
+    def test_next_check_halves_distance_to_crossing(self):
+        """Test that checks are sparse far from the crossing and every interval close to it."""
+        far = drying_trend([80, 79.5, 79])
+        halfway = drying_trend([80, 78, 76], max_skipped_intervals=48)
+        close = drying_trend([41.5, 41, 40.5])
+
+        assert far.next_check(2 * HOUR, 40, INTERVAL) == 2 * HOUR + 4 * INTERVAL * 60
+        assert halfway.next_check(2 * HOUR, 40, INTERVAL) == pytest.approx(11 * HOUR)
+        assert close.next_check(2 * HOUR, 40, INTERVAL) == 2 * HOUR + INTERVAL * 60
+
+    def test_next_check_without_enough_readings(self):
+        """Test that the check interval stays in charge until the trend is known."""
+        trend = drying_trend([80, 78])
+
+        assert trend.next_check(HOUR, 40, INTERVAL) is None
+
+        trend.record(2 * HOUR, 76)
+        trend.clear()
+        assert len(trend) == 0
+        assert trend.next_check(2 * HOUR, 40, INTERVAL) is None
+
+    def test_from_config(self):
+        """Test creating a trend from TIMING_CONFIG."""
+        trend = MoistureTrend.from_config({'moisture_trend_window': 5, 'moisture_check_max_skipped_intervals': 2})
+
+        assert trend.window == 5
+        assert trend.max_skipped_intervals == 2
+
+    @pytest.mark.parametrize("kwargs", [{'min_samples': 1}, {'window': 2}, {'max_skipped_intervals': 0}])
+    def test_invalid_settings(self, kwargs):
+        """Test that invalid settings are rejected."""
+        with pytest.raises(ValueError):
+            MoistureTrend(**kwargs)
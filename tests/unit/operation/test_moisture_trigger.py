@@ -0,0 +1,93 @@
+"""
+Unit tests for the dry soil moisture trigger.
+"""
+import time
+import pytest
+from unittest.mock import Mock
+from run.operation.moisture_trigger import MoistureTrigger
+
+
+def wait_until(condition, timeout=2.0):
+    """Poll a condition until it holds or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class TestMoistureTrigger:
+    """Test cases for MoistureTrigger class."""
+
+    @pytest.fixture
+    def sensor(self):
+        """Create a sensor reporting dry soil."""
+        sensor = Mock()
+        sensor.when_dry = None
+        sensor.when_wet = None
+        sensor.is_dry = Mock(return_value=True)
+        return sensor
+
+    @pytest.fixture
+    def pump(self):
+        """Create a pump starting to water on evaluation."""
+        pump = Mock()
+        pump.evaluate_moisture_edge = Mock(return_value=True)
+        return pump
+
+    def test_start_and_stop_wire_callbacks(self, pump, sensor):
+        """Test that the trigger attaches to the sensor edges and detaches on stop."""
+        trigger = MoistureTrigger(pump, sensor, Mock(), debounce=0.01)
+
+        trigger.start()
+        assert sensor.when_dry == trigger.on_edge
+        assert sensor.when_wet == trigger.on_edge
+        assert trigger.is_running()
+
+        trigger.stop(timeout=1)
+        assert sensor.when_dry is None
+        assert sensor.when_wet is None
+        assert not trigger.is_running()
+
+    def test_dry_edge_evaluates_plan_after_debounce(self, pump, sensor):
+        """Test that a dry edge has the pump evaluate its plan once the sensor stayed dry."""
+        relay = Mock()
+        trigger = MoistureTrigger(pump, sensor, relay, debounce=0.01)
+        trigger.start()
+        try:
+            sensor.when_dry()
+
+            assert wait_until(lambda: trigger.evaluations == 1)
+            pump.evaluate_moisture_edge.assert_called_once_with(relay)
+            assert trigger.waterings == 1
+        finally:
+            trigger.stop(timeout=1)
+
+    def test_bounce_back_to_wet_is_ignored(self, pump, sensor):
+        """Test that an edge is not acted on if the sensor is wet again after the debounce time."""
+        sensor.is_dry.return_value = False
+        trigger = MoistureTrigger(pump, sensor, Mock(), debounce=0.01)
+        trigger.start()
+        try:
+            sensor.when_dry()
+            sensor.when_wet()
+
+            assert wait_until(lambda: sensor.is_dry.called)
+            time.sleep(0.05)
+            pump.evaluate_moisture_edge.assert_not_called()
+        finally:
+            trigger.stop(timeout=1)
+
+    def test_evaluation_error_is_contained(self, pump, sensor):
+        """Test that a failing evaluation does not stop the trigger."""
+        pump.evaluate_moisture_edge.side_effect = RuntimeError("relay fault")
+        trigger = MoistureTrigger(pump, sensor, Mock())
+
+        assert trigger.evaluate() is False
+        assert trigger.evaluations == 1
+        assert trigger.waterings == 0
+
+    def test_from_config(self, pump, sensor):
+        """Test creating a trigger from SENSOR_CONFIG."""
+        trigger = MoistureTrigger.from_config(pump, sensor, Mock(), {'moisture_trigger_debounce': 0.5})
+
+        assert trigger.debounce == 0.5
@@ -0,0 +1,72 @@
+"""
+Unit tests for the plan cache.
+"""
+import pytest
+
+from run.model.moisture_plan import MoisturePlan
+from run.model.plan import Plan
+from run.model.time_plan import TimePlan
+from run.operation.plan_cache import PlanCache, content_hash
+
+
+class TestPlanCache:
+    """Test cases for PlanCache class."""
+
+    @pytest.fixture
+    def time_plan(self):
+        """Create a time plan dictionary."""
+        return {"name": "time_plan", "plan_type": "time_based", "water_volume": 150,
+                "weekday_times": [{"weekday": "Monday", "time_water": "08:00"}], "execute_only_once": False}
+
+    def test_content_hash_ignores_key_order(self, time_plan):
+        """Test that the hash depends on the content only."""
+        reordered = dict(reversed(list(time_plan.items())))
+
+        assert content_hash(reordered) == content_hash(time_plan)
+        assert content_hash({**time_plan, "water_volume": 151}) != content_hash(time_plan)
+
+    def test_identical_plan_is_decoded_once(self, time_plan):
+        """Test that identical content returns the plan decoded first."""
+        cache = PlanCache()
+
+        first = cache.decode(time_plan, TimePlan)
+        second = cache.decode(dict(time_plan), TimePlan)
+
+        assert isinstance(first, TimePlan)
+        assert second is first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_plan_class_is_part_of_the_key(self):
+        """Test that the same content decoded as another class is not shared."""
+        cache = PlanCache()
+        plan_dict = {"name": "plan", "plan_type": "moisture", "water_volume": 100,
+                     "moisture_threshold": 0.3, "check_interval": 30}
+
+        assert isinstance(cache.decode(plan_dict, MoisturePlan), MoisturePlan)
+        assert type(cache.decode(plan_dict, Plan)) is Plan
+
+    def test_invalid_plan_is_not_cached(self):
+        """Test that a plan failing to decode is retried and not stored."""
+        cache = PlanCache()
+
+        assert cache.decode({"name": "plan"}, Plan) is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_plan_is_evicted(self):
+        """Test that the cache keeps at most max_size plans."""
+        cache = PlanCache(max_size=2)
+        plans = [{"name": f"plan{i}", "plan_type": "basic", "water_volume": 100} for i in range(3)]
+
+        first = cache.decode(plans[0], Plan)
+        cache.decode(plans[1], Plan)
+        cache.decode(plans[0], Plan)
+        cache.decode(plans[2], Plan)
+
+        assert len(cache) == 2
+        assert cache.decode(plans[0], Plan) is first
+        assert cache.misses == 3
+
+    def test_invalid_max_size(self):
+        """Test that an empty cache size is rejected."""
+        with pytest.raises(ValueError):
+            PlanCache(max_size=0)
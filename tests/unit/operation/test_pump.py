@@ -1,6 +1,7 @@
 """
 Unit tests for Pump operation.
 """
+import datetime
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from datetime import date
@@ -214,7 +215,7 @@ class TestPump:
         }
         
         with patch.object(pump, 'get_time') as mock_get_time, \
-             patch('run.operation.pump.date') as mock_date, \
+             patch.object(pump, '_get_current_date') as mock_date, \
              patch('run.operation.pump.calendar') as mock_calendar:
             
             mock_time_keeper = Mock()
@@ -226,7 +227,7 @@ class TestPump:
             # Set up the pump's water_time to match our mock
             pump.water_time = mock_time_keeper
             
-            mock_date.today.return_value = date(2023, 1, 16)  # Monday
+            mock_date.return_value = date(2023, 1, 16)  # Monday
             mock_calendar.day_name = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
             
             result = pump.execute_water_plan(plan, relay=mock_relay)
@@ -234,6 +235,137 @@ class TestPump:
             assert result.watering_status is True
             assert result.message == s.MESSAGE_SUCCESS_TIMER
 
+    @patch('run.operation.pump.time.sleep')
+    def test_time_plan_slot_already_watered(self, mock_sleep, pump, mock_relay):
+        """Test that a slot watered earlier today is not watered again."""
+        plan = {
+            "plan_type": "time_based",
+            "water_volume": 140,
+            "weekday_times": [{"weekday": "Monday", "time_water": f"{hour:02d}:00"} for hour in range(24)],
+            "execute_only_once": False,
+            "name": "time_plan"
+        }
+        
+        with patch.object(pump, 'get_time') as mock_get_time, \
+             patch.object(pump, '_get_current_date') as mock_date:
+            
+            mock_get_time.return_value.get_current_time.return_value = "10:00"
+            mock_date.return_value = date(2023, 1, 16)  # Monday
+            pump.water_time = Mock(time_last_watered="10:00", date_last_watered=date(2023, 1, 16))
+            
+            result = pump.execute_water_plan(plan, relay=mock_relay)
+            
+            assert result.watering_status is False
+            assert result.message == s.MESSAGE_PLAN_CONDITION_NOT_MET
+            mock_relay.on.assert_not_called()
+
+    @patch('run.operation.pump.time.sleep')
+    def test_time_plan_catches_up_slot_missed_by_long_cycle(self, mock_sleep, pump, mock_relay):
+        """Test that a slot passed during a long cycle is watered on the next cycle, once."""
+        plan = TimePlan("time_plan", "time_based", 140, [WaterTime("Monday", "10:00")])
+        pump.water_time = Mock(time_last_watered="09:00", date_last_watered=date(2023, 1, 16))
+        
+        with patch.object(pump, 'get_time') as mock_get_time, \
+             patch.object(pump, '_get_current_date') as mock_date:
+            mock_date.return_value = date(2023, 1, 16)  # Monday
+            
+            results = []
+            for current_time in ("09:59", "10:03", "10:04"):
+                mock_get_time.return_value.get_current_time.return_value = current_time
+                results.append(pump.execute_water_plan(plan, relay=mock_relay).watering_status)
+        
+        assert results == [False, True, False]
+        mock_relay.on.assert_called_once()
+        pump.water_time.set_time_last_watered.assert_called_once_with("10:00")
+
+    @patch('run.operation.pump.time.sleep')
+    def test_time_plan_drops_slot_older_than_catch_up(self, mock_sleep, pump, mock_relay):
+        """Test that a slot missed longer than catch_up_minutes ago is not watered."""
+        plan = TimePlan("time_plan", "time_based", 140, [WaterTime("Monday", "10:00")])
+        pump.catch_up_minutes = 5
+        
+        with patch.object(pump, 'get_time') as mock_get_time, \
+             patch.object(pump, '_get_current_date') as mock_date:
+            mock_date.return_value = date(2023, 1, 16)  # Monday
+            for current_time in ("09:59", "10:30"):
+                mock_get_time.return_value.get_current_time.return_value = current_time
+                result = pump.execute_water_plan(plan, relay=mock_relay)
+        
+        assert result.watering_status is False
+        mock_relay.on.assert_not_called()
+
+    @patch('run.operation.pump.time.sleep')
+    def test_new_time_plan_does_not_catch_up(self, mock_sleep, pump, mock_relay):
+        """Test that a plan received after its slot started does not water for it."""
+        running_plan = TimePlan("time_plan", "time_based", 140, [WaterTime("Tuesday", "10:00")])
+        new_plan = {"plan_type": "time_based", "water_volume": 140, "name": "new_plan",
+                    "weekday_times": [{"weekday": "Monday", "time_water": "10:00"}]}
+        
+        with patch.object(pump, 'get_time') as mock_get_time, \
+             patch.object(pump, '_get_current_date') as mock_date:
+            mock_date.return_value = date(2023, 1, 16)  # Monday
+            mock_get_time.return_value.get_current_time.return_value = "09:50"
+            pump.execute_water_plan(running_plan, relay=mock_relay)
+            mock_get_time.return_value.get_current_time.return_value = "10:03"
+            result = pump.execute_water_plan(new_plan, relay=mock_relay)
+        
+        assert result.watering_status is False
+        mock_relay.on.assert_not_called()
+
+    @patch('run.operation.pump.time.sleep')
+    def test_restored_pump_catches_up_from_last_watering(self, mock_sleep, pump, mock_relay):
+        """Test that a slot missed while the pump was down is watered after a restore."""
+        plan = TimePlan("time_plan", "time_based", 140, [WaterTime("Monday", "10:00")])
+        pump.restore_state({'time_last_watered': '09:00', 'date_last_watered': '2023-01-16'})
+        
+        with patch.object(pump, 'get_time') as mock_get_time, \
+             patch.object(pump, '_get_current_date') as mock_date:
+            mock_date.return_value = date(2023, 1, 16)  # Monday
+            mock_get_time.return_value.get_current_time.return_value = "10:20"
+            result = pump.execute_water_plan(plan, relay=mock_relay)
+        
+        assert result.watering_status is True
+        assert pump.water_time.time_last_watered == "10:00"
+
+    @patch('run.operation.pump.time.sleep')
+    def test_restored_pump_catches_up_with_resent_plan(self, mock_sleep, pump, mock_relay):
+        """Test that the server resending the restored plan after a restart keeps the missed slot due."""
+        plan = {"plan_type": "time_based", "water_volume": 140, "name": "time_plan",
+                "weekday_times": [{"weekday": "Monday", "time_water": "08:00"},
+                                  {"weekday": "Monday", "time_water": "08:30"}]}
+        pump.restore_state({'running_plan': TimePlan.from_dict(plan).to_dict(),
+                            'time_last_watered': '08:00', 'date_last_watered': '2023-01-16'})
+        
+        with patch.object(pump, 'get_time') as mock_get_time, \
+             patch.object(pump, '_get_current_date') as mock_date:
+            mock_date.return_value = date(2023, 1, 16)  # Monday
+            mock_get_time.return_value.get_current_time.return_value = "08:40"
+            result = pump.execute_water_plan(dict(plan), relay=mock_relay)
+        
+        assert result.watering_status is True
+        mock_relay.on.assert_called_once()
+        assert pump.water_time.time_last_watered == "08:30"
+
+    @patch('run.operation.pump.time.sleep')
+    def test_resent_time_plan_is_decoded_once(self, mock_sleep, pump, mock_relay):
+        """Test that the running plan is reused when the server sends it again."""
+        plan = {"plan_type": "time_based", "water_volume": 140, "name": "time_plan",
+                "weekday_times": [{"weekday": "Monday", "time_water": "10:00"}]}
+        
+        with patch.object(pump, 'get_time') as mock_get_time, \
+             patch.object(pump, '_get_current_date') as mock_date:
+            mock_date.return_value = date(2023, 1, 16)  # Monday
+            mock_get_time.return_value.get_current_time.return_value = "09:59"
+            pump.execute_water_plan(plan, relay=mock_relay)
+            running_plan = pump.running_plan
+            mock_get_time.return_value.get_current_time.return_value = "10:02"
+            result = pump.execute_water_plan(dict(plan), relay=mock_relay)
+        
+        assert pump.running_plan is running_plan
+        assert pump.plan_cache.hits == 1
+        # The resent plan keeps catching up from the first evaluation
+        assert result.watering_status is True
+
     def test_execute_water_plan_delete(self, pump):
         """Test executing delete plan."""
         pump.running_plan = Mock()
@@ -263,6 +395,81 @@ class TestPump:
         
         assert result == mock_plan
 
+    def test_water_plant_by_moisture_skips_checks_until_predicted(self, pump, mock_relay, mock_moisture_sensor):
+        """Test that a predicted moisture check replaces the check interval until it is due."""
+        moisture_plan = MoisturePlan("test", "moisture", 140, 0.4, 30)
+        pump.moisture_check_at = datetime.datetime(2023, 1, 16, 12, 0)
+        
+        with patch.object(pump.time_engine, 'now', return_value=datetime.datetime(2023, 1, 16, 11, 59)), \
+             patch.object(pump, '_evaluate_moisture_and_water') as mock_evaluate:
+            pump.water_plant_by_moisture(mock_relay, mock_moisture_sensor, moisture_plan)
+            
+            mock_evaluate.assert_not_called()
+            assert pump.watering_status.message == s.MESSAGE_PLAN_CONDITION_NOT_MET
+            
+        with patch.object(pump.time_engine, 'now', return_value=datetime.datetime(2023, 1, 16, 12, 0)), \
+             patch.object(pump, '_evaluate_moisture_and_water') as mock_evaluate:
+            pump.water_plant_by_moisture(mock_relay, mock_moisture_sensor, moisture_plan)
+            
+            mock_evaluate.assert_called_once_with(mock_relay, mock_moisture_sensor, moisture_plan)
+
+    def test_moisture_check_predicted_from_trend(self, pump, mock_relay, mock_moisture_sensor):
+        """Test that moist checks predict the next check and a watering falls back to the interval."""
+        moisture_plan = MoisturePlan("test", "moisture", 140, 0.4, 30)
+        pump.moisture_sensor = mock_moisture_sensor
+        
+        with patch.object(pump.time_engine, 'epoch', side_effect=[0, 1800, 3600]):
+            for _ in range(3):
+                pump._evaluate_moisture_and_water(mock_relay, mock_moisture_sensor, moisture_plan)
+            
+        assert pump.moisture_check_at == datetime.datetime.fromtimestamp(3600 + 4 * 1800)
+        
+        mock_moisture_sensor.value = 1.0
+        with patch.object(pump, '_execute_moisture_watering') as mock_execute:
+            pump._evaluate_moisture_and_water(mock_relay, mock_moisture_sensor, moisture_plan)
+            
+        mock_execute.assert_called_once()
+        assert pump.moisture_check_at is None
+        assert len(pump.moisture_trend) == 0
+
+    def test_evaluate_moisture_edge_respects_interval(self, pump, mock_relay, mock_moisture_sensor):
+        """Test that dry soil brings the check forward only once the check interval has passed."""
+        pump.running_plan = MoisturePlan("test", "moisture", 140, 0.4, 30)
+        pump.moisture_sensor = mock_moisture_sensor
+        pump.moisture_watered_at = 0
+        
+        with patch.object(pump.time_engine, 'epoch', return_value=29 * 60), \
+             patch.object(pump, '_evaluate_moisture_and_water') as mock_evaluate:
+            assert pump.evaluate_moisture_edge(mock_relay) is False
+            mock_evaluate.assert_not_called()
+            
+        with patch.object(pump.time_engine, 'epoch', return_value=30 * 60), \
+             patch.object(pump, '_evaluate_moisture_and_water') as mock_evaluate:
+            pump.evaluate_moisture_edge(mock_relay)
+            mock_evaluate.assert_called_once_with(mock_relay, mock_moisture_sensor, pump.running_plan)
+
+    @patch('run.operation.pump.time.sleep')
+    def test_evaluate_moisture_edge_waters_dry_soil(self, mock_sleep, pump, mock_relay, mock_moisture_sensor):
+        """Test that dry soil reported by the sensor starts watering right away."""
+        pump.running_plan = MoisturePlan("test", "moisture", 140, 0.4, 30)
+        pump.moisture_sensor = mock_moisture_sensor
+        pump.water_time.set_time_last_watered(pump.time_engine.time_minus_delta(60))
+        mock_moisture_sensor.value = 1.0
+        
+        assert pump.evaluate_moisture_edge(mock_relay) is True
+        
+        mock_relay.on.assert_called_once()
+        assert pump.moisture_watered_at is not None
+        assert pump.evaluate_moisture_edge(mock_relay) is False
+
+    def test_evaluate_moisture_edge_without_moisture_plan(self, pump, mock_relay, mock_moisture_sensor):
+        """Test that dry soil is ignored without a running moisture plan."""
+        pump.moisture_sensor = mock_moisture_sensor
+        pump.running_plan = TimePlan("time_plan", "time_based", 140, [WaterTime("Monday", "10:00")])
+        
+        assert pump.evaluate_moisture_edge(mock_relay) is False
+        mock_relay.on.assert_not_called()
+
     def test_water_plant_by_moisture_time_out_of_range(self, pump, mock_relay, mock_moisture_sensor):
         """Test moisture watering when time is out of range."""
         moisture_plan = MoisturePlan("test", "moisture", 140, 0.4, 30)
@@ -291,3 +498,103 @@ class TestPump:
             # The pump calls _reset_water_time which creates a new time keeper and calls set_time_last_watered
             mock_create_time_keeper.assert_called_once()
             mock_new_time_keeper.set_time_last_watered.assert_called_with("09:30")
+
+    @pytest.mark.parametrize("last_watered, time_minus_delta, check_interval, out_of_range", [
+        ("00:05", "23:40", 30, False),  # watered 5 minutes ago, just after midnight
+        ("12:00", "00:20", 10, True),   # watered 12.5 hours ago, yesterday
+        ("23:50", "23:45", 30, False),  # watered 25 minutes ago, before midnight
+    ])
+    def test_water_time_out_of_range_across_midnight(self, pump, last_watered, time_minus_delta, check_interval,
+                                                    out_of_range):
+        """Test that the minutes since the last watering are counted across midnight."""
+        pump.water_time.set_time_last_watered(last_watered)
+        
+        assert pump._is_water_time_out_of_range(check_interval, time_minus_delta) is out_of_range
+
+    def test_water_plant_non_blocking_returns_immediately(self, pump, mock_relay):
+        """Test that a non-blocking pump waters in the background."""
+        pump.non_blocking = True
+        
+        result = pump.water_plant(mock_relay, 140)
+        
+        assert result is True
+        assert pump.is_watering()
+        mock_relay.on.assert_called_once()
+        mock_relay.off.assert_not_called()
+        assert pump.water_level == 1860
+        
+        assert pump.water_plant(mock_relay, 140) is False
+        pump.stop_watering()
+
+    def test_time_plan_resent_during_watering_waits_for_it(self, pump, mock_relay):
+        """Test that a plan arriving during a background watering keeps its slot and water until it finishes."""
+        plan = {"plan_type": "time_based", "water_volume": 140, "name": "time_plan",
+                "weekday_times": [{"weekday": "Monday", "time_water": "10:00"}]}
+        pump.non_blocking = True
+        
+        with patch.object(pump, 'get_time') as mock_get_time, \
+             patch.object(pump, '_get_current_date') as mock_date:
+            mock_date.return_value = date(2023, 1, 16)  # Monday
+            mock_get_time.return_value.get_current_time.return_value = "09:59"
+            pump.execute_water_plan(plan, relay=mock_relay)
+            evaluated_at = pump.schedule_evaluated_at
+            pump.water_plant(mock_relay, 140)
+            mock_get_time.return_value.get_current_time.return_value = "10:01"
+            result = pump.execute_water_plan(dict(plan), relay=mock_relay)
+            
+            assert result.watering_status is True
+            assert result.message == s.MESSAGE_WATERING_IN_PROGRESS
+            assert pump.water_level == 1860
+            assert pump.schedule_evaluated_at == evaluated_at
+            
+            pump.stop_watering()
+            result = pump.execute_water_plan(plan, relay=mock_relay)
+        
+        assert result.watering_status is True
+        assert mock_relay.on.call_count == 2
+        pump.stop_watering()
+
+    def test_delete_plan_stops_watering(self, pump, mock_relay):
+        """Test that deleting the plan cuts the relay and refunds unpumped water."""
+        pump.non_blocking = True
+        pump.running_plan = Mock()
+        pump.water_plant(mock_relay, 140)
+        
+        result = pump.execute_water_plan({"plan_type": "delete"})
+        
+        assert result.message == s.MESSAGE_DELETED_PLAN
+        assert not pump.is_watering()
+        mock_relay.off.assert_called_once()
+        assert pump.get_watering_progress()['state'] == 'cancelled'
+        assert pump.water_level > 1860
+
+    def test_state_restored_from_journal(self, tmp_path, mock_relay):
+        """Test that water level, running plan and last watering survive a restart."""
+        from run.operation.pump_journal import PumpJournal
+        path = str(tmp_path / "pump_state.json")
+        pump = Pump(water_max_capacity=2000, water_pumped_in_second=70, moisture_max_level=0,
+                    journal=PumpJournal(path, fsync=False))
+        plan = TimePlan("plan", "time_based", 140, [WaterTime("Monday", "08:00")])
+        pump.water_level = 1500
+        pump.water_time.set_time_last_watered("08:00")
+        pump.water_time.set_date_last_watered("2024-01-08")
+        pump.execute_water_plan(plan, relay=mock_relay)
+        
+        restored = Pump(water_max_capacity=2000, water_pumped_in_second=70, moisture_max_level=0,
+                        journal=PumpJournal(path))
+        
+        assert restored.water_level == 1500
+        assert restored.running_plan.to_dict() == plan.to_dict()
+        assert restored.water_time.time_last_watered == "08:00"
+        assert restored.water_time.date_last_watered == date(2024, 1, 8)
+        assert restored.water_reset is True
+
+    def test_checkpoint_records_only_changes(self, pump):
+        """Test that a checkpoint journals the changed fields only."""
+        pump.journal = Mock()
+        pump.checkpoint()
+        pump.journal.record.reset_mock()
+        
+        pump.reset_water_level(1000)
+        
+        pump.journal.record.assert_called_once_with({'water_level': 1000})
@@ -0,0 +1,78 @@
+"""
+Unit tests for PumpJournal.
+"""
+import json
+
+import pytest
+from run.operation.pump_journal import PumpJournal
+
+
+class TestPumpJournal:
+    """Test cases for PumpJournal class."""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        """Return the snapshot path in a temporary directory."""
+        return str(tmp_path / "device" / "pump_state.json")
+
+    def test_empty_journal_loads_empty_state(self, path):
+        """Test that a fresh journal restores nothing."""
+        assert PumpJournal(path).load() == {}
+
+    def test_changes_survive_reopen(self, path):
+        """Test that logged changes are applied in order on load."""
+        journal = PumpJournal(path, fsync=False)
+        journal.load()
+        journal.record({'water_level': 2000, 'water_reset': True})
+        journal.record({'water_level': 1800})
+
+        assert PumpJournal(path).load() == {'water_level': 1800, 'water_reset': True}
+
+    def test_compaction_writes_snapshot_and_clears_log(self, path):
+        """Test that the log is folded into the snapshot."""
+        journal = PumpJournal(path, compact_every=2, fsync=False)
+        journal.load()
+        journal.record({'water_level': 2000})
+        journal.record({'water_level': 1900, 'time_last_watered': '08:00'})
+
+        with open(path) as snapshot_file:
+            assert json.load(snapshot_file) == {'water_level': 1900, 'time_last_watered': '08:00'}
+        with open(journal.log_path) as log_file:
+            assert log_file.read() == ''
+        assert PumpJournal(path).load() == {'water_level': 1900, 'time_last_watered': '08:00'}
+
+    def test_torn_entry_is_ignored(self, path):
+        """Test that a partially written last entry does not break loading."""
+        journal = PumpJournal(path, fsync=False)
+        journal.load()
+        journal.record({'water_level': 1500})
+        with open(journal.log_path, 'a') as log_file:
+            log_file.write('{"water_level": 14')
+
+        assert PumpJournal(path).load() == {'water_level': 1500}
+
+    def test_changes_after_torn_entry_survive_reopen(self, path):
+        """Test that entries recorded after loading a torn log are replayed on the next load."""
+        journal = PumpJournal(path, fsync=False)
+        journal.load()
+        journal.record({'water_level': 900})
+        with open(journal.log_path, 'a') as log_file:
+            log_file.write('{"water_level": 8')
+
+        journal = PumpJournal(path, fsync=False)
+        journal.load()
+        journal.record({'water_level': 700})
+        journal.record({'water_level': 600})
+
+        assert PumpJournal(path).load() == {'water_level': 600}
+
+    def test_log_replayed_over_snapshot_after_crash_during_compaction(self, path):
+        """Test that entries already in the snapshot replay to the same state."""
+        journal = PumpJournal(path, fsync=False)
+        journal.load()
+        journal.record({'water_level': 1200})
+        journal.compact()
+        with open(journal.log_path, 'w') as log_file:
+            log_file.write(json.dumps({'water_level': 1200}) + '\n')
+
+        assert PumpJournal(path).load() == {'water_level': 1200}
@@ -0,0 +1,160 @@
+"""
+Unit tests for CycleScheduler.
+"""
+import datetime
+
+import pytest
+from unittest.mock import Mock
+from run.model.moisture_plan import MoisturePlan
+from run.model.time_plan import TimePlan
+from run.model.watertime import WaterTime
+from run.operation.scheduler import CycleScheduler, PHASE_HEARTBEAT, PHASE_PHOTO, PHASE_POLL, PHASE_TELEMETRY
+
+# A Wednesday
+NOW = datetime.datetime(2024, 1, 10, 8, 30, 20)
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestCycleScheduler:
+    """Test cases for CycleScheduler class."""
+
+    @pytest.fixture
+    def clock(self):
+        """Create a clock standing at NOW."""
+        return FakeClock(NOW)
+
+    @pytest.fixture
+    def sleep(self):
+        """Create a sleep mock."""
+        return Mock()
+
+    @pytest.fixture
+    def scheduler(self, clock, sleep):
+        """Create a scheduler polling every 10 seconds."""
+        return CycleScheduler(10, clock=clock, sleep=sleep)
+
+    def test_poll_due_at_start_and_after_interval(self, scheduler, clock):
+        """Test the network poll schedule."""
+        assert scheduler.is_poll_due()
+
+        scheduler.mark_polled()
+        assert not scheduler.is_poll_due()
+
+        clock.now += datetime.timedelta(seconds=10)
+        assert scheduler.is_poll_due()
+
+    def test_next_time_slot(self, scheduler):
+        """Test that the earliest upcoming weekday/time slot is due."""
+        plan = TimePlan("plan", "time_based", 100, [WaterTime("Monday", "07:00"),
+                                                    WaterTime("Wednesday", "09:15"),
+                                                    WaterTime("Wednesday", "08:00")])
+
+        assert scheduler.next_plan_due(plan, None) == datetime.datetime(2024, 1, 10, 9, 15)
+
+    def test_passed_slot_is_due_next_week(self, scheduler):
+        """Test that a slot earlier today is scheduled for next week."""
+        plan = TimePlan("plan", "time_based", 100, [WaterTime("Wednesday", "08:30")])
+
+        assert scheduler.next_plan_due(plan, None) == datetime.datetime(2024, 1, 17, 8, 30)
+
+    def test_invalid_slot_is_skipped(self, scheduler):
+        """Test that invalid schedule entries do not break scheduling."""
+        plan = TimePlan("plan", "time_based", 100, [WaterTime("Someday", "08:00"), WaterTime("Thursday", "06:00")])
+
+        assert scheduler.next_plan_due(plan, None) == datetime.datetime(2024, 1, 11, 6, 0)
+
+    def test_moisture_check_boundary(self, scheduler):
+        """Test that a moisture plan is due check_interval minutes after the last watering."""
+        plan = MoisturePlan("plan", "moisture", 100, 0.3, 15)
+
+        assert scheduler.next_plan_due(plan, "08:20") == datetime.datetime(2024, 1, 10, 8, 35)
+
+    def test_passed_moisture_boundary_checks_next_minute(self, scheduler):
+        """Test that a passed boundary makes the next minute due."""
+        plan = MoisturePlan("plan", "moisture", 100, 0.3, 5)
+
+        assert scheduler.next_plan_due(plan, "08:00") == datetime.datetime(2024, 1, 10, 8, 31)
+
+    def test_predicted_moisture_check(self, scheduler):
+        """Test that a moisture check predicted by the pump replaces the check boundary."""
+        plan = MoisturePlan("plan", "moisture", 100, 0.3, 15)
+        predicted = datetime.datetime(2024, 1, 10, 10, 0)
+
+        assert scheduler.next_plan_due(plan, "08:20", predicted) == predicted
+        assert scheduler.next_plan_due(plan, "08:20", NOW) == datetime.datetime(2024, 1, 10, 8, 31)
+
+    def test_unknown_plan_has_no_due_instant(self, scheduler):
+        """Test that plans without time trigger only wait for polls."""
+        assert scheduler.next_plan_due(Mock(), "08:00") is None
+        assert scheduler.next_plan_due(None, None) is None
+
+    def test_wait_sleeps_until_earliest_event(self, scheduler, sleep):
+        """Test that the scheduler sleeps until a plan event before the next poll."""
+        plan = TimePlan("plan", "time_based", 100, [WaterTime("Wednesday", "08:30"),
+                                                    WaterTime("Wednesday", "08:31")])
+        scheduler.mark_polled()
+
+        assert scheduler.wait(plan, None) == 10
+        scheduler.poll_interval = 3600
+        scheduler.mark_polled()
+        assert scheduler.wait(plan, None) == 40
+        assert sleep.call_args_list[1][0][0] == 40
+
+    def test_from_config_reads_phase_periods(self):
+        """Test that the phase periods come from TIMING_CONFIG."""
+        scheduler = CycleScheduler.from_config({'wait_time_between_cycle': 60, 'health_check_interval': 30,
+                                                'sensor_read_interval': 5})
+
+        assert scheduler.intervals == {PHASE_POLL: 60, PHASE_HEARTBEAT: 30, PHASE_TELEMETRY: 5}
+        assert CycleScheduler.from_config({}, poll_interval=10).intervals == {PHASE_POLL: 10}
+
+    def test_phases_run_at_their_own_period(self, clock, sleep):
+        """Test that each phase becomes due after its own period."""
+        scheduler = CycleScheduler(60, clock=clock, sleep=sleep,
+                                   phase_intervals={PHASE_HEARTBEAT: 30, PHASE_TELEMETRY: 20})
+        assert set(scheduler.due_phases()) == {PHASE_POLL, PHASE_HEARTBEAT, PHASE_TELEMETRY}
+        for phase in scheduler.due_phases():
+            scheduler.mark_done(phase)
+
+        clock.now += datetime.timedelta(seconds=20)
+        assert scheduler.due_phases() == [PHASE_TELEMETRY]
+        scheduler.mark_done(PHASE_TELEMETRY)
+
+        clock.now += datetime.timedelta(seconds=10)
+        assert scheduler.due_phases() == [PHASE_HEARTBEAT]
+        assert scheduler.seconds_until_next(None, None) == 0
+
+    def test_phase_without_period_follows_poll(self, scheduler, clock):
+        """Test that a phase without a period of its own runs with the poll."""
+        assert scheduler.is_due(PHASE_PHOTO)
+
+        scheduler.mark_done(PHASE_PHOTO)
+        assert scheduler.is_due(PHASE_PHOTO)
+
+        scheduler.mark_polled()
+        assert not scheduler.is_due(PHASE_PHOTO)
+        assert scheduler.seconds_until_phase(PHASE_PHOTO) == 10
+
+    def test_wait_remembers_plan_event(self, scheduler, clock):
+        """Test that the plan event slept for is due after waking."""
+        plan = TimePlan("plan", "time_based", 100, [WaterTime("Wednesday", "08:30")])
+        scheduler.mark_polled()
+        scheduler.poll_interval = 3600
+        scheduler.mark_polled()
+        assert not scheduler.is_plan_due()
+
+        clock.now = datetime.datetime(2024, 1, 10, 8, 29, 50)
+        scheduler.wait(plan, None)
+        assert not scheduler.is_plan_due()
+
+        clock.now += datetime.timedelta(seconds=10)
+        assert scheduler.is_plan_due()
@@ -1,10 +1,13 @@
 """
 Unit tests for ServerChecker operation.
 """
+import datetime
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from run.operation.server_checker import ServerChecker
 from run.model.status import Status, HEALTH_CHECK
+from run.operation.scheduler import CycleScheduler, PHASE_HEARTBEAT, PHASE_PHOTO, PHASE_TELEMETRY
 
 
 class TestServerChecker:
@@ -18,6 +21,7 @@ class TestServerChecker:
         pump.get_moisture_level_in_percent = Mock(return_value=75)
         pump.get_water_level_in_percent = Mock(return_value=80)
         pump.get_running_plan = Mock(return_value=None)
+        pump.is_watering = Mock(return_value=False)
         pump.execute_water_plan = Mock(return_value=Status(True, "Success"))
         return pump
 
@@ -32,6 +36,8 @@ class TestServerChecker:
         communicator.post_water = Mock(return_value={})
         communicator.post_moisture = Mock(return_value={})
         communicator.post_picture = Mock(return_value={})
+        communicator.post_telemetry = Mock(return_value={})
+        communicator.get_commands = Mock(return_value=None)
         communicator.return_emply_json = Mock(return_value={})
         return communicator
 
@@ -150,10 +156,279 @@ class TestServerChecker:
         
         server_checker.send_result(moisture_level, status, water_level)
         
-        # Verify all results were posted
-        mock_communicator.post_plan_execution.assert_called_with(status)
-        mock_communicator.post_water.assert_called_with(water_level)
-        mock_communicator.post_moisture.assert_called_with(moisture_level)
+        # Verify all results were posted in one batch
+        mock_communicator.post_telemetry.assert_called_once_with(status=status, water_level=water_level,
+                                                                 moisture_level=moisture_level, heartbeat=False)
+        mock_communicator.post_plan_execution.assert_not_called()
+
+    def test_send_result_includes_queued_health_check(self, server_checker, mock_communicator):
+        """Test that a queued health check rides along with the results."""
+        status = Status(True, "Test message")
+        
+        server_checker._send_health_check()
+        server_checker.send_result(75, status, 80)
+        server_checker.send_result(75, status, 80)
+        
+        first_call, second_call = mock_communicator.post_telemetry.call_args_list
+        assert first_call.kwargs['heartbeat'] is True
+        assert second_call.kwargs['heartbeat'] is False
+
+    def test_execute_cycle_without_plan_batches_telemetry(self, server_checker, mock_communicator):
+        """Test that a cycle without a plan sends one telemetry request."""
+        server_checker._execute_cycle({})
+        
+        mock_communicator.post_telemetry.assert_called_once_with(moisture_level=75, heartbeat=True)
+        mock_communicator.post_plan_execution.assert_not_called()
+        mock_communicator.post_moisture.assert_not_called()
+
+    def test_execute_cycle_uses_polled_results(self, server_checker, mock_pump, mock_communicator):
+        """Test that a cycle polls once and hands the results to the handlers."""
+        mock_communicator.get_water_level.return_value = {"water": 1500}
+        mock_communicator.get_plan.return_value = {"plan_type": "basic", "water_volume": 200, "name": "test_plan"}
+        
+        server_checker._execute_cycle({})
+        
+        mock_communicator.get_water_level.assert_called_once()
+        mock_communicator.get_picture.assert_called_once()
+        mock_communicator.get_plan.assert_called_once()
+        mock_pump.reset_water_level.assert_called_once_with(1500)
+        mock_pump.execute_water_plan.assert_called_once_with(mock_communicator.get_plan.return_value)
+
+    def test_execute_cycle_dispatches_commands(self, server_checker, mock_pump, mock_communicator):
+        """Test that commands from the long-poll replace the single endpoint polls."""
+        camera = Mock()
+        plan = {"plan_type": "basic", "water_volume": 200, "name": "test_plan"}
+        mock_communicator.get_commands.return_value = [
+            {"type": "water_level", "payload": {"water": 1500}},
+            {"type": "picture", "payload": {"photo_id": "photo_1"}},
+            {"type": "plan", "payload": plan}
+        ]
+        
+        assert server_checker._execute_cycle({"camera_sensor": camera}) is True
+        
+        mock_communicator.get_commands.assert_called_once_with(timeout=1)
+        mock_communicator.get_plan.assert_not_called()
+        mock_communicator.get_picture.assert_not_called()
+        mock_communicator.get_water_level.assert_not_called()
+        mock_pump.reset_water_level.assert_called_once_with(1500)
+        camera.take_photo.assert_called_once_with("photo_1")
+        mock_pump.execute_water_plan.assert_called_once_with(plan, camera_sensor=camera)
+
+    def test_execute_cycle_without_commands_continues_running_plan(self, server_checker, mock_pump,
+                                                                   mock_communicator):
+        """Test that a long-poll timeout still evaluates the running plan."""
+        running_plan = Mock()
+        mock_pump.get_running_plan.return_value = running_plan
+        mock_communicator.get_commands.return_value = []
+        
+        assert server_checker._execute_cycle({}) is True
+        
+        mock_pump.execute_water_plan.assert_called_once_with(running_plan)
+
+    def test_execute_cycle_falls_back_to_polling(self, server_checker, mock_communicator):
+        """Test that the single endpoints are polled without a command channel."""
+        assert server_checker._execute_cycle({}) is False
+        
+        mock_communicator.get_plan.assert_called_once()
+
+    def test_execute_cycle_skips_polls_while_server_unavailable(self, server_checker, mock_pump,
+                                                                 mock_communicator):
+        """Test that an open circuit skips the network phases but keeps the running plan going."""
+        running_plan = Mock()
+        mock_pump.get_running_plan.return_value = running_plan
+        mock_communicator.is_server_available.return_value = False
+        
+        assert server_checker._execute_cycle({}) is False
+        
+        mock_communicator.get_commands.assert_not_called()
+        mock_communicator.get_plan.assert_not_called()
+        mock_communicator.get_picture.assert_not_called()
+        mock_communicator.get_water_level.assert_not_called()
+        mock_pump.execute_water_plan.assert_called_once_with(running_plan)
+
+    def test_scheduled_cycle_polls_when_due(self, server_checker, mock_communicator):
+        """Test that a due poll runs a full cycle and sleeps until the next event."""
+        server_checker.scheduler = Mock()
+        server_checker.scheduler.is_poll_due.return_value = True
+        server_checker.scheduler.seconds_until.return_value = None
+        server_checker.scheduler.seconds_until_phase.return_value = 30
+        
+        server_checker._run_scheduled_cycle({})
+        
+        mock_communicator.get_commands.assert_called_once_with(timeout=1)
+        mock_communicator.get_plan.assert_called_once()
+        server_checker.scheduler.mark_polled.assert_called_once()
+        server_checker.scheduler.wait.assert_called_once()
+
+    def test_scheduled_cycle_between_polls_skips_network(self, server_checker, mock_pump, mock_communicator):
+        """Test that waking for a plan event only evaluates the running plan."""
+        running_plan = Mock()
+        mock_pump.get_running_plan.return_value = running_plan
+        server_checker.scheduler = Mock()
+        server_checker.scheduler.is_poll_due.return_value = False
+        
+        server_checker._run_scheduled_cycle({})
+        
+        mock_communicator.get_commands.assert_not_called()
+        mock_communicator.get_plan.assert_not_called()
+        mock_pump.execute_water_plan.assert_called_once_with(running_plan)
+        server_checker.scheduler.wait.assert_called_once()
+
+    def test_long_poll_returns_before_next_plan_event(self, server_checker, mock_communicator):
+        """Test that the long-poll timeout is capped at the next plan event."""
+        server_checker.wait_time_between_cycle = 30
+        server_checker.scheduler = Mock()
+        server_checker.scheduler.is_poll_due.return_value = True
+        server_checker.scheduler.seconds_until.return_value = 4.5
+        server_checker.scheduler.seconds_until_phase.return_value = 30
+        mock_communicator.get_commands.return_value = []
+        
+        server_checker._run_scheduled_cycle({})
+        
+        mock_communicator.get_commands.assert_called_once_with(timeout=4.5)
+        server_checker.scheduler.wait.assert_not_called()
+
+    def _phase_scheduler(self, server_checker, due):
+        """Replace the scheduler by one whose due phases are fixed."""
+        server_checker.scheduler = Mock()
+        server_checker.scheduler.is_poll_due.return_value = False
+        server_checker.scheduler.is_plan_due.return_value = False
+        server_checker.scheduler.is_due.side_effect = lambda phase: phase in due
+        return server_checker.scheduler
+
+    def test_between_polls_heartbeat_sends_telemetry(self, server_checker, mock_communicator):
+        """Test that a due heartbeat alone reports without polling."""
+        self._phase_scheduler(server_checker, {PHASE_HEARTBEAT})
+        
+        server_checker._run_scheduled_cycle({})
+        
+        mock_communicator.post_telemetry.assert_called_once_with(moisture_level=75, heartbeat=True)
+        mock_communicator.get_picture.assert_not_called()
+        mock_communicator.get_plan.assert_not_called()
+
+    def test_between_polls_photo_phase_polls_picture_only(self, server_checker, mock_communicator):
+        """Test that a due photo phase only polls for a photo request."""
+        scheduler = self._phase_scheduler(server_checker, {PHASE_PHOTO})
+        
+        server_checker._run_scheduled_cycle({})
+        
+        mock_communicator.get_picture.assert_called_once()
+        mock_communicator.get_plan.assert_not_called()
+        mock_communicator.post_telemetry.assert_not_called()
+        scheduler.mark_done.assert_called_once_with(PHASE_PHOTO)
+
+    def test_between_polls_nothing_due_skips_work(self, server_checker, mock_pump, mock_communicator):
+        """Test that waking without a due phase does nothing but sleep."""
+        mock_pump.get_running_plan.return_value = Mock()
+        scheduler = self._phase_scheduler(server_checker, set())
+        
+        server_checker._run_scheduled_cycle({})
+        
+        mock_pump.execute_water_plan.assert_not_called()
+        mock_communicator.post_telemetry.assert_not_called()
+        scheduler.wait.assert_called_once()
+
+    def test_poll_skips_photo_and_telemetry_not_due(self, mock_pump, mock_communicator):
+        """Test that a poll leaves out the photo request and moisture report when their phases are not due."""
+        scheduler = CycleScheduler(10, phase_intervals={PHASE_PHOTO: 60, PHASE_TELEMETRY: 60,
+                                                        PHASE_HEARTBEAT: 60})
+        checker = ServerChecker(mock_pump, mock_communicator, 10, scheduler=scheduler)
+        checker._execute_cycle({})
+        mock_communicator.get_picture.reset_mock()
+        mock_communicator.post_telemetry.reset_mock()
+        
+        checker._execute_cycle({})
+        
+        mock_communicator.get_plan.assert_called()
+        mock_communicator.get_picture.assert_not_called()
+        mock_communicator.post_telemetry.assert_not_called()
+
+    def test_cycle_stats_per_phase(self, server_checker, mock_communicator):
+        """Test that a cycle records the network calls of each phase."""
+        server_checker._execute_cycle({})
+        
+        stats = server_checker.get_cycle_stats()
+        assert stats['cycle']['count'] == 1
+        assert stats['phases']['commands']['network_calls']['max'] == 1
+        assert stats['phases']['poll']['network_calls']['max'] == 3
+        assert stats['phases']['watering_plan']['network_calls']['max'] == 1
+        assert stats['cycle']['network_calls']['max'] == 5
+
+    def test_running_plan_paused_while_watering(self, server_checker, mock_pump, mock_communicator):
+        """Test that a cycle during a background watering only logs progress while no report is due."""
+        mock_pump.get_running_plan.return_value = Mock()
+        mock_pump.is_watering.return_value = True
+        server_checker.scheduler.mark_polled()
+        
+        server_checker._execute_watering_plan({}, {})
+        
+        mock_pump.execute_water_plan.assert_not_called()
+        mock_pump.get_watering_progress.assert_called_once()
+        mock_communicator.post_telemetry.assert_not_called()
+
+    def test_heartbeat_sent_while_watering(self, server_checker, mock_pump, mock_communicator):
+        """Test that a long watering still sends queued health checks with its progress."""
+        mock_pump.get_running_plan.return_value = Mock()
+        mock_pump.is_watering.return_value = True
+        mock_pump.get_watering_progress.return_value = {'state': 'running', 'elapsed': 20.0, 'remaining': 40.0,
+                                                        'fraction': 1 / 3, 'water_pumped': 100}
+        self._phase_scheduler(server_checker, {PHASE_HEARTBEAT})
+        
+        server_checker._run_scheduled_cycle({})
+        
+        mock_pump.execute_water_plan.assert_not_called()
+        mock_communicator.post_telemetry.assert_called_once()
+        telemetry = mock_communicator.post_telemetry.call_args[1]
+        assert telemetry['heartbeat'] is True
+        assert telemetry['water_level'] == 80
+        assert telemetry['moisture_level'] == 75
+        assert telemetry['status'].watering_status is True
+        assert telemetry['status'].message == "[Watering in progress] 100ml pumped, 40s remaining"
+        server_checker.scheduler.mark_done.assert_any_call(PHASE_TELEMETRY)
+
+    def _clocked_checker(self, mock_pump, mock_communicator, phase_intervals):
+        """Create a checker whose scheduler runs on a manually advanced clock and a sleep mock."""
+        clock = Mock(return_value=datetime.datetime(2024, 1, 10, 8, 30))
+        scheduler = CycleScheduler(60, clock=clock, sleep=Mock(), phase_intervals=phase_intervals)
+        checker = ServerChecker(mock_pump, mock_communicator, 60, scheduler=scheduler, long_poll=False)
+        checker._run_scheduled_cycle({})
+        clock.return_value += datetime.timedelta(seconds=min(phase_intervals.values()))
+        return checker, clock
+
+    def test_cycle_sleeps_while_watering(self, mock_pump, mock_communicator):
+        """Test that a due telemetry phase during a background watering does not keep the loop awake."""
+        mock_pump.is_watering.return_value = True
+        mock_pump.get_watering_progress.return_value = None
+        checker, _ = self._clocked_checker(mock_pump, mock_communicator, {PHASE_TELEMETRY: 5})
+        
+        checker._run_scheduled_cycle({})
+        
+        assert checker.scheduler._sleep.call_count == 2
+        assert checker.scheduler._sleep.call_args[0][0] > 0
+        assert not checker.scheduler.is_due(PHASE_TELEMETRY)
+
+    @pytest.mark.parametrize("cycles", [1, 2])
+    def test_cycle_sleeps_while_server_unavailable(self, mock_pump, mock_communicator, cycles):
+        """Test that a photo poll skipped for an open circuit does not keep the loop awake."""
+        mock_communicator.is_server_available.return_value = False
+        checker, clock = self._clocked_checker(mock_pump, mock_communicator, {PHASE_PHOTO: 30})
+        
+        for _ in range(cycles):
+            checker._run_scheduled_cycle({})
+            clock.return_value += datetime.timedelta(seconds=30)
+        
+        sleeps = [call[0][0] for call in checker.scheduler._sleep.call_args_list]
+        assert len(sleeps) == cycles + 1
+        assert all(seconds > 0 for seconds in sleeps)
+        mock_communicator.get_picture.assert_not_called()
+
+    def test_delete_plan_reaches_pump_while_watering(self, server_checker, mock_pump):
+        """Test that a delete plan is executed while water flows."""
+        mock_pump.is_watering.return_value = True
+        
+        server_checker._execute_watering_plan({}, {"plan_type": "delete"})
+        
+        mock_pump.execute_water_plan.assert_called_once_with({"plan_type": "delete"})
 
     def test_plan_executor_exception_handling(self, server_checker, mock_pump, mock_communicator):
         """Test plan executor exception handling."""
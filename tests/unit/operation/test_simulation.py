@@ -0,0 +1,102 @@
+"""
+Unit tests for the fast-forward simulation.
+"""
+import datetime
+import calendar
+import pytest
+from unittest.mock import Mock
+from run.operation.simulation import (Simulation, ScriptEvent, ScriptedCommunicator, VirtualClock,
+                                      EVENT_PLAN, EVENT_WATER_LEVEL)
+
+# Monday
+START = datetime.datetime(2023, 1, 16, 7, 0)
+
+
+def daily_plan(time_water, water_volume=100):
+    """Create a time plan dictionary watering every day at the same time."""
+    return {"name": "daily", "plan_type": "time_based", "water_volume": water_volume,
+            "weekday_times": [{"weekday": day, "time_water": time_water} for day in calendar.day_name]}
+
+
+class TestVirtualClock:
+    """Test cases for VirtualClock class."""
+
+    def test_sleep_advances_time(self):
+        """Test that sleeping moves all views of the clock."""
+        clock = VirtualClock(START)
+
+        clock.sleep(90)
+        clock.sleep(-5)
+
+        assert clock.now() == START + datetime.timedelta(seconds=90)
+        assert clock.monotonic() == 90
+
+
+class TestScriptedCommunicator:
+    """Test cases for ScriptedCommunicator class."""
+
+    def test_delivers_due_events_once_in_order(self):
+        """Test that events are delivered once their time has come, oldest first."""
+        clock = VirtualClock(START)
+        communicator = ScriptedCommunicator(clock, [
+            ScriptEvent(START + datetime.timedelta(minutes=5), EVENT_PLAN, {"name": "second"}),
+            ScriptEvent(START, EVENT_PLAN, {"name": "first"}),
+            ScriptEvent(START, EVENT_WATER_LEVEL, {"water": 500})])
+
+        assert communicator.get_plan() == {"name": "first"}
+        assert communicator.get_plan() == {}
+        assert communicator.get_water_level() == {"water": 500}
+
+        clock.sleep(300)
+        assert communicator.get_plan() == {"name": "second"}
+
+
+class TestSimulation:
+    """Test cases for Simulation class."""
+
+    @pytest.mark.parametrize("wait_time_between_cycle", [60, 3600])
+    def test_week_of_daily_slots_is_watered(self, wait_time_between_cycle):
+        """Test that every daily slot of a week is watered, even with rare network polls."""
+        simulation = Simulation(START, [ScriptEvent(START, EVENT_PLAN, daily_plan("08:30"))],
+                                wait_time_between_cycle=wait_time_between_cycle)
+
+        report = simulation.run(datetime.timedelta(days=7))
+
+        assert report['errors'] == 0
+        assert report['spinning_cycles'] == 0
+        assert report['waterings'] == 7
+        assert report['missed_slots'] == 0
+        # The first watering runs 3 seconds longer to fill the pipe
+        assert report['water_pumped_ml'] == 730
+        # The pump deducts a plan's volume when checking the slot and again when watering
+        assert report['water_consumed_ml'] == 1400
+        assert report['water_level_ml'] == 600
+        assert all(started.time() == datetime.time(8, 30) for started in report['watering_times'])
+
+    def test_insufficient_water_reports_missed_slots(self):
+        """Test that slots the tank cannot serve are reported as missed until it is refilled."""
+        refill = datetime.datetime(2023, 1, 20, 12, 0)
+        simulation = Simulation(START, [ScriptEvent(START, EVENT_PLAN, daily_plan("08:30", water_volume=300)),
+                                        ScriptEvent(refill, EVENT_WATER_LEVEL, {"water": 2000})],
+                                water_max_capacity=50)
+
+        report = simulation.run(datetime.timedelta(days=7))
+
+        assert report['errors'] == 0
+        assert [started.date() for started in report['watering_times']] == [datetime.date(2023, 1, 21),
+                                                                             datetime.date(2023, 1, 22)]
+        assert report['missed_slots'] == 5
+        assert all(slot < refill for slot in report['missed_slot_times'])
+        assert report['water_consumed_ml'] == 2000 - report['water_level_ml']
+
+    def test_cycles_without_sleep_fail_the_run(self):
+        """Test that a main loop that stops sleeping is reported instead of hidden."""
+        simulation = Simulation(START, max_spinning_cycles=3)
+        simulation.checker.scheduler.wait = Mock(return_value=0)
+
+        with pytest.raises(RuntimeError):
+            simulation.run(datetime.timedelta(hours=1))
+
+        report = simulation.report()
+        assert report['spinning_cycles'] == 3
+        assert report['errors'] == 3
@@ -0,0 +1,70 @@
+"""
+Unit tests for WateringJob.
+"""
+import time
+
+import pytest
+from unittest.mock import Mock
+from run.operation.watering_job import WateringJob
+
+
+class TestWateringJob:
+    """Test cases for WateringJob class."""
+
+    @pytest.fixture
+    def relay(self):
+        """Create a mock relay."""
+        return Mock()
+
+    def test_job_completes_at_deadline(self, relay):
+        """Test that the relay is switched off once the duration has passed."""
+        job = WateringJob(relay, 0.05, water_milliliters=100)
+
+        job.start()
+        assert job.is_running()
+        relay.on.assert_called_once()
+
+        assert job.wait(2)
+        assert job.state == WateringJob.COMPLETED
+        relay.off.assert_called_once()
+        assert job.progress()['water_pumped'] == 100
+
+    def test_cancel_stops_relay_immediately(self, relay):
+        """Test that cancelling turns the relay off before returning."""
+        job = WateringJob(relay, 30, water_milliliters=300)
+        job.start()
+
+        started = time.monotonic()
+        job.cancel()
+
+        assert time.monotonic() - started < 0.1
+        relay.off.assert_called_once()
+        assert job.state == WateringJob.CANCELLED
+        assert not job.is_running()
+        assert job.wait(2)
+        relay.off.assert_called_once()
+
+    def test_progress_uses_monotonic_clock(self, relay):
+        """Test progress reporting against the job clock."""
+        now = [100.0]
+        job = WateringJob(relay, 10, water_milliliters=200, clock=lambda: now[0])
+        job.start()
+
+        now[0] = 104.0
+        progress = job.progress()
+
+        assert progress['state'] == WateringJob.RUNNING
+        assert progress['elapsed'] == 4.0
+        assert progress['remaining'] == 6.0
+        assert progress['water_pumped'] == 80
+        job.cancel()
+
+    def test_relay_error_fails_job(self, relay):
+        """Test that a relay error still finishes the job."""
+        relay.off.side_effect = RuntimeError("GPIO error")
+        job = WateringJob(relay, 0.01)
+
+        job.start()
+
+        assert job.wait(2)
+        assert not job.is_running()
@@ -0,0 +1,107 @@
+"""
+Unit tests for multi-zone operation.
+"""
+import pytest
+from unittest.mock import Mock
+from run.model.status import Status
+from run.operation.zones import Zone, MultiZoneChecker
+
+
+def create_pump():
+    """Create a mock pump without a running plan."""
+    pump = Mock()
+    pump.MOISTURE_SENSOR_KEY = 'moisture_sensor'
+    pump.get_moisture_level_in_percent = Mock(return_value=75)
+    pump.get_water_level_in_percent = Mock(return_value=80)
+    pump.get_running_plan = Mock(return_value=None)
+    pump.is_watering = Mock(return_value=False)
+    pump.execute_water_plan = Mock(return_value=Status(True, "Success"))
+    return pump
+
+
+def create_communicator(plan):
+    """Create a mock communicator answering the plan poll with a plan."""
+    communicator = Mock()
+    communicator.get_plan = Mock(return_value=plan)
+    communicator.get_water_level = Mock(return_value={})
+    communicator.get_picture = Mock(return_value={})
+    communicator.post_telemetry = Mock(return_value={})
+    communicator.return_emply_json = Mock(return_value={})
+    communicator.is_server_available = Mock(return_value=True)
+    return communicator
+
+
+class TestMultiZoneChecker:
+    """Test cases for MultiZoneChecker class."""
+
+    @pytest.fixture
+    def zones(self):
+        """Create two zones with their own pump, communicator and sensors."""
+        zones = [Zone.create(name, create_pump(), create_communicator(plan), {'moisture_sensor': Mock()}, 10)
+                 for name, plan in (('basil', {"plan_type": "basic", "water_volume": 100, "name": "a"}),
+                                    ('mint', {}))]
+        yield zones
+        for zone in zones:
+            zone.checker.cycle_driver.close()
+
+    @pytest.fixture
+    def sleep(self):
+        """Create a sleep mock."""
+        return Mock()
+
+    @pytest.fixture
+    def checker(self, zones, sleep):
+        """Create a MultiZoneChecker for testing."""
+        checker = MultiZoneChecker(zones, sleep=sleep)
+        yield checker
+        if checker._loop is not None:
+            checker._loop.close()
+
+    def test_requires_zones(self):
+        """Test that a multi-zone checker needs at least one zone."""
+        with pytest.raises(ValueError):
+            MultiZoneChecker([])
+
+    def test_zone_checker_polls_single_endpoints(self, zones):
+        """Test that zone checkers do not long-poll on behalf of all zones."""
+        assert all(zone.checker.long_poll is False for zone in zones)
+
+    def test_cycle_polls_every_zone_and_runs_its_plan(self, checker, zones):
+        """Test that one cycle polls all zones and hands each zone its own results."""
+        checker.run_cycle()
+
+        basil, mint = zones
+        for zone in zones:
+            zone.communicator.get_plan.assert_called_once()
+            zone.communicator.get_commands.assert_not_called()
+        basil.pump.execute_water_plan.assert_called_once_with(basil.communicator.get_plan.return_value,
+                                                              **basil.sensors)
+        mint.pump.execute_water_plan.assert_not_called()
+        mint.communicator.post_telemetry.assert_called_once_with(moisture_level=75, heartbeat=True)
+
+    def test_failed_zone_poll_does_not_stop_other_zones(self, checker, zones):
+        """Test that an error in one zone leaves the other zones running."""
+        basil, mint = zones
+        basil.pump.execute_water_plan.side_effect = RuntimeError("relay stuck")
+
+        checker.run_cycle()
+
+        mint.communicator.post_telemetry.assert_called_once()
+
+    def test_unavailable_server_skips_polls(self, checker, zones):
+        """Test that zones are not polled while the shared breaker is open."""
+        for zone in zones:
+            zone.communicator.is_server_available.return_value = False
+
+        assert checker.poll_zones() == {}
+        for zone in zones:
+            zone.communicator.get_plan.assert_not_called()
+
+    def test_wait_sleeps_until_earliest_zone_event(self, checker, zones, sleep):
+        """Test that the shared sleep ends at the earliest event of any zone."""
+        basil, mint = zones
+        basil.checker.scheduler = Mock(seconds_until_next=Mock(return_value=8.0))
+        mint.checker.scheduler = Mock(seconds_until_next=Mock(return_value=3.0))
+
+        assert checker.wait() == 3.0
+        sleep.assert_called_once_with(3.0)
@@ -0,0 +1,96 @@
+"""
+Unit tests for the background moisture sampler.
+"""
+import pytest
+from unittest.mock import Mock, PropertyMock
+from run.sensor.moisture_sampler import MoistureSampler
+
+
+def create_sensor(*readings):
+    """Create a mock sensor returning the readings in order."""
+    sensor = Mock()
+    type(sensor).value = PropertyMock(side_effect=list(readings))
+    return sensor
+
+
+class TestMoistureSampler:
+    """Test cases for MoistureSampler class."""
+
+    def test_median_rejects_single_spike(self):
+        """Test that a single noisy reading does not move the filtered value."""
+        sampler = MoistureSampler(create_sensor(0.4, 0.4, 1.0), buffer_size=3, alpha=1)
+
+        for _ in range(3):
+            sampler.sample()
+
+        assert sampler.readings() == [0.4, 0.4, 1.0]
+        assert sampler.value == 0.4
+
+    def test_moving_average_smooths_medians(self):
+        """Test that a new median moves the filtered value by alpha."""
+        sampler = MoistureSampler(create_sensor(0.2, 0.6), buffer_size=1, alpha=0.5)
+
+        sampler.sample()
+        sampler.sample()
+
+        assert sampler.value == pytest.approx(0.4)
+
+    def test_ring_buffer_keeps_latest_readings(self):
+        """Test that the buffer drops the oldest readings."""
+        sampler = MoistureSampler(create_sensor(0.1, 0.2, 0.3, 0.4), buffer_size=2)
+
+        for _ in range(4):
+            sampler.sample()
+
+        assert sampler.readings() == [0.3, 0.4]
+
+    def test_value_reads_sensor_only_once_before_sampling(self):
+        """Test that the first read samples the sensor and later reads use the cached value."""
+        sensor = Mock()
+        reading = PropertyMock(return_value=0.5)
+        type(sensor).value = reading
+        sampler = MoistureSampler(sensor)
+
+        assert sampler.value == 0.5
+        assert sampler.value == 0.5
+        assert reading.call_count == 1
+
+    def test_failed_reading_keeps_filtered_value(self):
+        """Test that a failing sensor read is counted and does not change the value."""
+        sampler = MoistureSampler(create_sensor(0.5, OSError("charge timeout")))
+
+        sampler.sample()
+
+        assert sampler.sample() is None
+        assert sampler.errors == 1
+        assert sampler.value == 0.5
+
+    def test_start_and_stop(self):
+        """Test that the sampler takes a first reading and its thread stops."""
+        sensor = Mock()
+        sensor.value = 0.3
+        sampler = MoistureSampler(sensor, sample_interval=0.01)
+
+        sampler.start()
+        try:
+            assert sampler.is_running()
+            assert sampler.value == 0.3
+        finally:
+            sampler.stop(timeout=1)
+
+        assert not sampler.is_running()
+
+    def test_from_config(self):
+        """Test creating a sampler from SENSOR_CONFIG."""
+        sampler = MoistureSampler.from_config(Mock(), {'moisture_sample_interval': 2.5, 'moisture_buffer_size': 5,
+                                                       'moisture_ema_alpha': 0.5})
+
+        assert sampler.sample_interval == 2.5
+        assert sampler.buffer_size == 5
+        assert sampler.alpha == 0.5
+
+    @pytest.mark.parametrize("kwargs", [{'sample_interval': 0}, {'buffer_size': 0}, {'alpha': 0}, {'alpha': 1.5}])
+    def test_invalid_settings(self, kwargs):
+        """Test that invalid settings are rejected."""
+        with pytest.raises(ValueError):
+            MoistureSampler(Mock(), **kwargs)
@@ -0,0 +1,40 @@
+"""
+Unit tests for the moisture sensor.
+"""
+import pytest
+from run.sensor.moisture_sensor import Moisture
+
+mock_pins = pytest.importorskip("gpiozero.pins.mock")
+
+
+class TestMoisture:
+    """Test cases for Moisture class."""
+
+    @pytest.fixture
+    def moisture(self):
+        """Create a moisture sensor on a mock charging pin reading wet soil."""
+        sensor = Moisture(4, pin_factory=mock_pins.MockFactory(pin_class=mock_pins.MockChargingPin))
+        yield sensor
+        sensor.close()
+
+    def test_edge_callbacks_are_wired(self, moisture):
+        """Test that the dry and wet callbacks are set on the light sensor events."""
+        def on_dry():
+            pass
+
+        def on_wet():
+            pass
+
+        moisture.when_dry = on_dry
+        moisture.when_wet = on_wet
+
+        assert moisture.when_light is on_dry
+        assert moisture.when_dark is on_wet
+        assert moisture.when_dry is on_dry
+
+        moisture.when_dry = None
+        assert moisture.when_light is None
+
+    def test_wait_for_dry_times_out(self, moisture):
+        """Test that waiting for dry soil returns False after the timeout."""
+        assert moisture.wait_for_dry(timeout=0.05) is False